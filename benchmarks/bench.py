@@ -0,0 +1,358 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+########################################################################################################################
+
+
+import argparse
+import gc
+import json
+import os
+import os.path
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pySMTrace
+import smlgen
+
+from pySMTrace import pyLOG, pyRPT
+
+
+########################################################################################################################
+
+
+class SMTrace_Benchmark(object):
+    """
+    @brief  Benchmark cases of the receive path.
+            Every case prepares its input outside of the measurement and processes all telegrams of it per run. The
+            rate is reported in telegrams per second of a single core, except for the pipeline cases which spread the
+            telegrams over several meters and workers; the memory peak is taken in a separate run with tracemalloc
+            enabled, since tracing slows down the measured run considerably.
+    """
+
+    LOGREF = "__LOGGER__BENCHMARK__"
+    RPTREF = "__REPORTER__BENCHMARK__"
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pArgs:argparse.Namespace):
+        """
+        @brief  Constructor.
+        @param  pArgs  Command line arguments.
+        """
+        self.__args = pArgs
+        self.__dir  = tempfile.mkdtemp(prefix="pySMTrace_bench_")
+        self.__pips = []
+        self.__gen  = smlgen.SML_Generator(pArgs.entries, pArgs.strings, pArgs.octets, pArgs.noise, pArgs.corrupt, pArgs.seed)
+        self.__tels = self.__gen.telegrams(pArgs.count)
+        self.__strm = smlgen.SML_Generator(pArgs.entries, pArgs.strings, pArgs.octets, pArgs.noise, pArgs.corrupt, pArgs.seed).stream(pArgs.count)
+        pyLOG.LogInit({"version": 1, "disable_existing_loggers": False, "loggers": {self.LOGREF: {"level": "ERROR", "handlers": [], "propagate": False}}})
+        pyRPT.RptInit({"handlers" : {"txt": {"class": "SMTrace_Report.EMailTxt", "logref": self.LOGREF, "from": "", "to": "", "cc": None, "subjprfx": None, "cron": ["0 0 1 1 *"], "mode": pArgs.mode, "aggregate": None, "retention": pArgs.retention, "downsample": 0.0},
+                                    "sml": {"class": "SMTrace_Report.EMailSml", "logref": self.LOGREF, "from": "", "to": "", "cc": None, "subjprfx": None, "cron": ["0 0 1 1 *"], "location": self.__dir, "naming": "%Y%m%d_%H%M%S_%f.pcapng", "samplerate": 1, "compress": None, "maxsize": None}},
+                       "reporters": {self.RPTREF: {"handlers": ["txt", "sml"]},
+                                     "__NONE__"  : {"handlers": []}}})
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def close(self):
+        """
+        @brief  Stops the pipelines and removes the PCAPNG files written by the benchmark.
+        """
+        for vPipe in self.__pips: vPipe.stop()
+        shutil.rmtree(self.__dir, ignore_errors=True)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def meter(self, pReport:bool=True, pDecode:str="lazy", pIdf:str="benchmark"):
+        """
+        @brief  Returns a SMTrace_SMLPacket configured for the benchmark.
+        @param  pReport  Report into an EMailTxt and an EMailSml handler; no handlers otherwise.
+        @param  pDecode  Decoder, 'lazy' or 'full'.
+        @param  pIdf     Meter identifier; the pipeline pins every identifier to one worker.
+        """
+        return pySMTrace.SMTrace_SMLPacket(pIdf, {"logref": self.LOGREF, "rptref": self.RPTREF if pReport else "__NONE__", "note": "benchmark", "maxframe": 16384, "crc": "X25", "badframelog": 3600, "obiscache": None, "obiscachesize": 256, "decode": pDecode, "obis": None})
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def handler(self, pName:str):
+        """
+        @brief  Returns a single report handler of the benchmark reporter.
+        @param  pName  Handler name, 'txt' or 'sml'.
+        """
+        vTrg = pySMTrace.apscheduler.schedulers.background.BackgroundScheduler()
+        vCfg = pyRPT.Hdl(pName)
+        return (pySMTrace.SMTrace_Report.EMailTxt if (pName == "txt") else pySMTrace.SMTrace_Report.EMailSml)(vCfg, vTrg, pyLOG.Log(self.LOGREF), "benchmark")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def case_crc(self):
+        """
+        @brief  CRC check of complete frames.
+        """
+        vCrc = pySMTrace.SMTrace_CRC16("X25")
+        def run():
+            for vTel in self.__tels: vCrc.check(vTel)
+        return run
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def case_crc_batch(self):
+        """
+        @brief  CRC check of all frames at once (vectorised if numpy is available).
+        """
+        vCrc = pySMTrace.SMTrace_CRC16("X25")
+        def run():
+            vCrc.check_batch(self.__tels)
+        return run
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __framing(self, pChunk:int):
+        """
+        @brief  Framing of the noisy byte stream fed in chunks of pChunk bytes.
+        @param  pChunk  Chunk size in bytes.
+        """
+        vChunks = [self.__strm[i:i + pChunk] for i in range(0, len(self.__strm), pChunk)]
+        def run():
+            vFramer = pySMTrace.SMTrace_SMLFramer()
+            for vChunk in vChunks:
+                for vFrame in vFramer.feed(vChunk): pass
+        return run
+
+    def case_framing_1(self):
+        """
+        @brief  Framing of the noisy byte stream fed byte by byte.
+        """
+        return self.__framing(1)
+
+    def case_framing_4k(self):
+        """
+        @brief  Framing of the noisy byte stream fed in chunks of 4 KB.
+        """
+        return self.__framing(4096)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __decode(self, pDecode:str):
+        """
+        @brief  CRC check and decoding of complete frames.
+        @param  pDecode  Decoder, 'lazy' or 'full'.
+        """
+        vArgs = self.meter(False, pDecode).decoder()
+        def run():
+            for vTel in self.__tels: pySMTrace.SMTrace_SMLPacket.decode(vTel, *vArgs)
+        return run
+
+    def case_decode_lazy(self):
+        """
+        @brief  CRC check and decoding of complete frames by SMTrace_SMLDecoder.
+        """
+        return self.__decode("lazy")
+
+    def case_decode_full(self):
+        """
+        @brief  CRC check and decoding of complete frames by pySML.
+        """
+        return self.__decode("full")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def case_obis(self):
+        """
+        @brief  OBIS mapping of decoded entries, without report handlers.
+        """
+        vMeter = self.meter(False)
+        vDec   = [pySMTrace.SMTrace_SMLPacket.decode(vTel, *vMeter.decoder()) for vTel in self.__tels]
+        def run():
+            for vTel, vEnt in zip(self.__tels, vDec): vMeter.report(vTel, *vEnt)
+        return run
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def case_emailtxt(self):
+        """
+        @brief  EMailTxt.log of the mapped values of every telegram.
+        """
+        vHdl   = self.handler("txt")
+        vData  = []
+        vMeter = self.meter(False)
+        vRpt   = vMeter._SMTrace_SMLPacket__rpt
+        vRpt.log = lambda pData, pTstmp=None: vData.append(pData) if isinstance(pData, dict) else None
+        for vTel in self.__tels: vMeter.report(vTel, *pySMTrace.SMTrace_SMLPacket.decode(vTel, *vMeter.decoder()))
+        def run():
+            vTstmp = time.time_ns()
+            for i, vDat in enumerate(vData): vHdl.log(vTstmp + i * 1000000000, vDat)
+        return run
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def case_emailsml(self):
+        """
+        @brief  EMailSml.log writing every telegram into the PCAPNG file.
+        """
+        vHdl = self.handler("sml")
+        def run():
+            vTstmp = time.time_ns()
+            for i, vTel in enumerate(self.__tels): vHdl.log(vTstmp + i, vTel)
+        return run
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __e2e(self, pChunk:int):
+        """
+        @brief  Complete receive path from data_received down to the report handlers.
+        @param  pChunk  Chunk size in bytes.
+        """
+        vMeter  = self.meter(True, self.__args.decode)
+        vChunks = [self.__strm[i:i + pChunk] for i in range(0, len(self.__strm), pChunk)]
+        def run():
+            for vChunk in vChunks: vMeter.data_received(vChunk)
+        return run
+
+    def case_e2e_1(self):
+        """
+        @brief  Complete receive path, fed byte by byte.
+        """
+        return self.__e2e(1)
+
+    def case_e2e_4k(self):
+        """
+        @brief  Complete receive path, fed in chunks of 4 KB.
+        """
+        return self.__e2e(4096)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __pipeline(self, pMode:str):
+        """
+        @brief  CRC check, decoding and OBIS mapping by a SMTrace_Pipeline, with the telegrams spread round robin over
+                '--meters' meters and '--workers' workers.
+        @param  pMode  Pipeline mode.
+        """
+        vPipe   = pySMTrace.SMTrace_Pipeline({"mode": pMode, "workers": self.__args.workers, "queuesize": 256, "policy": "block", "blocktimeout": None, "statsinterval": 0}, pyLOG.Log(self.LOGREF))
+        vMeters = [self.meter(False, self.__args.decode, "benchmark{}".format(i)) for i in range(self.__args.meters or self.__args.workers)]
+        self.__pips.append(vPipe)
+        def run():
+            vErrs = vPipe.stats()["errors"]
+            vDone = vPipe.stats()["processed"] + len(self.__tels)
+            for i, vTel in enumerate(self.__tels): vPipe.put(vMeters[i % len(vMeters)], vTel)
+            while (vPipe.stats()["processed"] < vDone): time.sleep(0.0005)
+            # a failed packet counts as processed too, but a rate of failures is no rate of the pipeline
+            if (vPipe.stats()["errors"] != vErrs): raise pySMTrace.SMTrace_Exception("{} of {} telegrams failed in the pipeline.".format(vPipe.stats()["errors"] - vErrs, len(self.__tels)))
+        return run
+
+    def case_pipeline_thread(self):
+        """
+        @brief  Pipeline decoding within worker threads.
+        """
+        return self.__pipeline("thread")
+
+    def case_pipeline_process(self):
+        """
+        @brief  Pipeline decoding within a process pool, passing packets and results pickled.
+        """
+        return self.__pipeline("process")
+
+    def case_pipeline_shm(self):
+        """
+        @brief  Pipeline decoding within worker processes, passing packets and results through shared memory.
+        """
+        return self.__pipeline("shm")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @classmethod
+    def cases(cls):
+        """
+        @brief  Returns the names of all benchmark cases in definition order.
+        """
+        return [vName[5:] for vName in cls.__dict__ if vName.startswith("case_")]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def run(self, pCase:str):
+        """
+        @brief  Runs a case and returns a dict of its best and median duration, rate and memory peak.
+        @param  pCase  Case name.
+        """
+        vRun  = getattr(self, "case_" + pCase)()
+        vDurs = []
+        vRun() # warm up, e.g. OBIS cache and file creation
+        gc.collect()
+        gc.disable()
+        try:
+            for i in range(self.__args.repeat):
+                vStrt = time.perf_counter()
+                vRun()
+                vDurs.append(time.perf_counter() - vStrt)
+        finally:
+            gc.enable()
+        tracemalloc.start()
+        try:
+            vRun()
+            vPeak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        vDurs.sort()
+        return dict(best_s=round(vDurs[0], 6), median_s=round(vDurs[len(vDurs) // 2], 6), rate=round(self.__args.count / vDurs[0], 1), peak_kb=round(vPeak / 1024, 1))
+
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+
+if (__name__ == '__main__'):
+
+    vPrs = argparse.ArgumentParser(description="pySMTrace receive path benchmarks")
+    vPrs.add_argument("cases",       nargs="*", metavar="CASE", help="cases to run (default: all of {})".format(", ".join(SMTrace_Benchmark.cases())))
+    vPrs.add_argument("--count",     type=int,   default=1000,   help="telegrams per run (default: %(default)s)")
+    vPrs.add_argument("--repeat",    type=int,   default=5,      help="measured runs per case (default: %(default)s)")
+    vPrs.add_argument("--entries",   type=int,   default=10,     help="integer entries per telegram (default: %(default)s)")
+    vPrs.add_argument("--strings",   type=int,   default=1,      help="string entries per telegram (default: %(default)s)")
+    vPrs.add_argument("--octets",    type=int,   default=1,      help="binary entries per telegram (default: %(default)s)")
+    vPrs.add_argument("--noise",     type=int,   default=16,     help="maximum noise bytes before every telegram of the stream (default: %(default)s)")
+    vPrs.add_argument("--corrupt",   type=float, default=0.01,   help="share of telegrams of the stream with invalid CRC (default: %(default)s)")
+    vPrs.add_argument("--seed",      type=int,   default=0,      help="random seed (default: %(default)s)")
+    vPrs.add_argument("--decode",    default="lazy", choices=("lazy", "full"), help="decoder of the e2e cases (default: %(default)s)")
+    vPrs.add_argument("--mode",      default="last", choices=pySMTrace.SMTrace_Report.EMailTxt.MODES, help="EMailTxt mode (default: %(default)s)")
+    vPrs.add_argument("--retention", type=int,   default=0,      help="EMailTxt samples kept per key (default: %(default)s)")
+    vPrs.add_argument("--workers",   type=int,   default=2,      help="workers of the pipeline cases (default: %(default)s)")
+    vPrs.add_argument("--meters",    type=int,   default=0,      help="meters of the pipeline cases, 0 for one per worker (default: %(default)s)")
+    vPrs.add_argument("--scale",     action="store_true",        help="run the pipeline cases with 1, 2, 4, ... workers up to the number of cores")
+    vPrs.add_argument("--json",      metavar="FILE",            help="write the results to FILE")
+    vPrs.add_argument("--baseline",  metavar="FILE",            help="compare the rates against the results in FILE")
+    vArgs = vPrs.parse_args()
+
+    vUnkn = [vCase for vCase in vArgs.cases if vCase not in SMTrace_Benchmark.cases()]
+    if (vUnkn): vPrs.error("unknown case(s): {}".format(", ".join(vUnkn)))
+
+    vBase = {}
+    if (vArgs.baseline):
+        with open(vArgs.baseline, "r") as fhdl:
+            vBase = json.load(fhdl)["results"]
+
+    vRuns = []
+    for vCase in (vArgs.cases or SMTrace_Benchmark.cases()):
+        if ((vArgs.scale) and (vCase.startswith("pipeline_"))):
+            vRuns += [(vCase, "{}@{}".format(vCase, 1 << i), 1 << i) for i in range((os.cpu_count() or 1).bit_length()) if ((1 << i) <= (os.cpu_count() or 1))]
+        else:
+            vRuns += [(vCase, vCase, vArgs.workers)]
+
+    vBnch = SMTrace_Benchmark(vArgs)
+    vRslt = {}
+    print("{:<20} {:>12} {:>12} {:>14} {:>10} {:>9}".format("case", "best [ms]", "median [ms]", "telegrams/s", "peak [KB]", "baseline"))
+    try:
+        for vCase, vName, vWorkers in vRuns:
+            vArgs.workers = vWorkers
+            vRslt[vName]  = vBnch.run(vCase)
+            vRatio = "{:>8.2f}x".format(vRslt[vName]["rate"] / vBase[vName]["rate"]) if (vName in vBase) else "{:>9}".format("-")
+            print("{:<20} {:>12.3f} {:>12.3f} {:>14.1f} {:>10.1f} {}".format(vName, vRslt[vName]["best_s"] * 1000, vRslt[vName]["median_s"] * 1000, vRslt[vName]["rate"], vRslt[vName]["peak_kb"], vRatio))
+    finally:
+        vBnch.close()
+
+    if (vArgs.json):
+        with open(vArgs.json, "w") as fhdl:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "numpy": pySMTrace.numpy is not None, "args": vars(vArgs), "results": vRslt}, fhdl, indent=2)
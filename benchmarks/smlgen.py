@@ -0,0 +1,206 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+########################################################################################################################
+
+
+import binascii
+import random
+import struct
+
+
+########################################################################################################################
+
+
+class SML_Generator(object):
+    """
+    @brief  Generator of synthetic SML telegrams.
+            Every telegram is a complete SML transport v1 frame containing a SML_PublicOpen.Res, a SML_GetList.Res and a
+            SML_PublicClose.Res with valid CRCs and escaping. The SML_GetList.Res carries a configurable number of
+            entries with integer, string and byte values; noise may be injected between the telegrams.
+    """
+
+    ESC   = b"\x1b\x1b\x1b\x1b"
+    START = b"\x1b\x1b\x1b\x1b\x01\x01\x01\x01"
+    OPT   = b"\x01"
+    UNITS = (30, 27, 33, 35, 44) # Wh, W, A, V, Hz
+    REV   = bytes(int("{:08b}".format(b)[::-1], 2) for b in range(256))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def tl(pType:int, pLen:int, pList:bool=False):
+        """
+        @brief  Returns the type-length field of a SML element.
+        @param  pType  Type nibble (0 octet string, 4 boolean, 5 integer, 6 unsigned, 7 list).
+        @param  pLen   Number of value bytes or number of list elements.
+        @param  pList  True for a list, whose length does not include the type-length field itself.
+        """
+        for vCnt in range(1, 8):
+            vLen = pLen if pList else (pLen + vCnt)
+            if (vLen >= (1 << (4 * vCnt))): continue
+            vRslt = bytearray()
+            for i in range(vCnt):
+                vRslt.append(((vLen >> (4 * (vCnt - 1 - i))) & 0x0F) | (0x80 if (i < vCnt - 1) else 0x00) | ((pType << 4) if (i == 0) else 0x00))
+            return bytes(vRslt)
+        raise ValueError("SML element length {} is too large.".format(pLen))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def octet(pData:bytes):
+        """
+        @brief  Returns a SML octet string.
+        @param  pData  The value.
+        """
+        return SML_Generator.tl(0, len(pData)) + pData
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def uint(pValue:int, pSize:int=1):
+        """
+        @brief  Returns a SML unsigned integer.
+        @param  pValue  The value.
+        @param  pSize   Number of bytes (1, 2, 4 or 8).
+        """
+        return SML_Generator.tl(6, pSize) + pValue.to_bytes(pSize, "big")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def sint(pValue:int, pSize:int=1):
+        """
+        @brief  Returns a SML signed integer.
+        @param  pValue  The value.
+        @param  pSize   Number of bytes (1, 2, 4 or 8).
+        """
+        return SML_Generator.tl(5, pSize) + pValue.to_bytes(pSize, "big", signed=True)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def lst(*pElements):
+        """
+        @brief  Returns a SML list of already encoded elements.
+        @param  pElements  The encoded elements.
+        """
+        return SML_Generator.tl(7, len(pElements), True) + b"".join(pElements)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def message(pTransId:bytes, pTag:int, pBody:bytes):
+        """
+        @brief  Returns a SML message (with a dummy message CRC, which receivers do not check).
+        @param  pTransId  Transaction id.
+        @param  pTag      Message body tag.
+        @param  pBody     The encoded message body.
+        """
+        L = SML_Generator
+        return L.lst(L.octet(pTransId), L.uint(0), L.uint(0), L.lst(L.uint(pTag, 4), pBody), L.uint(0, 2), b"\x00")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def crc(pData:bytes):
+        """
+        @brief  Returns the CRC-16/X-25 of pData.
+        @param  pData  The data.
+        """
+        vCrc = binascii.crc_hqx(pData.translate(SML_Generator.REV), 0xFFFF)
+        return int("{:016b}".format(vCrc)[::-1], 2) ^ 0xFFFF
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def frame(pMessages:bytes):
+        """
+        @brief  Returns a SML transport v1 frame of the encoded messages with padding, escaping and CRC.
+        @param  pMessages  The encoded messages.
+        """
+        vPad  = (-len(pMessages)) % 4
+        vData = pMessages + b"\x00" * vPad
+        vData = b"".join((vData[i:i + 4] * 2) if (vData[i:i + 4] == SML_Generator.ESC) else vData[i:i + 4] for i in range(0, len(vData), 4))
+        vData = SML_Generator.START + vData + SML_Generator.ESC + bytes([0x1A, vPad])
+        return vData + struct.pack("<H", SML_Generator.crc(vData))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pEntries:int=10, pStrings:int=1, pOctets:int=1, pNoise:int=0, pCorrupt:float=0.0, pSeed:int=0):
+        """
+        @brief  Constructor.
+        @param  pEntries  Number of integer entries per SML_GetList.Res.
+        @param  pStrings  Number of additional entries with a printable string value.
+        @param  pOctets   Number of additional entries with a binary value, some containing escape sequences.
+        @param  pNoise    Maximum number of random bytes injected before every telegram of a stream.
+        @param  pCorrupt  Share of telegrams of a stream with an invalid CRC.
+        @param  pSeed     Seed of the random generator, for repeatable streams.
+        """
+        self.__ent  = pEntries
+        self.__str  = pStrings
+        self.__oct  = pOctets
+        self.__nois = pNoise
+        self.__corr = pCorrupt
+        self.__rnd  = random.Random(pSeed)
+        self.__cnt  = 0
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def entries(self):
+        """
+        @brief  Returns the list of (object name, unit, scaler, value) of the next telegram.
+        """
+        vRslt = []
+        for i in range(self.__ent):
+            vObj = bytes([1, 0, 1 + (i // 4) % 80, (8, 7, 6, 9)[i % 4], (i // 320) % 256, 0xFF])
+            vRslt.append((vObj, self.UNITS[i % len(self.UNITS)], -(i % 3), self.__rnd.randrange(-(1 << 31), 1 << 31)))
+        for i in range(self.__str):
+            vRslt.append((bytes([1, 0, 96, 1, i % 256, 0xFF]), None, None, "SMTRACE{:08d}".format(self.__cnt).encode()))
+        for i in range(self.__oct):
+            vData = bytes(self.__rnd.randrange(256) for j in range(12))
+            if (i % 2 == 0): vData = vData[:4] + self.ESC + vData[8:]
+            vRslt.append((bytes([129, 129, 199, 130, 3 + i % 16, 0xFF]), None, None, vData))
+        return vRslt
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def telegram(self):
+        """
+        @brief  Returns the next SML telegram as bytes.
+        """
+        L = self
+        vServer = bytes([0x0A, 0x01]) + b"SMT" + self.__cnt.to_bytes(5, "big")
+        vTrans  = self.__cnt.to_bytes(4, "big")
+        vList   = []
+        for vObj, vUnit, vScaler, vValue in self.entries():
+            vEnc = L.octet(vValue) if isinstance(vValue, bytes) else (L.sint(vValue, 4) if (vValue < 0) else L.uint(vValue, 8))
+            vList.append(L.lst(L.octet(vObj), L.OPT, L.OPT, L.OPT if (vUnit is None) else L.uint(vUnit), L.OPT if (vScaler is None) else L.sint(vScaler), vEnc, L.OPT))
+        vOpen  = L.message(vTrans + b"\x00", 0x0101, L.lst(L.OPT, L.octet(vTrans), L.octet(b"SMTRACE"), L.octet(vServer), L.OPT, L.OPT))
+        vGet   = L.message(vTrans + b"\x01", 0x0701, L.lst(L.OPT, L.octet(vServer), L.OPT, L.lst(L.uint(1), L.uint(self.__cnt & 0xFFFFFFFF, 4)), L.lst(*vList), L.OPT, L.OPT))
+        vClose = L.message(vTrans + b"\x02", 0x0201, L.lst(L.OPT))
+        self.__cnt += 1
+        return L.frame(vOpen + vGet + vClose)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def telegrams(self, pCount:int):
+        """
+        @brief  Returns a list of pCount telegrams without noise.
+        @param  pCount  Number of telegrams.
+        """
+        return [self.telegram() for i in range(pCount)]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def stream(self, pCount:int):
+        """
+        @brief  Returns pCount telegrams as one byte stream like received from a serial port, with the configured noise
+                and share of corrupted telegrams.
+        @param  pCount  Number of telegrams.
+        """
+        vRslt = bytearray()
+        for i in range(pCount):
+            if (self.__nois): vRslt += bytes(self.__rnd.randrange(256) for j in range(self.__rnd.randrange(self.__nois + 1)))
+            vTel = self.telegram()
+            if (self.__rnd.random() < self.__corr): vTel = vTel[:-1] + bytes([vTel[-1] ^ 0xFF])
+            vRslt += vTel
+        return bytes(vRslt)
@@ -0,0 +1,198 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+########################################################################################################################
+
+
+import argparse
+import os
+import os.path
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import smlgen
+
+
+########################################################################################################################
+
+
+class SML_Server(object):
+    """
+    @brief  Local stand-in of network IR read heads (ser2net, Tasmota) for testing 'tcp' and 'udp' meter sources.
+            Every interval the next telegram of a SML_Generator is sent to all TCP clients and as datagram to a UDP
+            address. TCP clients may be dropped after a number of telegrams and the listener may be paused to exercise
+            the reconnect handling of the reader.
+    """
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def address(pValue:str):
+        """
+        @brief  Returns the tuple (host, port) of 'host:port' or 'port' (localhost).
+        """
+        vHost, _, vPort = pValue.rpartition(":")
+        return (vHost or "127.0.0.1", int(vPort))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pGen:smlgen.SML_Generator, pTcp:tuple=None, pUdp:tuple=None, pInterval:float=1.0, pDrop:int=0, pPause:float=0.0):
+        """
+        @brief  Constructor.
+        @param  pGen       Generator of the telegrams.
+        @param  pTcp       Tuple (host, port) to listen on for TCP clients or None; port 0 picks a free port.
+        @param  pUdp       Tuple (host, port) to send datagrams to or None.
+        @param  pInterval  Seconds between two telegrams.
+        @param  pDrop      Close all TCP clients after every pDrop telegrams; 0 for never.
+        @param  pPause     Seconds the listener is closed after dropping the clients, i.e. connects are refused.
+        """
+        self.__cln  = []
+        self.__cnt  = 0
+        self.__drp  = pDrop
+        self.__gen  = pGen
+        self.__int  = pInterval
+        self.__lsn  = None
+        self.__pau  = pPause
+        self.__run  = threading.Event()
+        self.__tcp  = pTcp
+        self.__thd  = None
+        self.__udp  = pUdp
+        self.__usck = None if (pUdp is None) else socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if (pTcp is not None): self.__listen()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @property
+    def port(self):
+        """
+        @brief  Returns the TCP port listened on.
+        """
+        return self.__tcp[1]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @property
+    def sent(self):
+        """
+        @brief  Returns the number of telegrams sent.
+        """
+        return self.__cnt
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __listen(self):
+        """
+        @brief  Opens the TCP listener, on the same port again after a pause.
+        """
+        self.__lsn = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__lsn.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__lsn.bind(self.__tcp)
+        self.__lsn.listen(16)
+        self.__lsn.setblocking(False)
+        self.__tcp = self.__lsn.getsockname()[:2]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def step(self):
+        """
+        @brief  Accepts pending TCP clients and sends the next telegram.
+        """
+        if (self.__lsn is not None):
+            try:
+                while (True):
+                    vSock, _ = self.__lsn.accept()
+                    vSock.setblocking(True)
+                    self.__cln.append(vSock)
+            except BlockingIOError:
+                pass
+        vTel = self.__gen.telegram()
+        for vSock in list(self.__cln):
+            try:
+                vSock.sendall(vTel)
+            except OSError:
+                vSock.close()
+                self.__cln.remove(vSock)
+        if (self.__usck is not None):
+            self.__usck.sendto(vTel, self.__udp)
+        self.__cnt += 1
+        if ((self.__drp) and (self.__cnt % self.__drp == 0)):
+            for vSock in self.__cln: vSock.close()
+            self.__cln = []
+            if ((self.__pau) and (self.__lsn is not None)):
+                self.__lsn.close()
+                time.sleep(self.__pau)
+                self.__listen()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def run(self, pCount:int=0):
+        """
+        @brief  Sends pCount telegrams (0 for endless) or until stop().
+        @param  pCount  Number of telegrams.
+        """
+        self.__run.set()
+        while ((self.__run.is_set()) and ((not pCount) or (self.__cnt < pCount))):
+            self.step()
+            time.sleep(self.__int)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def start(self, pCount:int=0):
+        """
+        @brief  Runs the server within a background thread.
+        @param  pCount  Number of telegrams.
+        """
+        self.__run.set()
+        self.__thd = threading.Thread(target=self.run, args=(pCount,), name="SML_Server", daemon=True)
+        self.__thd.start()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def stop(self):
+        """
+        @brief  Stops the server and closes all sockets.
+        """
+        self.__run.clear()
+        if (self.__thd is not None): self.__thd.join()
+        for vSock in self.__cln: vSock.close()
+        self.__cln = []
+        if (self.__lsn  is not None): self.__lsn.close()
+        if (self.__usck is not None): self.__usck.close()
+
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+
+if (__name__ == '__main__'):
+
+    vPrs = argparse.ArgumentParser(description="Local stand-in of network SML read heads")
+    vPrs.add_argument("--tcp",      metavar="[HOST:]PORT", help="listen for TCP clients, e.g. 7259")
+    vPrs.add_argument("--udp",      metavar="[HOST:]PORT", help="send datagrams to, e.g. 7260")
+    vPrs.add_argument("--interval", type=float, default=1.0, help="seconds between two telegrams (default: %(default)s)")
+    vPrs.add_argument("--count",    type=int,   default=0,   help="telegrams to send, 0 for endless (default: %(default)s)")
+    vPrs.add_argument("--drop",     type=int,   default=0,   help="close the TCP clients after every N telegrams, 0 for never (default: %(default)s)")
+    vPrs.add_argument("--pause",    type=float, default=0.0, help="seconds connects are refused after dropping the clients (default: %(default)s)")
+    vPrs.add_argument("--entries",  type=int,   default=10,  help="integer entries per telegram (default: %(default)s)")
+    vPrs.add_argument("--seed",     type=int,   default=0,   help="random seed (default: %(default)s)")
+    vArgs = vPrs.parse_args()
+
+    if ((vArgs.tcp is None) and (vArgs.udp is None)): vPrs.error("at least one of --tcp and --udp is required")
+
+    vSrv = SML_Server(smlgen.SML_Generator(pEntries=vArgs.entries, pSeed=vArgs.seed),
+                      None if (vArgs.tcp is None) else SML_Server.address(vArgs.tcp),
+                      None if (vArgs.udp is None) else SML_Server.address(vArgs.udp),
+                      vArgs.interval, vArgs.drop, vArgs.pause)
+    try:
+        vSrv.run(vArgs.count)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        vSrv.stop()
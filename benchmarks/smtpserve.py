@@ -0,0 +1,166 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+########################################################################################################################
+
+
+import argparse
+import email
+import email.policy
+import socketserver
+import threading
+import time
+
+
+########################################################################################################################
+
+
+class SMTP_Server(object):
+    """
+    @brief  Local stand-in of a SMTP server for testing the mail dispatch of the report handlers.
+            Every accepted message is kept with its connection number and time of reception. The replies to the end of
+            the message data are taken from a list, e.g. [451, 451, 250] to let the first two attempts fail temporarily;
+            250 is replied once the list is used up. Neither authentication nor STARTTLS are offered.
+    """
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    class Handler(socketserver.StreamRequestHandler):
+        """
+        @brief  One SMTP session.
+        """
+
+        def reply(self, pCode:int, pText:str="OK"):
+            self.wfile.write("{} {}\r\n".format(pCode, pText).encode("ascii"))
+
+        def handle(self):
+            vSrv  = self.server.owner
+            vConn = vSrv.connect()
+            self.reply(220, "smtpserve ready")
+            while (True):
+                vLine = self.rfile.readline()
+                if (not vLine): break
+                vCmd = vLine.decode("ascii", "replace").strip().upper()
+                if   (vCmd.startswith(("EHLO", "HELO"))        ): self.reply(250, "smtpserve")
+                elif (vCmd.startswith(("MAIL", "RCPT", "RSET"))): self.reply(250)
+                elif (vCmd.startswith("NOOP")):
+                    vSrv.count("noops")
+                    self.reply(250)
+                elif (vCmd.startswith("QUIT")):
+                    self.reply(221, "bye")
+                    break
+                elif (vCmd.startswith("DATA")):
+                    self.reply(354, "end data with <CR><LF>.<CR><LF>")
+                    vData = bytearray()
+                    while (True):
+                        vLine = self.rfile.readline()
+                        if ((not vLine) or (vLine == b".\r\n")): break
+                        vData += vLine[1:] if (vLine.startswith(b"..")) else vLine
+                    vCode = vSrv.accept(vConn, bytes(vData))
+                    self.reply(vCode, "OK" if (vCode == 250) else "rejected")
+                else:
+                    self.reply(502, "not implemented")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pAddr:tuple=("127.0.0.1", 0), pReplies:list=None):
+        """
+        @brief  Constructor, starts serving within a background thread.
+        @param  pAddr     Tuple (host, port) to listen on; port 0 picks a free port.
+        @param  pReplies  Reply codes to the end of the message data, in order of the attempts.
+        """
+        self.messages = [] # tuples (connection number, time.monotonic(), email.message.EmailMessage)
+        self.counts   = dict(connects=0, noops=0, rejected=0)
+        self.__lck    = threading.Lock()
+        self.__rpl    = list(pReplies or [])
+        self.__srv    = socketserver.ThreadingTCPServer(pAddr, self.Handler, bind_and_activate=False)
+        self.__srv.allow_reuse_address = True # listen on the same port again right after stop()
+        self.__srv.daemon_threads      = True
+        self.__srv.owner               = self
+        self.__srv.server_bind()
+        self.__srv.server_activate()
+        self.__thd    = threading.Thread(target=self.__srv.serve_forever, name="SMTP_Server", daemon=True)
+        self.__thd.start()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @property
+    def port(self):
+        """
+        @brief  Returns the port listened on.
+        """
+        return self.__srv.server_address[1]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def count(self, pKey:str):
+        """
+        @brief  Increments a counter and returns its new value.
+        @param  pKey  Counter name.
+        """
+        with self.__lck:
+            self.counts[pKey] += 1
+            return self.counts[pKey]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def connect(self):
+        """
+        @brief  Counts a new connection and returns its number.
+        """
+        return self.count("connects")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def accept(self, pConn:int, pData:bytes):
+        """
+        @brief  Returns the reply code to a received message, which is kept if the code is 250.
+        @param  pConn  Number of the connection.
+        @param  pData  The message.
+        """
+        with self.__lck:
+            vCode = self.__rpl.pop(0) if (self.__rpl) else 250
+            if (vCode == 250): self.messages.append((pConn, time.monotonic(), email.message_from_bytes(pData, policy=email.policy.default)))
+            else             : self.counts["rejected"] += 1
+        return vCode
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def stop(self):
+        """
+        @brief  Stops serving and closes the listener.
+        """
+        self.__srv.shutdown()
+        self.__srv.server_close()
+        self.__thd.join()
+
+
+########################################################################################################################
+########################################################################################################################
+########################################################################################################################
+
+
+if (__name__ == '__main__'):
+
+    vPrs = argparse.ArgumentParser(description="Local stand-in of a SMTP server")
+    vPrs.add_argument("--port",    type=int, default=2525, help="port to listen on (default: %(default)s)")
+    vPrs.add_argument("--replies", type=int, nargs="*",    help="reply codes to the first messages, e.g. 451 451 550")
+    vArgs = vPrs.parse_args()
+
+    vSrv = SMTP_Server(("127.0.0.1", vArgs.port), vArgs.replies)
+    vCnt = 0
+    try:
+        while (True):
+            time.sleep(0.5)
+            for vConn, vTime, vMssg in vSrv.messages[vCnt:]:
+                print("#{} {} -> {}: {}".format(vConn, vMssg["From"], vMssg["To"], vMssg["Subject"]))
+            vCnt = len(vSrv.messages)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        vSrv.stop()
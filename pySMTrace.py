@@ -15,32 +15,60 @@
 ########################################################################################################################
 
 
+import apscheduler.executors.pool
+import apscheduler.schedulers.asyncio
 import apscheduler.schedulers.background
+import apscheduler.schedulers.base
 import apscheduler.triggers.cron
+import argparse
+import array
+import asyncio
+import base64
+import binascii
+import concurrent.futures
 import croniter
 import datetime
 import email
-import email.mime.application
+import email.mime.base
 import email.mime.multipart
 import email.mime.text
+import email.policy
+import errno
+import gzip
+import http.server
 import inspect
+import itertools
+import json
+import lzma
+import mmap
+import multiprocessing, multiprocessing.shared_memory
 import os
 import os.path
+import pickle
 import pyLOG
 import pyOBIS
 import pyPCAPNG
 import pySML
+import queue
 import re
+import selectors
 import serial, serial.threaded
+import shutil
 import signal
 import smtplib
+import socket
 import struct
 import threading
 import traceback
 import time
 import yaml
 
-from collections import OrderedDict
+from collections import OrderedDict, deque
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 ########################################################################################################################
@@ -70,322 +98,4053 @@ class pyRPT(object):
 ########################################################################################################################
 
 
-class SMTrace_Exception(Exception):
-    """
-    @brief  HM data tracing exception class.
-    """
+class SMTrace_Exception(Exception):
+    """
+    @brief  HM data tracing exception class.
+    """
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pMssg=None):
+        """
+        @brief  Constructor.
+        @param  Mssg  The Exception message.
+        """
+        vFrm       = inspect.currentframe().f_back # only the raising frame, inspect.stack() would read source files
+        vSlf       = vFrm.f_locals.get("self")
+        self._modl = vFrm.f_globals.get("__name__") if (vSlf is None) else vSlf.__class__.__module__
+        self._clss = None                           if (vSlf is None) else vSlf.__class__.__name__
+        self._mthd = vFrm.f_code.co_name
+        self._mssg = ".".join(v for v in (self._modl, self._clss, self._mthd) if (v is not None))
+        if (pMssg != None): self._mssg = "{}: {}".format(self._mssg, pMssg)
+        del(vFrm)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __str__(self):
+        """
+        @brief  Prints a nicely string representation.
+        """
+        return repr(self._mssg)
+
+
+########################################################################################################################
+
+
+class SMTrace_Stats(object):
+    """
+    @brief  Counters and latency histograms of a meter or component.
+            Instances are shared by name via get(). While statistics are disabled get() returns None, so instrumented
+            code only pays for a comparison with None. Latencies are kept in log-linear histograms with 8 buckets per
+            power of two (at most 12.5 % relative error), from which percentiles are derived. Call tracing logs every
+            'trace'th hot path call via log_callinfo(); it is switched on and off at runtime by SIGUSR1.
+    """
+
+    BUCKETS = 320 # up to 2**42 ns
+    trace   = 0
+    __cfg   = dict()
+    __log   = None
+    __lck   = threading.Lock()
+    __reg   = dict()
+    __seq   = itertools.count()
+    __evt   = threading.Event()
+    __thd   = None
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def StatsInit(pCfg:dict, pLog:pyLOG.Log=None):
+        """
+        @brief  Sets the statistics configuration, starts the periodic dump and installs the SIGUSR1 handler toggling
+                the call tracing. Must be called before the meters are created.
+        @param  pCfg  A statistics configuration or None.
+        @param  pLog  Logger the statistics are dumped to.
+        """
+        SMTrace_Stats.__cfg = pCfg or dict()
+        SMTrace_Stats.__log = pLog
+        SMTrace_Stats.trace = SMTrace_Stats.__cfg.get("trace", 0)
+        if (hasattr(signal, "SIGUSR1") and (threading.current_thread() is threading.main_thread())):
+            signal.signal(signal.SIGUSR1, SMTrace_Stats.toggle)
+        if (SMTrace_Stats.__cfg.get("enabled", False) and SMTrace_Stats.__cfg.get("interval", 0) and (pLog is not None)):
+            SMTrace_Stats.__evt.clear()
+            SMTrace_Stats.__thd = threading.Thread(target=SMTrace_Stats.__run, name="SMTrace_Stats", daemon=True)
+            SMTrace_Stats.__thd.start()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def StatsStop():
+        """
+        @brief  Stops the periodic dump and dumps the statistics a last time.
+        """
+        SMTrace_Stats.__evt.set()
+        if (SMTrace_Stats.__thd is not None):
+            SMTrace_Stats.__thd.join()
+            SMTrace_Stats.__thd = None
+        if (SMTrace_Stats.__log is not None):
+            SMTrace_Stats.dump(SMTrace_Stats.__log)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def get(pName:str):
+        """
+        @brief  Returns the statistics registered under pName, created on first use, or None if disabled.
+        @param  pName  Name of the meter or component.
+        """
+        if (not SMTrace_Stats.__cfg.get("enabled", False)): return None
+        with SMTrace_Stats.__lck:
+            vSts = SMTrace_Stats.__reg.get(pName)
+            if (vSts is None):
+                vSts = SMTrace_Stats.__reg[pName] = SMTrace_Stats(pName)
+        return vSts
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def sample():
+        """
+        @brief  Returns whether the current hot path call is traced. Callers check 'trace' before, so this is only
+                called while tracing is switched on.
+        """
+        vTrc = SMTrace_Stats.trace
+        return (vTrc > 0) and ((next(SMTrace_Stats.__seq) % vTrc) == 0)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def toggle(signum=None, frame=None):
+        """
+        @brief  Switches the call tracing off or on with the configured sampling interval (every call if none).
+                Usable as signal handler.
+        """
+        SMTrace_Stats.trace = 0 if (SMTrace_Stats.trace) else max(1, SMTrace_Stats.__cfg.get("trace", 0))
+        if (SMTrace_Stats.__log is not None):
+            SMTrace_Stats.__log.log(pyLOG.LogLvl.INFO, "call tracing {}".format("of every {}. call on".format(SMTrace_Stats.trace) if (SMTrace_Stats.trace) else "off"))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def snapshots(pReset:bool=False):
+        """
+        @brief  Returns a dict of the snapshots of all registered statistics.
+        @param  pReset  Reset counters and histograms after taking the snapshots.
+        """
+        with SMTrace_Stats.__lck:
+            vRegs = list(SMTrace_Stats.__reg.values())
+        return {vSts.name: vSts.snapshot(pReset) for vSts in vRegs}
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def dump(pLog:pyLOG.Log):
+        """
+        @brief  Logs the snapshots of all registered statistics.
+        @param  pLog  Logger.
+        """
+        for vName, vSnap in SMTrace_Stats.snapshots(SMTrace_Stats.__cfg.get("reset", False)).items():
+            pLog.log(pyLOG.LogLvl.INFO, "stats '{}': {}".format(vName, vSnap))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def __run():
+        """
+        @brief  Dumps the statistics every 'interval' seconds.
+        """
+        while (not SMTrace_Stats.__evt.wait(SMTrace_Stats.__cfg["interval"])):
+            try:
+                SMTrace_Stats.dump(SMTrace_Stats.__log)
+            except Exception:
+                SMTrace_Stats.__log.log(pyLOG.LogLvl.ERROR, "{}".format(traceback.format_exc()))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def bucket(pValue:int):
+        """
+        @brief  Returns the histogram bucket of a value.
+        @param  pValue  A non negative integer.
+        """
+        if (pValue < 16): return pValue
+        vExp = pValue.bit_length() - 4
+        return min((vExp << 3) + (pValue >> vExp), SMTrace_Stats.BUCKETS - 1)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def lower(pBucket:int):
+        """
+        @brief  Returns the lowest value of a histogram bucket.
+        @param  pBucket  Bucket index.
+        """
+        if (pBucket < 16): return pBucket
+        vExp = (pBucket >> 3) - 1
+        return (pBucket - (vExp << 3)) << vExp
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pName:str):
+        """
+        @brief  Constructor.
+        @param  pName  Name of the meter or component.
+        """
+        self.name  = pName
+        self.__lck = threading.Lock()
+        self.__cnt = dict()
+        self.__gau = dict()
+        self.__hst = dict() # stage: [histogram, count, sum, max]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def count(self, pKey:str, pValue:int=1):
+        """
+        @brief  Adds pValue to a counter.
+        @param  pKey    Counter name.
+        @param  pValue  Increment.
+        """
+        with self.__lck:
+            self.__cnt[pKey] = self.__cnt.get(pKey, 0) + pValue
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def gauge(self, pKey:str, pFunc):
+        """
+        @brief  Registers a function whose value is taken at every snapshot, e.g. a counter kept elsewhere.
+        @param  pKey   Gauge name.
+        @param  pFunc  Callable without parameters.
+        """
+        self.__gau[pKey] = pFunc
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def record(self, pStage:str, pDuration:int):
+        """
+        @brief  Records a duration of a stage.
+        @param  pStage     Stage name.
+        @param  pDuration  Duration in nanoseconds.
+        """
+        vIdx = self.bucket(pDuration)
+        with self.__lck:
+            vHst = self.__hst.get(pStage)
+            if (vHst is None):
+                vHst = self.__hst[pStage] = [array.array("Q", bytes(8 * self.BUCKETS)), 0, 0, 0]
+            vHst[0][vIdx] += 1
+            vHst[1] += 1
+            vHst[2] += pDuration
+            if (pDuration > vHst[3]): vHst[3] = pDuration
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def percentile(self, pStage:str, pPercent:float):
+        """
+        @brief  Returns the upper bound in nanoseconds of the pPercent percentile of a stage, or None without records.
+        @param  pStage    Stage name.
+        @param  pPercent  Percentile, 0 < pPercent <= 100.
+        """
+        with self.__lck:
+            vHst = self.__hst.get(pStage)
+            if ((vHst is None) or (vHst[1] == 0)): return None
+            vLim = max(1, -(-vHst[1] * pPercent // 100))
+            vSum = 0
+            for vIdx, vCnt in enumerate(vHst[0]):
+                vSum += vCnt
+                if (vSum >= vLim): return min(self.lower(vIdx + 1) - 1, vHst[3])
+            return vHst[3]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def snapshot(self, pReset:bool=False):
+        """
+        @brief  Returns a dict of all counters, gauges and of count, average, percentiles and maximum in microseconds
+                per stage.
+        @param  pReset  Reset counters and histograms afterwards; gauges are not affected.
+        """
+        vRslt = dict()
+        for vKey, vFunc in self.__gau.items():
+            try   : vRslt[vKey] = vFunc()
+            except Exception: vRslt[vKey] = None
+        vStgs = dict()
+        for vStage in list(self.__hst):
+            vP50, vP90, vP99 = (self.percentile(vStage, p) for p in (50, 90, 99))
+            with self.__lck:
+                vHst = self.__hst[vStage]
+                vStgs[vStage] = dict(count=vHst[1], avg_us=round(vHst[2] / vHst[1] / 1000, 1) if (vHst[1]) else 0.0, p50_us=round((vP50 or 0) / 1000, 1), p90_us=round((vP90 or 0) / 1000, 1), p99_us=round((vP99 or 0) / 1000, 1), max_us=round(vHst[3] / 1000, 1))
+        with self.__lck:
+            vRslt.update(self.__cnt)
+            if (pReset):
+                self.__cnt.clear()
+                self.__hst.clear()
+        if (vStgs): vRslt["latency"] = vStgs
+        return vRslt
+
+
+########################################################################################################################
+
+
+class SMTrace_Mailer(object):
+    """
+    @brief  Process wide outbound mail dispatcher.
+            One dispatcher per SMTP account (server, port, authentication, type) keeps its connection alive between
+            sends, checks it via NOOP before reuse, sends all messages becoming due within 'batchdelay' seconds in one
+            session and retries failed sends with exponential backoff. Queued messages are spooled to disk, so unsent
+            mail survives a restart; a spooled message still failing temporarily after all retries is queued again
+            'backoffmax' seconds later, an unreadable one is renamed to '.failed'. Without an enabled 'pool' configuration every mail is sent via its own connection;
+            with 'sink' enabled mail is only logged and counted, e.g. for replays.
+    """
+
+    __cfg = None
+    __log = None
+    __mlr = dict()
+    __lck = threading.Lock()
+    sunk  = 0
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def MailInit(pCfg:dict, pHandlers:dict=None, pLog:pyLOG.Log=None):
+        """
+        @brief  Sets the mailer configuration and starts the dispatchers of all SMTP accounts used by pHandlers, which
+                resends mail spooled before a restart.
+        @param  pCfg       A mailer configuration or None.
+        @param  pHandlers  Report handler configurations.
+        @param  pLog       Logger for dispatcher messages.
+        """
+        SMTrace_Mailer.__cfg = pCfg
+        SMTrace_Mailer.__log = pLog
+        if ((pCfg is not None) and pCfg.get("pool", False) and (not pCfg.get("sink", False))):
+            for vHdl in (pHandlers or {}).values():
+                if ("srvr" in vHdl): SMTrace_Mailer.get(vHdl)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def MailStop(pTimeout:float=10.0):
+        """
+        @brief  Stops all dispatchers; messages not sent so far stay in the spool directory.
+        @param  pTimeout  Maximum time in seconds to wait for every dispatcher.
+        """
+        with SMTrace_Mailer.__lck:
+            vMlrs = list(SMTrace_Mailer.__mlr.values())
+            SMTrace_Mailer.__mlr.clear()
+        for vMlr in vMlrs:
+            vMlr.stop(pTimeout)
+            if (SMTrace_Mailer.__log is not None): SMTrace_Mailer.__log.log(pyLOG.LogLvl.INFO, "mailer '{}' stopped: {}".format(vMlr.name, vMlr.stats()))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def get(pCfg:dict):
+        """
+        @brief  Returns the dispatcher of the SMTP account of a report handler configuration.
+        @param  pCfg  A report handler configuration.
+        """
+        vKey = (pCfg["srvr"], pCfg["port"], tuple(pCfg["auth"]) if isinstance(pCfg["auth"], list) else pCfg["auth"], pCfg["type"])
+        with SMTrace_Mailer.__lck:
+            if (vKey not in SMTrace_Mailer.__mlr):
+                SMTrace_Mailer.__mlr[vKey] = SMTrace_Mailer(pCfg, SMTrace_Mailer.__cfg, SMTrace_Mailer.__log)
+            return SMTrace_Mailer.__mlr[vKey]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def connect(pCfg:dict, pTimeout:float=None):
+        """
+        @brief  Returns a SMTP connection to the account of a report handler configuration, logged in via STARTTLS if
+                configured. Used by the dispatchers and for unpooled sends.
+        @param  pCfg      A report handler configuration.
+        @param  pTimeout  Socket timeout in seconds or None.
+        """
+        vSmtp = smtplib.SMTP(pCfg["srvr"], pCfg["port"], timeout=pTimeout) if (pTimeout is not None) else smtplib.SMTP(pCfg["srvr"], pCfg["port"])
+        try:
+            if (    (pCfg["type"] == "STARTTLS"    )
+                and (isinstance(pCfg["auth"], list))
+                and (len(pCfg["auth"]) == 2        )
+               ):
+                vSmtp.starttls()
+                vSmtp.login(*pCfg["auth"])
+        except:
+            vSmtp.close()
+            raise
+        return vSmtp
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def sendmail(pCfg:dict, pMssg:email.message.Message, pLog:pyLOG.Log=None):
+        """
+        @brief  Sends a message via the account of a report handler configuration, pooled if configured. Returns
+                False if it could not be sent, True if it was sent, queued for a dispatcher or discarded by the sink.
+        @param  pCfg   A report handler configuration.
+        @param  pMssg  The message to send.
+        @param  pLog   Logger of the report handler.
+        """
+        if ((SMTrace_Mailer.__cfg is not None) and SMTrace_Mailer.__cfg.get("sink", False)):
+            with SMTrace_Mailer.__lck: SMTrace_Mailer.sunk += 1
+            if (pLog is not None):
+                vBody = pMssg.get_body(("plain",)) if isinstance(pMssg, email.message.EmailMessage) else None
+                pLog.log(pyLOG.LogLvl.INFO, "Email to '{fTo}' discarded by sink: {fSubj}\n{fText}".format(fTo=pCfg["to"], fSubj=pMssg["Subject"], fText=vBody.get_content() if (vBody is not None) else "<{} bytes>".format(len(pMssg.as_bytes()))))
+            return True
+        if ((SMTrace_Mailer.__cfg is not None) and SMTrace_Mailer.__cfg.get("pool", False)):
+            SMTrace_Mailer.get(pCfg).send(pMssg, pLog)
+            return True
+        vSts  = SMTrace_Stats.get("SMTP")
+        vStrt = time.perf_counter_ns()
+        try:
+            vSmtp = SMTrace_Mailer.connect(pCfg)
+        except Exception as e:
+            if (vSts is not None): vSts.count("failed")
+            if (pLog is not None): pLog.log(pyLOG.LogLvl.ERROR, "Could not login into '{fSrvr}:{fPort}': {fErr}".format(fSrvr=pCfg["srvr"], fPort=pCfg["port"], fErr=e))
+            return False
+        with vSmtp:
+            try:
+                vSmtp.send_message(pMssg, from_addr=None, to_addrs=None)
+                if (vSts is not None): vSts.record("smtp", time.perf_counter_ns() - vStrt)
+                if (vSts is not None): vSts.count("sent")
+                if (pLog is not None): pLog.log(pyLOG.LogLvl.INFO, "Email successfully sent to '{fTo}'".format(fTo=pCfg["to"]))
+                return True
+            except:
+                if (vSts is not None): vSts.count("failed")
+                if (pLog is not None): pLog.log(pyLOG.LogLvl.ERROR, "Could not send email to '{fTo}'".format(fTo=pCfg["to"]))
+                return False
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pCfg:dict, pPool:dict=None, pLog:pyLOG.Log=None):
+        """
+        @brief  Constructor.
+        @param  pCfg   A report handler configuration defining the SMTP account.
+        @param  pPool  A mailer configuration.
+        @param  pLog   Logger for dispatcher messages.
+        """
+        pPool = pPool or {}
+        self.name   = "{}:{}".format(pCfg["srvr"], pCfg["port"])
+        self.__cfg  = pCfg
+        self.__log  = pLog
+        self.__bdly = pPool.get("batchdelay", 2.0)
+        self.__bmin = pPool.get("backoff", 5.0)
+        self.__bmax = pPool.get("backoffmax", 300.0)
+        self.__idle = pPool.get("idle", 60.0)
+        self.__rtry = pPool.get("retries", 5)
+        self.__tout = pPool.get("timeout", 30.0)
+        self.__spl  = None
+        self.__seq  = 0
+        self.__que  = queue.Queue()
+        self.__dfr  = deque() # (due time, item) of spooled messages queued again later
+        self.__evt  = threading.Event()
+        self.__lck  = threading.Lock()
+        self.__cnt  = dict(queued=0, sent=0, failed=0, retries=0, connects=0)
+        self.__lat  = [0, 0, 0] # count, sum, max of the SMTP transaction duration in ns
+        self.__sts  = SMTrace_Stats.get("SMTP")
+        if (pPool.get("spool") is not None):
+            self.__spl = os.path.join(pPool["spool"], re.sub(r"\W+", "_", self.name))
+            os.makedirs(self.__spl, exist_ok=True)
+            for vName in sorted(os.listdir(self.__spl)):
+                if (vName.endswith(".eml")):
+                    self.__que.put((None, None, os.path.join(self.__spl, vName)))
+                    self.__cnt["queued"] += 1
+        self.__thd  = threading.Thread(target=self.__run, name="SMTrace_Mailer_{}".format(self.name), daemon=True)
+        self.__thd.start()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def send(self, pMssg:email.message.Message, pLog:pyLOG.Log=None):
+        """
+        @brief  Spools and enqueues a message for sending; a spooled message is only kept on disk until it is sent.
+        @param  pMssg  The message to send.
+        @param  pLog   Logger to report the outcome to.
+        """
+        vPath = None
+        if (self.__spl is not None):
+            with self.__lck:
+                self.__seq += 1
+                vPath = os.path.join(self.__spl, "{:020d}_{:06d}.eml".format(time.time_ns(), self.__seq))
+            with open(vPath + ".tmp", "wb") as vFhdl:
+                vFhdl.write(pMssg.as_bytes())
+            os.replace(vPath + ".tmp", vPath)
+        with self.__lck: self.__cnt["queued"] += 1
+        self.__que.put((pMssg if (vPath is None) else None, pLog, vPath))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def stats(self):
+        """
+        @brief  Returns a dict of the dispatcher counters and SMTP transaction latencies in milliseconds.
+        """
+        with self.__lck:
+            vRslt = dict(self.__cnt)
+            vRslt["pending"] = self.__que.qsize()
+            vRslt["deferred"] = len(self.__dfr)
+            vRslt["latency"] = dict(count=self.__lat[0], avg_ms=(self.__lat[1] // self.__lat[0] // 1000000) if (self.__lat[0]) else 0, max_ms=self.__lat[2] // 1000000)
+        return vRslt
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def stop(self, pTimeout:float=10.0):
+        """
+        @brief  Stops the dispatcher after the current batch.
+        @param  pTimeout  Maximum time in seconds to wait for the dispatcher.
+        """
+        self.__evt.set()
+        self.__que.put(None)
+        self.__thd.join(pTimeout)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __quit(self, pSmtp:smtplib.SMTP):
+        """
+        @brief  Closes a connection, ignoring errors, and returns None.
+        @param  pSmtp  A SMTP connection or None.
+        """
+        if (pSmtp is not None):
+            try   : pSmtp.quit()
+            except: pSmtp.close()
+        return None
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __reuse(self, pSmtp:smtplib.SMTP):
+        """
+        @brief  Returns pSmtp if it is still usable, otherwise a new connection.
+        @param  pSmtp  A SMTP connection or None.
+        """
+        if (pSmtp is not None):
+            try:
+                if (pSmtp.noop()[0] == 250): return pSmtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.__quit(pSmtp)
+        vSmtp = self.connect(self.__cfg, self.__tout)
+        with self.__lck: self.__cnt["connects"] += 1
+        return vSmtp
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __deliver(self, pSmtp:smtplib.SMTP, pBatch:list):
+        """
+        @brief  Sends a batch of messages and returns the connection for reuse.
+        @param  pSmtp   A SMTP connection or None.
+        @param  pBatch  List of tuples (message or None to read it from the spool file, logger, spool file).
+        """
+        for vMssg, vLog, vPath in pBatch:
+            vLog = vLog or self.__log
+            vTry = 0
+            if (vMssg is None):
+                try:
+                    with open(vPath, "rb") as vFhdl:
+                        vMssg = email.message_from_bytes(vFhdl.read(), policy=email.policy.SMTP)
+                except Exception as e:
+                    with self.__lck: self.__cnt["failed"] += 1
+                    if (self.__sts is not None): self.__sts.count("failed")
+                    if (vLog is not None): vLog.log(pyLOG.LogLvl.ERROR, "Could not read spooled email '{fPath}': {fErr}".format(fPath=vPath, fErr=e))
+                    try   : os.replace(vPath, vPath[:-4] + ".failed")
+                    except OSError: pass
+                    continue
+            while (True):
+                vTstmp = time.perf_counter_ns()
+                try:
+                    pSmtp = self.__reuse(pSmtp)
+                    pSmtp.send_message(vMssg, from_addr=None, to_addrs=None)
+                except Exception as e:
+                    vPerm = (   isinstance(e, smtplib.SMTPRecipientsRefused)
+                             or (isinstance(e, smtplib.SMTPResponseException) and (500 <= e.smtp_code < 600))
+                             or (not isinstance(e, (smtplib.SMTPException, OSError)))) # e.g. a message without recipients
+                    pSmtp = self.__quit(pSmtp)
+                    vTry += 1
+                    if (vPerm or (vTry > self.__rtry) or self.__evt.is_set()):
+                        with self.__lck: self.__cnt["failed"] += 1
+                        if (self.__sts is not None): self.__sts.count("failed")
+                        if (vLog is not None): vLog.log(pyLOG.LogLvl.ERROR, "Could not send email to '{fTo}': {fErr}".format(fTo=vMssg["To"], fErr=e))
+                        if   ((vPath is not None) and (vPerm)                    ): os.replace(vPath, vPath[:-4] + ".failed")
+                        elif ((vPath is not None) and (not self.__evt.is_set())): self.__dfr.append((time.monotonic() + self.__bmax, (None, vLog, vPath)))
+                        break
+                    with self.__lck: self.__cnt["retries"] += 1
+                    self.__evt.wait(min(self.__bmin * (2 ** (vTry - 1)), self.__bmax))
+                    continue
+                vDur = time.perf_counter_ns() - vTstmp
+                with self.__lck:
+                    self.__cnt["sent"] += 1
+                    self.__lat[0] += 1
+                    self.__lat[1] += vDur
+                    self.__lat[2]  = max(self.__lat[2], vDur)
+                if (self.__sts is not None):
+                    self.__sts.count("sent")
+                    self.__sts.record("smtp", vDur)
+                if (vPath is not None): os.remove(vPath)
+                if (vLog  is not None): vLog.log(pyLOG.LogLvl.INFO, "Email successfully sent to '{fTo}'".format(fTo=vMssg["To"]))
+                break
+        return pSmtp
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __run(self):
+        """
+        @brief  Dispatcher thread collecting batches of due messages and sending them.
+        """
+        vSmtp = None
+        vStop = False
+        vLast = time.monotonic()
+        while (not vStop):
+            vNow = time.monotonic()
+            while (self.__dfr and (self.__dfr[0][0] <= vNow)):
+                self.__que.put(self.__dfr.popleft()[1])
+            vTout = ([vLast + self.__idle - vNow] if (vSmtp is not None) else []) + ([self.__dfr[0][0] - vNow] if (self.__dfr) else [])
+            try:
+                vItem = self.__que.get(timeout=max(0.0, min(vTout)) if (vTout) else None)
+            except queue.Empty:
+                if ((vSmtp is not None) and (time.monotonic() >= vLast + self.__idle)): vSmtp = self.__quit(vSmtp)
+                continue
+            if (vItem is None): break
+            vBatch = [vItem]
+            vDline = time.monotonic() + self.__bdly
+            while (not self.__evt.is_set()):
+                try:
+                    vItem = self.__que.get(timeout=max(0.0, vDline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if (vItem is None):
+                    vStop = True
+                    break
+                vBatch.append(vItem)
+            vSmtp = self.__deliver(vSmtp, vBatch)
+            vLast = time.monotonic()
+        self.__quit(vSmtp)
+
+
+########################################################################################################################
+
+
+class SMTrace_Store(object):
+    """
+    @brief  Compact in-memory time series store of numeric values per key.
+            Every key owns a ring buffer of (timestamp, value) pairs held in arrays, optionally downsampled to one
+            sample per step and capped to a retention count. Aggregates (count, sum, min, max, first, last) of the
+            current report window are updated incrementally on every value. The last value of a key in the previous
+            window is kept as baseline of the delta, so consecutive deltas add up without counting that value twice.
+    """
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pRetention:int=0, pStep:float=0.0):
+        """
+        @brief  Constructor.
+        @param  pRetention  Number of samples kept per key; 0 keeps window aggregates only.
+        @param  pStep       Minimum distance in seconds between two kept samples of a key; 0 keeps every sample.
+        """
+        if (not isinstance(pRetention, int)): raise SMTrace_Exception("Parameter 'pRetention' is not of type 'int'.")
+        self.__cap  = pRetention
+        self.__stp  = int(pStep * 1000000000)
+        self.__lck  = threading.Lock()
+        self.__ser  = dict() # key -> [timestamps, values, next index, count]
+        self.__win  = dict() # key -> [count, sum, min, max, first, last, first timestamp, last timestamp]
+        self.__base = dict() # key -> last value of the previous window
+        self.__wbeg = time.time_ns()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def add(self, pKey, pTstmp:int, pValue:float):
+        """
+        @brief  Adds a value.
+        @param  pKey    Key of the value.
+        @param  pTstmp  Integer number of nanoseconds since the epoch.
+        @param  pValue  Numeric value.
+        """
+        with self.__lck:
+            vWin = self.__win.get(pKey)
+            if (vWin is None):
+                self.__win[pKey] = [1, pValue, pValue, pValue, pValue, pValue, pTstmp, pTstmp]
+            else:
+                vWin[0] += 1
+                vWin[1] += pValue
+                if (pValue < vWin[2]): vWin[2] = pValue
+                if (pValue > vWin[3]): vWin[3] = pValue
+                vWin[5]  = pValue
+                vWin[7]  = pTstmp
+            if (self.__cap):
+                vSer = self.__ser.get(pKey)
+                if (vSer is None):
+                    vSer = self.__ser[pKey] = [array.array("q", bytes(8 * self.__cap)), array.array("d", bytes(8 * self.__cap)), 0, 0]
+                elif ((self.__stp) and ((pTstmp - vSer[0][vSer[2] - 1]) < self.__stp)):
+                    return
+                vSer[0][vSer[2]] = pTstmp
+                vSer[1][vSer[2]] = pValue
+                vSer[2] = (vSer[2] + 1) % self.__cap
+                vSer[3] = min(vSer[3] + 1, self.__cap)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def series(self, pKey, pStart:int=None, pEnd:int=None):
+        """
+        @brief  Returns the kept samples of a key as list of tuples (timestamp, value), oldest first.
+        @param  pKey    Key of the values.
+        @param  pStart  Only samples at or after this timestamp in nanoseconds since the epoch, if not None.
+        @param  pEnd    Only samples before this timestamp in nanoseconds since the epoch, if not None.
+        """
+        with self.__lck:
+            vSer = self.__ser.get(pKey)
+            if (vSer is None): return []
+            vIdx = [(vSer[2] - vSer[3] + i) % self.__cap for i in range(vSer[3])]
+            vRslt = [(vSer[0][i], vSer[1][i]) for i in vIdx]
+        return [x for x in vRslt if (((pStart is None) or (x[0] >= pStart)) and ((pEnd is None) or (x[0] < pEnd)))]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def window(self, pReset:bool=True):
+        """
+        @brief  Returns the tuple (window start, window end, aggregates) of the current window, with aggregates being a
+                dict mapping every key with values in the window onto a dict of count, min, max, mean, first, last and
+                delta. The delta is taken from the last value of the previous window, if any. With pReset a new, empty
+                window is started.
+        @param  pReset  Start a new window.
+        """
+        with self.__lck:
+            vEnd  = time.time_ns()
+            vBeg  = self.__wbeg
+            vRslt = {k: dict(count=v[0], min=v[2], max=v[3], mean=v[1]/v[0], first=v[4], last=v[5], delta=v[5]-self.__base.get(k, v[4]), tfirst=v[6], tlast=v[7]) for k,v in self.__win.items()}
+            if (pReset):
+                self.__wbeg = vEnd
+                self.__base.update({k: v[5] for k,v in self.__win.items()})
+                self.__win  = dict()
+        return vBeg, vEnd, vRslt
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def state(self):
+        """
+        @brief  Returns the current window and the kept samples as JSON serialisable dict, the samples base64 encoded.
+        """
+        with self.__lck:
+            return dict(wbeg=self.__wbeg,
+                        win={k: list(v) for k,v in self.__win.items()},
+                        base=dict(self.__base),
+                        cap=self.__cap,
+                        ser={k: [base64.b64encode(v[0].tobytes()).decode("ascii"), base64.b64encode(v[1].tobytes()).decode("ascii"), v[2], v[3]] for k,v in self.__ser.items()})
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def restore(self, pState:dict):
+        """
+        @brief  Continues the window and, if the retention is unchanged, the kept samples of a state().
+        @param  pState  A dict returned by state().
+        """
+        with self.__lck:
+            self.__wbeg = pState["wbeg"]
+            self.__win  = {k: list(v) for k,v in pState["win"].items()}
+            self.__base = dict(pState.get("base", dict()))
+            if (pState["cap"] == self.__cap):
+                self.__ser = {k: [array.array("q", base64.b64decode(v[0])), array.array("d", base64.b64decode(v[1])), v[2], v[3]] for k,v in pState["ser"].items()}
+
+
+########################################################################################################################
+
+
+class SMTrace_Archive(object):
+    """
+    @brief  Reader of the archive written by the SMTrace_Report.Archive handler.
+            The archive directory of a meter holds one segment file per UTC day ('YYYYMMDD.seg') of fixed-width records
+            (timestamp in ns, key id, value) in order of reception and 'index.json', which maps the keys onto ids and
+            units and lists the days whose records are not in time order (e.g. after a backfill). Segments are memory
+            mapped and searched binary by time, so a query only touches the pages of the requested range.
+    """
+
+    RECORD = struct.Struct("<qId")
+    DTYPE  = None if (numpy is None) else numpy.dtype([("t", "<i8"), ("k", "<u4"), ("v", "<f8")])
+    INDEX  = "index.json"
+    FUNCS  = ("count", "sum", "min", "max", "mean", "first", "last", "delta")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def day(pTstmp:int):
+        """
+        @brief  Returns the segment name 'YYYYMMDD' of a timestamp.
+        @param  pTstmp  Integer number of nanoseconds since the epoch.
+        """
+        return time.strftime("%Y%m%d", time.gmtime(pTstmp // 1000000000))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def directory(pLocation:str, pName:str):
+        """
+        @brief  Returns the archive directory of a meter.
+        @param  pLocation  Base directory of the archive.
+        @param  pName      Name of the meter.
+        """
+        return os.path.join(pLocation, re.sub(r"[^\w.-]+", "_", pName).strip("_"))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def index(pPath:str, pIndex:dict=None):
+        """
+        @brief  Returns the index of an archive directory; with pIndex given it is written (atomically) before.
+        @param  pPath   Archive directory of a meter.
+        @param  pIndex  Index to write or None.
+        """
+        vName = os.path.join(pPath, SMTrace_Archive.INDEX)
+        if (pIndex is not None):
+            with open(vName + ".tmp", "w") as fhdl:
+                json.dump(pIndex, fhdl)
+                fhdl.flush()
+                os.fsync(fhdl.fileno())
+            os.replace(vName + ".tmp", vName)
+            return pIndex
+        if (not os.path.isfile(vName)):
+            return dict(keys=dict(), unsorted=[])
+        with open(vName, "r") as fhdl:
+            return json.load(fhdl)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pPath:str):
+        """
+        @brief  Constructor.
+        @param  pPath  Archive directory of a meter.
+        """
+        if (not os.path.isdir(pPath)): raise SMTrace_Exception("Archive directory '{}' does not exist.".format(pPath))
+        self.__path = pPath
+        self.__idx  = self.index(pPath)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def keys(self):
+        """
+        @brief  Returns a dict of all archived keys and their units.
+        """
+        return {k: v[1] for k,v in self.__idx["keys"].items()}
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def days(self):
+        """
+        @brief  Returns the sorted list of the days with a segment file.
+        """
+        return sorted(vName[:-4] for vName in os.listdir(self.__path) if re.fullmatch(r"\d{8}\.seg", vName))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __segment(self, pDay:str, pId:int, pStart:int, pEnd:int):
+        """
+        @brief  Returns the tuple (timestamps, values) of the records of a key within [pStart, pEnd) of a segment.
+        @param  pDay    Segment name.
+        @param  pId     Key id.
+        @param  pStart  Start timestamp in nanoseconds since the epoch (incl.).
+        @param  pEnd    End timestamp in nanoseconds since the epoch (excl.).
+        """
+        vName = os.path.join(self.__path, pDay + ".seg")
+        vSize = self.RECORD.size
+        vCnt  = os.path.getsize(vName) // vSize # ignores a partially written last record
+        vSort = pDay not in self.__idx["unsorted"]
+        if (not vCnt):
+            return [], []
+        if (numpy is not None):
+            vRec = numpy.memmap(vName, dtype=self.DTYPE, mode="r", shape=(vCnt,))
+            if (vSort):
+                vRec = vRec[numpy.searchsorted(vRec["t"], pStart, "left"):numpy.searchsorted(vRec["t"], pEnd, "left")]
+                vMsk = (vRec["k"] == pId)
+            else:
+                vMsk = (vRec["k"] == pId) & (vRec["t"] >= pStart) & (vRec["t"] < pEnd)
+            vRslt = numpy.array(vRec["t"][vMsk]), numpy.array(vRec["v"][vMsk])
+            del(vRec)
+            return vRslt
+        vTs = []
+        vVs = []
+        with open(vName, "rb") as fhdl, mmap.mmap(fhdl.fileno(), vCnt * vSize, access=mmap.ACCESS_READ) as vMap:
+            vBeg = 0
+            vEnd = vCnt
+            if (vSort):
+                for vLim, vIsEnd in ((pStart, False), (pEnd, True)):
+                    vLo, vHi = 0, vCnt
+                    while (vLo < vHi):
+                        vMid = (vLo + vHi) // 2
+                        if (self.RECORD.unpack_from(vMap, vMid * vSize)[0] < vLim): vLo = vMid + 1
+                        else                                                     : vHi = vMid
+                    if (vIsEnd): vEnd = vLo
+                    else       : vBeg = vLo
+            for vT, vK, vV in self.RECORD.iter_unpack(vMap[vBeg * vSize:vEnd * vSize]):
+                if ((vK == pId) and (pStart <= vT < pEnd)):
+                    vTs.append(vT)
+                    vVs.append(vV)
+        return vTs, vVs
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def scan(self, pKey:str, pStart:int=None, pEnd:int=None):
+        """
+        @brief  Returns the tuple (timestamps, values) of a key within [pStart, pEnd) in time order, as numpy arrays if
+                numpy is available, otherwise as lists.
+        @param  pKey    Key as reported, e.g. an OBIS description.
+        @param  pStart  Start timestamp in nanoseconds since the epoch (incl.) or None.
+        @param  pEnd    End timestamp in nanoseconds since the epoch (excl.) or None.
+        """
+        if (pKey not in self.__idx["keys"]): raise SMTrace_Exception("Key '{}' is not archived.".format(pKey))
+        vId    = self.__idx["keys"][pKey][0]
+        vStart = -(1 << 63) if (pStart is None) else pStart
+        vEnd   = (1 << 63) - 1 if (pEnd is None) else pEnd
+        vFrst  = None if (pStart is None) else self.day(pStart - 86400000000000)
+        vLast  = None if (pEnd   is None) else self.day(pEnd   + 86400000000000)
+        vDays  = [d for d in self.days() if (((vFrst is None) or (d >= vFrst)) and ((vLast is None) or (d <= vLast)))]
+        vParts = [self.__segment(d, vId, vStart, vEnd) for d in vDays]
+        vSort  = all(d not in self.__idx["unsorted"] for d in vDays)
+        if (numpy is not None):
+            vTs = numpy.concatenate([p[0] for p in vParts]) if (vParts) else numpy.zeros(0, "<i8")
+            vVs = numpy.concatenate([p[1] for p in vParts]) if (vParts) else numpy.zeros(0, "<f8")
+            if (not vSort):
+                vOrd = numpy.argsort(vTs, kind="stable")
+                vTs, vVs = vTs[vOrd], vVs[vOrd]
+            return vTs, vVs
+        vTs = [t for p in vParts for t in p[0]]
+        vVs = [v for p in vParts for v in p[1]]
+        if (not vSort):
+            vOrd = sorted(range(len(vTs)), key=vTs.__getitem__)
+            vTs, vVs = [vTs[i] for i in vOrd], [vVs[i] for i in vOrd]
+        return vTs, vVs
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def aggregate(self, pKey:str, pFunc:str, pStart:int=None, pEnd:int=None, pBucket:float=None):
+        """
+        @brief  Returns a list of tuples (bucket start in ns, value) of an aggregation of a key within [pStart, pEnd).
+        @param  pKey     Key as reported, e.g. an OBIS description.
+        @param  pFunc    One of FUNCS; 'delta' is last minus first value, e.g. the energy consumed.
+        @param  pStart   Start timestamp in nanoseconds since the epoch (incl.) or None.
+        @param  pEnd     End timestamp in nanoseconds since the epoch (excl.) or None.
+        @param  pBucket  Bucket width in seconds, aligned to the epoch (i.e. UTC); None for one bucket.
+        """
+        if (pFunc not in self.FUNCS): raise SMTrace_Exception("Aggregation '{}' is not one of {}.".format(pFunc, self.FUNCS))
+        vTs, vVs = self.scan(pKey, pStart, pEnd)
+        if (not len(vTs)):
+            return []
+        vWid = int(pBucket * 1000000000) if (pBucket) else None
+        if (numpy is not None):
+            vBkt = (vTs // vWid) * vWid if (vWid) else numpy.full(len(vTs), vTs[0] if (pStart is None) else pStart)
+            vBeg = numpy.concatenate(([0], numpy.flatnonzero(numpy.diff(vBkt)) + 1))
+            vEnd = numpy.concatenate((vBeg[1:], [len(vTs)]))
+            vRslt = {"count": lambda: vEnd - vBeg,
+                     "sum"  : lambda: numpy.add.reduceat(vVs, vBeg),
+                     "min"  : lambda: numpy.minimum.reduceat(vVs, vBeg),
+                     "max"  : lambda: numpy.maximum.reduceat(vVs, vBeg),
+                     "mean" : lambda: numpy.add.reduceat(vVs, vBeg) / (vEnd - vBeg),
+                     "first": lambda: vVs[vBeg],
+                     "last" : lambda: vVs[vEnd - 1],
+                     "delta": lambda: vVs[vEnd - 1] - vVs[vBeg]}[pFunc]()
+            return [(int(b), r.item()) for b,r in zip(vBkt[vBeg], vRslt)]
+        vGrps = OrderedDict()
+        for vT, vV in zip(vTs, vVs):
+            vGrps.setdefault((vT // vWid) * vWid if (vWid) else (vTs[0] if (pStart is None) else pStart), []).append(vV)
+        vFunc = {"count": len, "sum": sum, "min": min, "max": max, "mean": lambda v: sum(v) / len(v), "first": lambda v: v[0], "last": lambda v: v[-1], "delta": lambda v: v[-1] - v[0]}[pFunc]
+        return [(b, vFunc(v)) for b,v in vGrps.items()]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def cli(pPath:str, pKey:str=None, pStart:str=None, pEnd:str=None, pFunc:str=None, pBucket:float=None):
+        """
+        @brief  Returns the text of a command line query: the keys, units and days of the archive without pKey,
+                otherwise lines 'time;value' of the records or of their aggregation, with times in local ISO format.
+        @param  pPath    Archive directory of a meter.
+        @param  pKey     Key as reported or None.
+        @param  pStart   Start time in ISO format (incl.), local time unless it has an offset, or None.
+        @param  pEnd     End time in ISO format (excl.), local time unless it has an offset, or None.
+        @param  pFunc    One of FUNCS or None for the records.
+        @param  pBucket  Bucket width in seconds of the aggregation; None for one bucket.
+        """
+        vArc  = SMTrace_Archive(pPath)
+        vNs   = lambda s: None if (s is None) else round(datetime.datetime.fromisoformat(s).timestamp() * 1000000) * 1000
+        vIso  = lambda t: datetime.datetime.fromtimestamp(t / 1E9).isoformat(timespec="milliseconds")
+        vText = ""
+        if (pKey is None):
+            vDays = vArc.days()
+            for k,v in sorted(vArc.keys().items()):
+                vText += "{};{}\n".format(k, v if (v is not None) else "--")
+            vText += "days;{}\n".format("{} - {} ({})".format(vDays[0], vDays[-1], len(vDays)) if (vDays) else "--")
+        elif (pFunc is None):
+            for vT, vV in zip(*vArc.scan(pKey, vNs(pStart), vNs(pEnd))):
+                vText += "{};{}\n".format(vIso(int(vT)), float(vV))
+        else:
+            for vT, vV in vArc.aggregate(pKey, pFunc, vNs(pStart), vNs(pEnd), pBucket):
+                vText += "{};{}\n".format(vIso(vT), vV)
+        return vText
+
+
+########################################################################################################################
+
+
+class SMTrace_Report(object):
+    """
+    @brief  HM reporting class.
+    """
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    class EMailTxt(object):
+
+        MODES = ("last", "aggregate")
+
+        def __init__(self, pCfg:dict, pTrg:apscheduler.schedulers.background.BackgroundScheduler, pLog:pyLOG.Log=None, pIdf=None):
+            self.__cfg = pCfg
+            self.__dat = dict()
+            self.__idf = pIdf
+            self.__log = pLog
+            self.__mod = self.__cfg.get("mode", "last")
+            self.__sto = SMTrace_Store(self.__cfg.get("retention", 0), self.__cfg.get("downsample", 0.0))
+            self.__trg = pTrg
+            self.__sel = None if (self.__cfg.get("aggregate") is None) else frozenset(SMTrace_SMLDecoder.obis(x) for x in self.__cfg["aggregate"])
+            if (self.__mod not in self.MODES): raise SMTrace_Exception("Mode '{}' is not one of {}.".format(self.__mod, self.MODES))
+            self.__job = [self.__trg.add_job(self, trigger=apscheduler.triggers.cron.CronTrigger().from_crontab(v_cron)) for v_cron in self.__cfg["cron"]]
+
+        @property
+        def store(self):
+            """
+            @brief  Returns the SMTrace_Store of the numeric values.
+            """
+            return self.__sto
+
+        def __call__(self):
+            vSubj = None
+            vText = None
+            vMssg = email.message.EmailMessage()
+            if   (self.__mod == "aggregate"): vText = self.__text_aggregate()
+            elif (self.__dat               ): vText = self.__text_last()
+            if (vText):
+                vMssg.add_header("From", self.__cfg["from"])
+                vMssg.add_header("To",   self.__cfg["to"  ])
+                if (self.__cfg["cc"]       is not None): vMssg.add_header("Cc",      self.__cfg["cc"].replace(";", ",").strip(","))
+                if (self.__cfg["subjprfx"] is not None): vSubj = self.__cfg["subjprfx"]
+                if (self.__idf             is not None): vSubj = self.__idf if (vSubj is None) else vSubj + self.__idf
+                if (vSubj                  is not None): vMssg.add_header("Subject", vSubj)
+                vMssg.set_content(vText)
+                SMTrace_Mailer.sendmail(self.__cfg, vMssg, self.__log)
+
+        def __text_last(self):
+            """
+            @brief  Returns the report text listing the last value of every key.
+            """
+            vText = ""
+            vData = dict(self.__dat)
+            vMaxLenKey  = max([0] + [len(x) for x in vData.keys()])
+            vMaxLenUnit = max([2] + [len(v[2]) for k,v in vData.items() if v[2] is not None])
+            for k,v in sorted(vData.items(), key=lambda x: [x[1][0], x[0]]):
+                vKey  = k
+                vUnit = v[2]
+                if (isinstance(vKey,  bytes)): vKey  = vKey.decode("utf-8")
+                if (isinstance(vUnit, bytes)): vUnit = vUnit.decode("utf-8")
+                vText += "{fTstmp} | {fKey:<{fKeyWidth}} | {fUnit:<{fUnitWidth}} | {fValu}\n".format(fTstmp=datetime.datetime.utcfromtimestamp(v[0]/1E9).isoformat(), fKey=vKey, fKeyWidth=vMaxLenKey, fUnit=vUnit if (vUnit is not None) else "--", fUnitWidth=vMaxLenUnit, fValu=v[1] if (v[1] is not None) else "--")
+            return vText
+
+        def __text_aggregate(self):
+            """
+            @brief  Returns the report text listing min, max, mean and delta of every numeric key within the report window
+                    and starts a new window.
+            """
+            vBeg, vEnd, vAggr = self.__sto.window()
+            if (not vAggr): return None
+            vText = "{} - {}\n".format(datetime.datetime.utcfromtimestamp(vBeg/1E9).isoformat(), datetime.datetime.utcfromtimestamp(vEnd/1E9).isoformat())
+            vMaxLenKey  = max([0] + [len(x) for x in vAggr.keys()])
+            vMaxLenUnit = max([2] + [len(self.__dat[k][2]) for k in vAggr.keys() if ((k in self.__dat) and (self.__dat[k][2] is not None))])
+            for k,v in sorted(vAggr.items()):
+                vUnit = self.__dat[k][2] if (k in self.__dat) else None
+                vText += "{fKey:<{fKeyWidth}} | {fUnit:<{fUnitWidth}} | min {fMin} | max {fMax} | mean {fMean:.6g} | delta {fDelta:.6g} | n {fCnt}\n".format(fKey=k, fKeyWidth=vMaxLenKey, fUnit=vUnit if (vUnit is not None) else "--", fUnitWidth=vMaxLenUnit, fMin=v["min"], fMax=v["max"], fMean=v["mean"], fDelta=v["delta"], fCnt=v["count"])
+            return vText
+
+        def state(self):
+            """
+            @brief  Returns the last values and the report window as JSON serialisable dict.
+            """
+            return dict(dat=dict(self.__dat), sto=self.__sto.state())
+
+        def restore(self, pState:dict):
+            """
+            @brief  Restores the last values and the report window of a state().
+            @param  pState  A dict returned by state().
+            """
+            self.__dat.update({k: list(v) for k,v in pState["dat"].items()})
+            self.__sto.restore(pState["sto"])
+
+        def close(self):
+            """
+            @brief  Removes the cron jobs.
+            """
+            SMTrace_Report.unschedule(self.__job)
+
+        def log(self, pTimestamp:int, pData:dict, pObis:dict=None):
+            """
+            @brief  tbd
+            @param  pTimestamp  Integer number of nanoseconds since the epoch.
+            @param  pData       tbd
+            @param  pObis       A dict mapping the keys of pData onto their 6 byte object names; None if unknown.
+            """
+            if (not isinstance(pTimestamp, int) ): raise SMTrace_Exception("Parameter 'pTimestamp' is not of type 'int'.")
+            if (not isinstance(pData,      dict)): raise SMTrace_Exception("Parameter 'pData' is not of type 'dict'.")
+            for k,v in pData.items():
+                if (not isinstance(v, dict)           ): raise SMTrace_Exception("Value for key '{}' of parameter 'pData' is not of type 'dict'.".format(k))
+                if (v.keys() != {"unit", "valu"}      ): raise SMTrace_Exception("Value for key '{}' of parameter 'pData' does not include exactly the keys 'valu' and 'unit'.".format(k))
+            for k,v in pData.items():
+                vValu = v["valu"]
+                self.__dat[k] = [pTimestamp, vValu, v["unit"]]
+                if (    (isinstance(vValu, (int, float)))
+                    and (not isinstance(vValu, bool)   )
+                    and ((self.__sel is None) or ((pObis is not None) and (pObis.get(k) in self.__sel)))
+                   ):
+                    self.__sto.add(k, pTimestamp, vValu)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    class EMailSml(object):
+
+        COMPRESS = {"gzip": (gzip.open, ".gz", "gzip"), "xz": (lzma.open, ".xz", "x-xz")}
+        MAXSIZE  = 10485760 # default attachment size per mail, bounds the memory of a part
+
+        def __init__(self, pCfg:dict, pTrg:apscheduler.schedulers.background.BackgroundScheduler, pLog:pyLOG.Log=None, pIdf=None):
+            self.__cfg = pCfg
+            self.__cnt = 0
+            self.__dat = None
+            self.__idb = None
+            self.__idf = pIdf
+            self.__lck = threading.Lock()
+            self.__log = pLog
+            self.__nam = None
+            self.__orp = [] # capture files of a previous run, reported with the next one
+            self.__trg = pTrg
+            if (self.__cfg.get("compress") not in [None] + list(self.COMPRESS.keys())): raise SMTrace_Exception("Compression '{}' is not one of {}.".format(self.__cfg["compress"], list(self.COMPRESS.keys())))
+            self.__job = [self.__trg.add_job(self, trigger=apscheduler.triggers.cron.CronTrigger().from_crontab(v_cron)) for v_cron in self.__cfg["cron"]]
+            self.__open(time.time_ns())
+
+        def __del__(self):
+            self.__close()
+
+        def __call__(self):
+            with self.__lck:
+                if (self.__dat is None): return # closed
+                self.__orp.append(self.__nam)
+                self.__close()
+                self.__open(time.time_ns())
+            self.send()
+
+        def send(self):
+            """
+            @brief  Mails the closed capture files not reported so far.
+            """
+            with self.__lck:
+                vOrph, self.__orp = self.__orp, []
+            for vFile in vOrph:
+                try:
+                    vFile = self.__send(vFile)
+                except Exception as e:
+                    if (self.__log is not None): self.__log.log(pyLOG.LogLvl.ERROR, "Could not send capture file '{}': {}: {}".format(vFile, type(e).__name__, e))
+                if ((vFile is not None) and os.path.isfile(vFile)):
+                    with self.__lck: self.__orp.append(vFile) # reported again with the next capture file
+
+        def __send(self, pName:str):
+            """
+            @brief  Mails a closed capture file, split into parts of at most 'maxsize' bytes, and removes it once all
+                    parts are sent or spooled unless 'keep' is set. Returns None if so, otherwise the name of the file
+                    left to send, i.e. the compressed one once compressed. Only one part is held in memory at a time,
+                    as base64 text of about 4/3 'maxsize', unless the mailer pools without a spool directory, which
+                    queues all parts in memory until they are sent.
+            """
+            vName = pName
+            vType = "octet-stream"
+            if (self.__cfg.get("compress") is not None):
+                vType = self.COMPRESS[self.__cfg["compress"]][2]
+                if (not vName.endswith(self.COMPRESS[self.__cfg["compress"]][1])): vName, vType = self.__compress(vName) # else compressed by a failed send
+            vSize = os.path.getsize(vName)
+            vMax  = self.__cfg.get("maxsize") or self.MAXSIZE
+            vMax  = max(57, vMax - (vMax % 57)) # base64 line boundary
+            vCnt  = max(1, -(-vSize // vMax))
+            vDone = True
+            with open(vName, "rb") as vFhdl:
+                for i in range(vCnt):
+                    vSubj = None
+                    vFile = os.path.basename(vName) if (vCnt == 1) else "{}.{:03d}".format(os.path.basename(vName), i + 1)
+                    vMssg = email.mime.multipart.MIMEMultipart()
+                    vMssg.add_header("From", self.__cfg["from"])
+                    vMssg.add_header("To",   self.__cfg["to"  ])
+                    if (self.__cfg["cc"]       is not None): vMssg.add_header("Cc",      self.__cfg["cc"].replace(";", ",").strip(","))
+                    if (self.__cfg["subjprfx"] is not None): vSubj = self.__cfg["subjprfx"]
+                    if (self.__idf             is not None): vSubj = self.__idf if (vSubj is None) else vSubj + self.__idf
+                    if ((vSubj is not None) and (vCnt > 1)): vSubj = "{} ({}/{})".format(vSubj, i + 1, vCnt)
+                    if (vSubj                  is not None): vMssg.add_header("Subject", vSubj)
+                    vMssg.attach(email.mime.text.MIMEText("---" if (vCnt == 1) else "part {} of {} of '{}', concatenate all parts to restore it".format(i + 1, vCnt, os.path.basename(vName))))
+                    vMssg.attach(self.__part(vFhdl, vMax, vFile, vType))
+                    vDone = SMTrace_Mailer.sendmail(self.__cfg, vMssg, self.__log) and vDone
+                    del(vMssg)
+            if (not vDone):
+                return vName
+            if (not self.__cfg.get("keep", False)):
+                os.remove(vName)
+            return None
+
+        def __part(self, pFhdl, pSize:int, pName:str, pType:str):
+            """
+            @brief  Returns a base64 encoded attachment of the next pSize bytes of pFhdl, read and encoded block by block.
+            """
+            vText = []
+            vLeft = pSize
+            while (vLeft > 0):
+                vData = pFhdl.read(min(vLeft, 57 * 1024))
+                if (not vData): break
+                vText.append(base64.encodebytes(vData).decode("ascii"))
+                vLeft -= len(vData)
+            vPart = email.mime.base.MIMEBase("application", pType, Name=pName)
+            vPart.set_payload("".join(vText))
+            vPart.add_header("Content-Transfer-Encoding", "base64")
+            vPart.add_header('Content-Disposition', 'attachment; filename={}'.format(pName))
+            return vPart
+
+        def __compress(self, pName:str):
+            """
+            @brief  Streams a closed capture file into its compressed counterpart, removes it and returns the tuple
+                    (name of the compressed file, MIME subtype).
+            """
+            vOpen, vExt, vType = self.COMPRESS[self.__cfg["compress"]]
+            with open(pName, "rb") as vSrc, vOpen(pName + vExt, "wb") as vDst:
+                shutil.copyfileobj(vSrc, vDst, 1 << 16)
+            os.remove(pName)
+            return pName + vExt, vType
+
+        def __open(self, pTimestamp:int):
+            self.__cnt = 0
+            self.__nam = os.path.join(self.__cfg["location"], datetime.datetime.utcnow().strftime(re.sub("%N", re.sub("\W+", "_", self.__idf), self.__cfg["naming"])))
+            vBase, vExt = os.path.splitext(self.__nam)
+            for i in itertools.count(1):
+                if (not os.path.exists(self.__nam)): break
+                self.__nam = "{}_{}{}".format(vBase, i, vExt) # e.g. a predecessor replaced within the same second
+            self.__dat = pyPCAPNG.PCAPNGWriter(self.__nam, pMode="w", pAF=self.__cfg["samplerate"])
+            self.__dat.addSHB(pMajorVersion=1, pMinorVersion=0)
+            self.__idb = self.__dat.addIDB(pLinkType=1, pSnapLen=0, pOptions=[(pyPCAPNG.IDBOptionType.TSRESOL, [9]), (pyPCAPNG.IDBOptionType.NAME, bytes(self.__idf, encoding="utf-8")), (pyPCAPNG.IDBOptionType.ENDOFOPT, [])])
+            self.__dat.addISB(pInterfaceId=int(0), pTimestamp=pTimestamp, pOptions=[(pyPCAPNG.ISBOptionType.STARTTIME, struct.pack("II", ((pTimestamp & 0xFFFFFFFF00000000) >> 32), (pTimestamp & 0x00000000FFFFFFFF))), (pyPCAPNG.ISBOptionType.ENDOFOPT, [])])
+
+        def __close(self):
+            if (self.__dat is None): return
+            self.__dat.flush()
+            del(self.__dat)
+            self.__dat = None
+
+        def close(self):
+            """
+            @brief  Removes the cron jobs and closes the capture file, which is left to send() or to the state() of a
+                    successor.
+            """
+            SMTrace_Report.unschedule(self.__job)
+            with self.__lck:
+                if (self.__dat is None): return
+                self.__close()
+                self.__orp.append(self.__nam)
+
+        @staticmethod
+        def recover(pName:str, pOffset:int):
+            """
+            @brief  Truncates a capture file of an interrupted run behind its last complete PCAPNG block and returns
+                    its new size. Blocks up to pOffset were flushed by a snapshot, later ones are walked by their length
+                    fields.
+            @param  pName    Name of the capture file.
+            @param  pOffset  Size of the file at the last snapshot.
+            """
+            vSize = os.path.getsize(pName)
+            vOfs  = min(pOffset, vSize)
+            vBlk  = struct.Struct("<II")
+            with open(pName, "r+b") as fhdl:
+                fhdl.seek(vOfs)
+                while (vOfs + vBlk.size <= vSize):
+                    vType, vLen = vBlk.unpack(fhdl.read(vBlk.size))
+                    if ((vLen < 12) or (vLen % 4) or (vOfs + vLen > vSize)): break
+                    fhdl.seek(vOfs + vLen - 4)
+                    if (struct.unpack("<I", fhdl.read(4))[0] != vLen): break
+                    vOfs += vLen
+                fhdl.truncate(vOfs)
+            return vOfs
+
+        def flush(self):
+            """
+            @brief  Writes the buffered packets to the capture file.
+            """
+            with self.__lck:
+                if (self.__dat is not None): self.__dat.flush()
+
+        def state(self):
+            """
+            @brief  Flushes the capture file and returns its name, size and the sample counter as JSON serialisable
+                    dict.
+            """
+            with self.__lck:
+                if (self.__dat is not None): self.__dat.flush()
+                return dict(file=self.__nam, offset=os.path.getsize(self.__nam), cnt=self.__cnt, orphans=list(self.__orp))
+
+        def restore(self, pState:dict):
+            """
+            @brief  Continues the sample counter of a state() and schedules its capture file for the next report,
+                    truncated to complete blocks.
+            @param  pState  A dict returned by state().
+            """
+            with self.__lck:
+                self.__cnt = pState["cnt"]
+                for vName, vOfs in [(n, None) for n in pState.get("orphans", [])] + [(pState["file"], pState["offset"])]:
+                    if ((vName == self.__nam) or (vName in self.__orp) or (not os.path.isfile(vName))): continue
+                    if ((vOfs is None) or (self.recover(vName, vOfs) > 0)): self.__orp.append(vName)
+
+        def log(self, pTimestamp:int, pData:pySML.SML_Telegram):
+            """
+            @brief  tbd
+            @param  pTimestamp  Integer number of nanoseconds since the epoch.
+            @param  pData       A pySML.SML_Telegram or the raw bytes of a SML telegram.
+            """
+            if (not isinstance(pTimestamp, int)                                                   ): raise SMTrace_Exception("Parameter 'pTimestamp' is not of type 'int'.")
+            if (not isinstance(pData,      (pySML.SML_Telegram, bytes, bytearray, memoryview))): raise SMTrace_Exception("Parameter 'pData' is not of type 'pySML.SML_Telegram' or 'bytes'.")
+            if (self.__cnt == self.__cfg["samplerate"]):
+                self.__cnt = 0
+                with self.__lck:
+                    self.__dat.addEPB(pInterfaceId=self.__dat.getInterfaceId(self.__idb), pPacketData=pyPCAPNG.IPv4(pData=pData.data if isinstance(pData, pySML.SML_Telegram) else bytes(pData), pPortSrc=7259).eth, pTimestamp=pTimestamp) # pPortSrc=7259 ... WireShark SML protocol
+            self.__cnt += 1
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    class Archive(object):
+
+        BUFFER = 1 << 16
+
+        def __init__(self, pCfg:dict, pTrg:apscheduler.schedulers.background.BackgroundScheduler, pLog:pyLOG.Log=None, pIdf=None):
+            self.__cfg = pCfg
+            self.__buf = bytearray()
+            self.__day = None
+            self.__fhdl = None
+            self.__idf = pIdf
+            self.__lck = threading.Lock()
+            self.__log = pLog
+            self.__dir = SMTrace_Archive.directory(self.__cfg["location"], self.__cfg.get("name") or self.__idf or "meter")
+            self.__sel = None if (self.__cfg.get("keys") is None) else frozenset(self.__cfg["keys"])
+            self.__syn = int(self.__cfg.get("fsync", 60.0) * 1000000000)
+            self.__trg = pTrg
+            self.__lst = dict() # day -> last timestamp written
+            os.makedirs(self.__dir, exist_ok=True)
+            self.__idx = SMTrace_Archive.index(self.__dir)
+            self.__nxt = time.monotonic_ns() + self.__syn
+            self.__job = [self.__trg.add_job(self, trigger=apscheduler.triggers.cron.CronTrigger().from_crontab(v_cron)) for v_cron in self.__cfg.get("cron") or []]
+
+        def __del__(self):
+            if (self.__fhdl is not None):
+                self.__flush()
+                self.__fhdl.close()
+
+        def __call__(self):
+            self.flush()
+
+        def flush(self):
+            """
+            @brief  Writes the buffered records to disk.
+            """
+            with self.__lck:
+                self.__flush()
+
+        def close(self):
+            """
+            @brief  Removes the cron jobs, writes the buffered records and closes the segment.
+            """
+            SMTrace_Report.unschedule(self.__job)
+            with self.__lck:
+                self.__flush()
+                if (self.__fhdl is not None): self.__fhdl.close()
+                self.__fhdl = None
+                self.__day  = None
+
+        @property
+        def path(self):
+            """
+            @brief  Returns the archive directory of the meter.
+            """
+            return self.__dir
+
+        def __flush(self):
+            """
+            @brief  Appends the buffered records to the open segment and forces them to disk.
+            """
+            if (self.__buf and (self.__fhdl is not None)):
+                self.__fhdl.write(self.__buf)
+                self.__fhdl.flush()
+                os.fsync(self.__fhdl.fileno())
+                self.__buf.clear()
+            self.__nxt = time.monotonic_ns() + self.__syn
+
+        def __segment(self, pDay:str):
+            """
+            @brief  Switches to the segment of pDay, which is only ever appended to.
+            """
+            self.__flush()
+            if (self.__fhdl is not None): self.__fhdl.close()
+            vName = os.path.join(self.__dir, pDay + ".seg")
+            if ((pDay not in self.__lst) and os.path.isfile(vName) and (os.path.getsize(vName) >= SMTrace_Archive.RECORD.size)):
+                with open(vName, "rb") as fhdl:
+                    vSize = os.path.getsize(vName)
+                    fhdl.seek(vSize - (vSize % SMTrace_Archive.RECORD.size) - SMTrace_Archive.RECORD.size)
+                    self.__lst[pDay] = SMTrace_Archive.RECORD.unpack(fhdl.read(SMTrace_Archive.RECORD.size))[0]
+            self.__fhdl = open(vName, "ab")
+            vPart = self.__fhdl.tell() % SMTrace_Archive.RECORD.size
+            if (vPart): # drop the partially written record of an interrupted run
+                self.__fhdl.truncate(self.__fhdl.tell() - vPart)
+                self.__fhdl.seek(0, os.SEEK_END)
+            self.__day = pDay
+
+        def log(self, pTimestamp:int, pData:dict):
+            """
+            @brief  Appends a record of every numeric value.
+            @param  pTimestamp  Integer number of nanoseconds since the epoch.
+            @param  pData       A dict mapping the keys onto dicts of 'valu' and 'unit'.
+            """
+            if (not isinstance(pTimestamp, int) ): raise SMTrace_Exception("Parameter 'pTimestamp' is not of type 'int'.")
+            if (not isinstance(pData,      dict)): raise SMTrace_Exception("Parameter 'pData' is not of type 'dict'.")
+            for k,v in pData.items():
+                if (not isinstance(v, dict)           ): raise SMTrace_Exception("Value for key '{}' of parameter 'pData' is not of type 'dict'.".format(k))
+                if (v.keys() != {"unit", "valu"}      ): raise SMTrace_Exception("Value for key '{}' of parameter 'pData' does not include exactly the keys 'valu' and 'unit'.".format(k))
+            vDay = SMTrace_Archive.day(pTimestamp)
+            with self.__lck:
+                if (vDay != self.__day): self.__segment(vDay)
+                vNew = False
+                for k,v in pData.items():
+                    vValu = v["valu"]
+                    vKey  = k.decode("utf-8") if (isinstance(k, bytes)) else str(k)
+                    if (    (not isinstance(vValu, (int, float)))
+                         or (isinstance(vValu, bool)           )
+                         or ((self.__sel is not None) and (vKey not in self.__sel))
+                       ):
+                        continue
+                    vId = self.__idx["keys"].get(vKey)
+                    if (vId is None):
+                        vUnit = v["unit"].decode("utf-8") if (isinstance(v["unit"], bytes)) else v["unit"]
+                        vId = self.__idx["keys"][vKey] = [len(self.__idx["keys"]), vUnit]
+                        vNew = True
+                    self.__buf += SMTrace_Archive.RECORD.pack(pTimestamp, vId[0], vValu)
+                if ((pTimestamp < self.__lst.get(vDay, pTimestamp)) and (vDay not in self.__idx["unsorted"])):
+                    self.__idx["unsorted"].append(vDay)
+                    vNew = True
+                self.__lst[vDay] = max(pTimestamp, self.__lst.get(vDay, pTimestamp))
+                if (vNew): # the index has to know a key before any record of it reaches the disk
+                    SMTrace_Archive.index(self.__dir, self.__idx)
+                    self.__flush()
+                elif ((len(self.__buf) >= self.BUFFER) or (time.monotonic_ns() >= self.__nxt)):
+                    self.__flush()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pCfg:dict, pLog:pyLOG.Log=None, pIdf=None, pTrg:apscheduler.schedulers.base.BaseScheduler=None):
+        """
+        @brief  Constructor.
+        @param  pCfg  A Reporter configuration.
+        @param  pIdf  A custom identifier.
+        @param  pTrg  A shared scheduler for the handlers' cron jobs; if None an own BackgroundScheduler is started.
+        """
+        self.__cfg = pCfg
+        self.__idf = pIdf
+        self.__lck = threading.Lock()
+        self.__own = (pTrg is None)
+        self.__trg = apscheduler.schedulers.background.BackgroundScheduler() if (self.__own) else pTrg
+        self.__log = pLog
+        self.__nam = list(self.__cfg["handlers"])
+        self.__sig = [pyRPT.Hdl(vHdl) for vHdl in self.__nam]
+        self.__hdl = [self.__handler(vCfg) for vCfg in self.__sig]
+        if (self.__own): self.__trg.start()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __del__(self):
+        """
+        @brief  Destructor.
+        """
+        if (self.__own and self.__trg.running): self.__trg.shutdown()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def unschedule(pJobs:list):
+        """
+        @brief  Removes the cron jobs of a handler; jobs already gone with their scheduler are skipped.
+        @param  pJobs  A list of apscheduler jobs.
+        """
+        for vJob in pJobs:
+            try:
+                vJob.remove()
+            except LookupError:
+                pass
+        pJobs.clear()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __handler(self, pCfg:dict):
+        """
+        @brief  Returns a new handler of a handler configuration, whose cron jobs are added to the scheduler.
+        @param  pCfg  A handler configuration.
+        """
+        return eval(pCfg["class"]+"(vHdl, vTrg, vLog, vIdf)", {"SMTrace_Report": self, "vHdl":pCfg, "vTrg": self.__trg, "vLog":self.__log, "vIdf": self.__idf})
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def reload(self, pCfg:dict, pLog:pyLOG.Log=None, pIdf=None):
+        """
+        @brief  Applies a changed Reporter configuration. Handlers whose configuration is unchanged keep running with
+                their cron jobs and files, removed ones are closed and changed ones are replaced by a successor which
+                takes over their state if of the same class. A changed identifier or logger replaces all handlers.
+                Returns the tuple (kept, replaced, added, removed) of handler counts.
+        @param  pCfg  A Reporter configuration.
+        @param  pLog  Logger.
+        @param  pIdf  A custom identifier.
+        """
+        vAll = (pIdf != self.__idf) or (pLog is not self.__log)
+        vOld = dict(zip(self.__nam, zip(self.__hdl, self.__sig)))
+        vHdl = []
+        vCnt = [0, 0, 0, 0]
+        vEnd = []
+        with self.__lck: # no telegram is logged while handlers are swapped
+            self.__cfg = pCfg
+            self.__idf = pIdf
+            self.__log = pLog
+            vNam = list(self.__cfg["handlers"])
+            vSig = [pyRPT.Hdl(vName) for vName in vNam]
+            for vName, vCfg in zip(vNam, vSig):
+                vPrv, vPrvCfg = vOld.pop(vName, (None, None))
+                if ((vPrv is not None) and (not vAll) and (vPrvCfg == vCfg)):
+                    vHdl.append(vPrv)
+                    vCnt[0] += 1
+                elif ((vPrv is not None) and (vPrvCfg["class"] == vCfg["class"])):
+                    vSte = vPrv.state() if (hasattr(vPrv, "state")) else None
+                    vPrv.close() # before its successor opens the same files
+                    vHdl.append(self.__handler(vCfg))
+                    if (vSte is not None): vHdl[-1].restore(vSte)
+                    vCnt[1] += 1
+                else:
+                    if (vPrv is not None):
+                        vOld[vName] = (vPrv, vPrvCfg)
+                    vHdl.append(self.__handler(vCfg))
+                    vCnt[2] += 1
+            for vPrv, vPrvCfg in vOld.values():
+                vPrv.close()
+                vEnd.append(vPrv)
+                vCnt[3] += 1
+            self.__nam = vNam
+            self.__sig = vSig
+            self.__hdl = vHdl
+        for vPrv in vEnd: # mailing may take a while
+            if (isinstance(vPrv, self.EMailSml)): vPrv.send()
+        return tuple(vCnt)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def close(self):
+        """
+        @brief  Closes all handlers, mails the capture files not reported so far and stops an own scheduler.
+        """
+        with self.__lck:
+            vEnd, self.__hdl, self.__nam, self.__sig = self.__hdl, [], [], []
+            for vHdl in vEnd:
+                vHdl.close()
+        for vHdl in vEnd:
+            if (isinstance(vHdl, self.EMailSml)): vHdl.send()
+        if (self.__own and self.__trg.running): self.__trg.shutdown(wait=False)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def log(self, pData:dict, pTstmp:int=None, pObis:dict=None):
+        """
+        @brief  Process a completely received packet. This is repetitive called in a threads run method.
+        @param  pData   A dict of decoded values, a SML_Telegram or the raw bytes of a SML_Telegram.
+        @param  pTstmp  Reception time in nanoseconds since the epoch; None for now.
+        @param  pObis   A dict mapping the keys of a dict pData onto their 6 byte object names; None if unknown.
+        """
+        vTstmp = time.time_ns() if (pTstmp is None) else pTstmp
+        with self.__lck:
+            for vHdl in self.__hdl:
+                if   (isinstance(vHdl, self.EMailTxt) and isinstance(pData, dict                                                  )): vHdl.log(vTstmp, pData, pObis)
+                elif (isinstance(vHdl, self.Archive ) and isinstance(pData, dict                                                  )): vHdl.log(vTstmp, pData)
+                elif (isinstance(vHdl, self.EMailSml) and isinstance(pData, (pySML.SML_Telegram, bytes, bytearray, memoryview))): vHdl.log(vTstmp, pData)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def trigger(self):
+        """
+        @brief  Runs all handlers immediately, independent of their cron configuration.
+        """
+        for vHdl in self.__hdl:
+            vHdl()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def flush(self):
+        """
+        @brief  Writes the buffered data of all handlers to their files.
+        """
+        with self.__lck:
+            for vHdl in self.__hdl:
+                if (isinstance(vHdl, (self.EMailSml, self.Archive))): vHdl.flush()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def state(self):
+        """
+        @brief  Returns a dict mapping the names of the handlers with state onto their state().
+        """
+        with self.__lck:
+            return {vNam: vHdl.state() for vNam, vHdl in zip(self.__nam, self.__hdl) if (isinstance(vHdl, (self.EMailTxt, self.EMailSml)))}
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def restore(self, pState:dict):
+        """
+        @brief  Restores the handlers of a state() which are still configured; failures are logged and skipped.
+        @param  pState  A dict returned by state().
+        """
+        for vNam, vHdl in zip(self.__nam, self.__hdl):
+            if (vNam not in pState): continue
+            try:
+                vHdl.restore(pState[vNam])
+            except Exception as e:
+                if (self.__log is not None): self.__log.log(pyLOG.LogLvl.ERROR, "restoring handler '{}' failed: {}: {}".format(vNam, type(e).__name__, e))
+
+
+########################################################################################################################
+
+
+class SMTrace_CRC16(object):
+    """
+    @brief  CRC16 calculation and check of the SML transport protocol v1 trailer.
+            The trailer CRC is a CRC-16/X-25 (reflected polynomial 0x1021, initial value 0xFFFF, final XOR 0xFFFF) over
+            the whole frame but the last two bytes, which hold the CRC least significant byte first. Some meters (e.g.
+            Holley DTZ541) use the CRC-16/KERMIT variant (initial value 0x0000, no final XOR) instead.
+    """
+
+    VARIANTS = {"X25": (0xFFFF, 0xFFFF), "KERMIT": (0x0000, 0x0000)}
+
+    # table of the reflected polynomial 0x1021 (== 0x8408)
+    TABLE = []
+    for _i in range(256):
+        _c = _i
+        for _j in range(8): _c = (_c >> 1) ^ 0x8408 if (_c & 0x0001) else (_c >> 1)
+        TABLE.append(_c)
+    del _i, _j, _c
+
+    # byte bit reversal, used to run the reflected CRC on the non reflected C implementation binascii.crc_hqx()
+    REVERSE = bytes(int("{:08b}".format(_i)[::-1], 2) for _i in range(256))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pVariant:str="X25"):
+        """
+        @brief  Constructor.
+        @param  pVariant  CRC variant, one of the keys of VARIANTS.
+        """
+        if (pVariant not in self.VARIANTS): raise SMTrace_Exception("Parameter 'pVariant' is not one of {}.".format(sorted(self.VARIANTS.keys())))
+        self.__init, self.__xor = self.VARIANTS[pVariant]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def calc_table(self, pData:bytes):
+        """
+        @brief  Returns the CRC of pData, calculated byte by byte via the lookup table.
+        @param  pData  Bytes to calculate the CRC of.
+        """
+        vTbl = self.TABLE
+        vCrc = self.__init
+        for b in pData:
+            vCrc = (vCrc >> 8) ^ vTbl[(vCrc ^ b) & 0xFF]
+        return vCrc ^ self.__xor
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def calc(self, pData:bytes):
+        """
+        @brief  Returns the CRC of pData. Bit reversing input, initial value and result maps the reflected CRC onto the
+                table driven C implementation binascii.crc_hqx(), which is by far faster than calc_table().
+        @param  pData  Bytes to calculate the CRC of.
+        """
+        vCrc = binascii.crc_hqx(bytes(pData).translate(self.REVERSE), self.__init)
+        return ((self.REVERSE[vCrc & 0xFF] << 8) | self.REVERSE[vCrc >> 8]) ^ self.__xor
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def check(self, pFrame:bytes):
+        """
+        @brief  Returns whether the trailer CRC of a SML frame is valid.
+        @param  pFrame  A complete SML frame incl. start and end sequence.
+        """
+        if (len(pFrame) < 16): return False
+        return self.calc(pFrame[:-2]) == (pFrame[-2] | (pFrame[-1] << 8))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def check_batch(self, pFrames:list):
+        """
+        @brief  Returns a list of booleans telling whether the trailer CRC of the respective SML frame is valid.
+                With numpy available the CRCs of all frames are calculated side by side, one byte position per step.
+        @param  pFrames  A list of complete SML frames incl. start and end sequence.
+        """
+        if ((numpy is None) or (len(pFrames) < 2)): return [self.check(vFrame) for vFrame in pFrames]
+        vLen = numpy.array([max(len(vFrame) - 2, 0) for vFrame in pFrames], dtype=numpy.int64)
+        vDat = numpy.zeros((len(pFrames), int(vLen.max())), dtype=numpy.uint16)
+        for i,vFrame in enumerate(pFrames):
+            vDat[i, :vLen[i]] = numpy.frombuffer(vFrame, dtype=numpy.uint8, count=int(vLen[i]))
+        vTbl = numpy.array(self.TABLE, dtype=numpy.uint16)
+        vCrc = numpy.full(len(pFrames), self.__init, dtype=numpy.uint16)
+        for j in range(vDat.shape[1]):
+            vCrc = numpy.where(vLen > j, (vCrc >> 8) ^ vTbl[(vCrc ^ vDat[:, j]) & 0xFF], vCrc)
+        vCrc ^= self.__xor
+        return [bool(vLen[i] >= 14) and (int(vCrc[i]) == (vFrame[-2] | (vFrame[-1] << 8))) for i,vFrame in enumerate(pFrames)]
+
+
+########################################################################################################################
+
+
+class SMTrace_SMLFramer(object):
+    """
+    @brief  Incremental SML transport protocol v1 frame scanner.
+            The scanner remembers where it stopped searching, so every received byte is inspected only once. Within a
+            frame escape sequences are evaluated 4 byte aligned to the frame start, like the SML transport protocol
+            demands. A frame exceeding the configured maximum size is dropped and the scanner resynchronizes on the next
+            start sequence.
+    """
+
+    ESC   = b"\x1b\x1b\x1b\x1b"
+    START = b"\x1b\x1b\x1b\x1b\x01\x01\x01\x01"
+    END   = 0x1a
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pMaxSize:int=16384):
+        """
+        @brief  Constructor.
+        @param  pMaxSize  Maximum size of a single frame in bytes; larger frames are dropped.
+        """
+        if (not isinstance(pMaxSize, int)): raise SMTrace_Exception("Parameter 'pMaxSize' is not of type 'int'.")
+        if (pMaxSize < 16                ): raise SMTrace_Exception("Parameter 'pMaxSize' is less than 16.")
+        self.__buffer  = bytearray()
+        self.__maxsize = pMaxSize
+        self.__inframe = False
+        self.__scanpos = 0
+        self.cnt_frames  = 0
+        self.cnt_resyncs = 0
+        self.cnt_dropped = 0
+        self.cnt_overflw = 0
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __len__(self):
+        """
+        @brief  Returns the number of currently buffered bytes.
+        """
+        return len(self.__buffer)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __discard(self, pLen:int):
+        """
+        @brief  Removes the first pLen bytes of the buffer.
+        @param  pLen  Number of bytes to remove.
+        """
+        try:
+            del self.__buffer[:pLen]
+        except BufferError:
+            # a consumer still holds a view of a previously yielded frame; detach from it
+            self.__buffer = self.__buffer[pLen:]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __resync(self, pFrom:int):
+        """
+        @brief  Leaves the current frame and continues searching a start sequence behind its first byte.
+        @param  pFrom  Buffer index to continue the search at.
+        """
+        self.cnt_resyncs += 1
+        self.__inframe = False
+        self.__scanpos = pFrom
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def feed(self, pData:bytes):
+        """
+        @brief  Appends received bytes and yields every completed frame as memoryview into the internal buffer.
+                A yielded view is only valid until the generator is resumed; a consumer which needs the frame data
+                longer has to copy it, e.g. via bytes().
+        @param  pData  Received bytes.
+        """
+        vBuf = self.__buffer
+        vBuf.extend(pData)
+        vDone = 0
+        try:
+            while (True):
+                if (not self.__inframe):
+                    vIdx = vBuf.find(self.START, self.__scanpos)
+                    if (vIdx < 0):
+                        # keep a possibly incomplete start sequence only
+                        vKeep = max(vDone, len(vBuf) - (len(self.START) - 1))
+                        self.cnt_dropped += vKeep - vDone
+                        vDone = vKeep
+                        self.__scanpos = 0
+                        break
+                    self.cnt_dropped += vIdx - vDone
+                    vDone = vIdx
+                    self.__inframe = True
+                    self.__scanpos = vIdx + len(self.START)
+                vIdx = vBuf.find(self.ESC, self.__scanpos)
+                while ((vIdx >= 0) and ((vIdx - vDone) & 0x3)):
+                    vIdx = vBuf.find(self.ESC, vIdx + 1)
+                if ((vIdx < 0) or ((vIdx + 8) > len(vBuf))):
+                    if (vIdx < 0):
+                        vIdx = max(self.__scanpos, len(vBuf) - 3)
+                        vIdx = vIdx + ((vDone - vIdx) & 0x3)
+                    self.__scanpos = vIdx
+                    if ((len(vBuf) - vDone) > self.__maxsize):
+                        self.cnt_overflw += 1
+                        self.__resync(vDone + 1)
+                        continue
+                    break
+                vEsc = vBuf[vIdx+4]
+                if   (vBuf[vIdx+4:vIdx+8] == self.ESC):
+                    self.__scanpos = vIdx + 8
+                elif (vBuf[vIdx+4:vIdx+8] == self.START[4:]):
+                    # start sequence within a frame; drop the incomplete frame and start over
+                    self.cnt_dropped += vIdx - vDone
+                    self.cnt_resyncs += 1
+                    vDone = vIdx
+                    self.__scanpos = vIdx + len(self.START)
+                elif ((vEsc == self.END) and (vBuf[vIdx+5] <= 3) and ((vIdx + 8 - vDone) > self.__maxsize)):
+                    # a frame received at once never waited for more data, so its size is checked here
+                    self.cnt_overflw += 1
+                    self.cnt_dropped += vIdx + 8 - vDone
+                    vDone = vIdx + 8
+                    self.__inframe = False
+                    self.__scanpos = vDone
+                elif ((vEsc == self.END) and (vBuf[vIdx+5] <= 3)):
+                    self.cnt_frames += 1
+                    with memoryview(vBuf) as vView:
+                        vFrame = vView[vDone:vIdx+8]
+                    yield vFrame
+                    vFrame.release()
+                    vDone = vIdx + 8
+                    self.__inframe = False
+                    self.__scanpos = vDone
+                else:
+                    self.__resync(vDone + 1)
+        finally:
+            if (vDone):
+                self.__discard(vDone)
+                self.__scanpos = max(0, self.__scanpos - vDone)
+
+
+########################################################################################################################
+
+
+class SMTrace_SMLDecoder(object):
+    """
+    @brief  Lazy decoder of the SML_GetListRes messages of a SML telegram.
+            The TL encoded stream is walked without building pySML objects. Messages other than SML_GetListRes and list
+            entries whose object name is not of interest are skipped by their length; only the object name, unit,
+            scaler and value of the entries of interest are decoded.
+    """
+
+    TYPE_OCTET     = 0x0
+    TYPE_BOOL      = 0x4
+    TYPE_INT       = 0x5
+    TYPE_UINT      = 0x6
+    TYPE_LIST      = 0x7
+    TAG_GETLISTRES = 0x00000701
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def obis(pCode:str):
+        """
+        @brief  Returns the 6 byte object name of an OBIS code given as 'A-B:C.D.E*F', 'A-B:C.D.E' or 12 hex digits.
+        @param  pCode  An OBIS code.
+        """
+        vMtch = re.fullmatch(r"\s*(\d+)-(\d+):(\d+)\.(\d+)\.(\d+)(?:\*(\d+))?\s*", pCode)
+        if (vMtch is not None):
+            return bytes([int(x) if (x is not None) else 255 for x in vMtch.groups()])
+        if (re.fullmatch(r"[0-9a-fA-F]{12}", pCode) is not None):
+            return bytes.fromhex(pCode)
+        raise ValueError("'{}' is not a valid OBIS code".format(pCode))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def payload(pFrame:bytes):
+        """
+        @brief  Returns the unescaped payload of a SML frame, i.e. the frame without start and end sequence.
+        @param  pFrame  A complete SML frame incl. start and end sequence.
+        """
+        vData = bytes(pFrame[8:-8])
+        if (SMTrace_SMLFramer.ESC not in vData): return vData
+        vRslt = bytearray()
+        vIdx  = 0
+        while (vIdx < len(vData)):
+            vRslt += vData[vIdx:vIdx+4]
+            vIdx  += 8 if (vData[vIdx:vIdx+4] == SMTrace_SMLFramer.ESC) else 4
+        return vRslt
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pObis:list=None):
+        """
+        @brief  Constructor.
+        @param  pObis  List of OBIS codes of interest; None selects all codes.
+        """
+        self.__obis = None if (pObis is None) else frozenset(self.obis(x) for x in pObis)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def wanted(self, pObjName:bytes):
+        """
+        @brief  Returns whether an object name is of interest.
+        @param  pObjName  Raw object name of a SML_ListEntry.
+        """
+        return (self.__obis is None) or (bytes(pObjName) in self.__obis)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __tl(self, pData:bytes, pIdx:int):
+        """
+        @brief  Returns the tuple (type, length, index) of the TL field at pIdx. For lists the length is the number of
+                elements, otherwise the number of value bytes following the TL field at the returned index.
+        @param  pData  SML payload.
+        @param  pIdx   Index of the TL field.
+        """
+        vByte = pData[pIdx]
+        vType = (vByte >> 4) & 0x7
+        vLen  = vByte & 0xF
+        vTl   = 1
+        while (vByte & 0x80):
+            vByte = pData[pIdx+vTl]
+            vLen  = (vLen << 4) | (vByte & 0xF)
+            vTl  += 1
+        if (vType != self.TYPE_LIST):
+            vLen -= vTl
+            if (vLen < 0): raise SMTrace_Exception("Invalid TL field at index {}.".format(pIdx))
+        return vType, vLen, pIdx + vTl
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __skip(self, pData:bytes, pIdx:int, pCnt:int=1):
+        """
+        @brief  Returns the index behind pCnt elements starting at pIdx.
+        @param  pData  SML payload.
+        @param  pIdx   Index of the first element.
+        @param  pCnt   Number of elements to skip.
+        """
+        while (pCnt):
+            vType, vLen, pIdx = self.__tl(pData, pIdx)
+            if (vType == self.TYPE_LIST): pCnt += vLen
+            else                        : pIdx += vLen
+            pCnt -= 1
+        return pIdx
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __value(self, pData:bytes, pIdx:int):
+        """
+        @brief  Returns the tuple (value, index) of the element at pIdx; absent optional elements and lists yield None.
+        @param  pData  SML payload.
+        @param  pIdx   Index of the element.
+        """
+        vType, vLen, vIdx = self.__tl(pData, pIdx)
+        if   (vType == self.TYPE_LIST ): return None, self.__skip(pData, pIdx)
+        elif (vLen == 0               ): return None, vIdx
+        elif (vType == self.TYPE_OCTET): return bytearray(pData[vIdx:vIdx+vLen]), vIdx + vLen
+        elif (vType == self.TYPE_BOOL ): return pData[vIdx] != 0, vIdx + vLen
+        elif (vType == self.TYPE_INT  ): return int.from_bytes(pData[vIdx:vIdx+vLen], "big", signed=True), vIdx + vLen
+        elif (vType == self.TYPE_UINT ): return int.from_bytes(pData[vIdx:vIdx+vLen], "big", signed=False), vIdx + vLen
+        else                           : raise SMTrace_Exception("Invalid TL type {} at index {}.".format(vType, pIdx))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __list(self, pData:bytes, pIdx:int, pLen:int):
+        """
+        @brief  Returns the index behind the SML_List header at pIdx, checked to have pLen elements.
+        @param  pData  SML payload.
+        @param  pIdx   Index of the list.
+        @param  pLen   Expected number of list elements.
+        """
+        vType, vLen, vIdx = self.__tl(pData, pIdx)
+        if ((vType != self.TYPE_LIST) or (vLen != pLen)): raise SMTrace_Exception("No list of {} elements at index {}.".format(pLen, pIdx))
+        return vIdx
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def decode(self, pFrame:bytes, pFilter=None):
+        """
+        @brief  Returns a list of tuples (object name, unit, scaler, value) of the SML_ListEntry elements of interest of
+                all SML_GetListRes messages of a frame.
+        @param  pFrame   A complete SML frame incl. start and end sequence.
+        @param  pFilter  None or a callable (object name, encoding of unit, scaler and value) returning whether the entry
+                         is decoded at all, e.g. SMTrace_Deadband.prefilter.
+        """
+        vData = self.payload(pFrame)
+        vRslt = []
+        vIdx  = 0
+        try:
+            while (vIdx < len(vData)):
+                if (vData[vIdx] == 0x00):
+                    vIdx += 1 # end of message or padding
+                    continue
+                vIdx = self.__list(vData, vIdx, 6)
+                vIdx = self.__skip(vData, vIdx, 3) # transactionId, groupNo, abortOnError
+                vIdx = self.__list(vData, vIdx, 2)
+                vTag, vIdx = self.__value(vData, vIdx)
+                if (vTag == self.TAG_GETLISTRES):
+                    vIdx = self.__list(vData, vIdx, 7)
+                    vIdx = self.__skip(vData, vIdx, 4) # clientId, serverId, listName, actSensorTime
+                    vType, vCnt, vIdx = self.__tl(vData, vIdx)
+                    if (vType != self.TYPE_LIST): raise SMTrace_Exception("No valList at index {}.".format(vIdx))
+                    for i in range(vCnt):
+                        vIdx = self.__list(vData, vIdx, 7)
+                        vObjName, vIdx = self.__value(vData, vIdx)
+                        if ((vObjName is None) or (not self.wanted(vObjName))):
+                            vIdx = self.__skip(vData, vIdx, 6)
+                            continue
+                        vIdx = self.__skip(vData, vIdx, 2) # status, valTime
+                        if (pFilter is not None):
+                            vEnd = self.__skip(vData, vIdx, 3)
+                            if (not pFilter(bytes(vObjName), vData[vIdx:vEnd])):
+                                vIdx = self.__skip(vData, vEnd, 1)
+                                continue
+                        vUnit,   vIdx = self.__value(vData, vIdx)
+                        vScaler, vIdx = self.__value(vData, vIdx)
+                        vValue,  vIdx = self.__value(vData, vIdx)
+                        vIdx = self.__skip(vData, vIdx, 1) # valueSignature
+                        vRslt.append((vObjName, vUnit, vScaler, vValue))
+                    vIdx = self.__skip(vData, vIdx, 2) # listSignature, actGatewayTime
+                else:
+                    vIdx = self.__skip(vData, vIdx, 1)
+                vIdx = self.__skip(vData, vIdx, 1) # crc16
+        except IndexError:
+            raise SMTrace_Exception("Truncated SML payload at index {}.".format(vIdx))
+        return vRslt
+
+
+########################################################################################################################
+
+
+class SMTrace_OBISCache(object):
+    """
+    @brief  LRU bounded cache mapping the raw SML_ListEntry object name, unit and scaler onto the OBIS description, the
+            native unit string, the scaler and the precalculated scaling factor. Meters of the same model may share a
+            cache by referencing the same name.
+    """
+
+    __shared     = dict()
+    __sharedlock = threading.Lock()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def get(pName:str=None, pSize:int=256):
+        """
+        @brief  Returns the cache registered as pName, a new one is created if not yet existing. Without a name a
+                private cache is returned.
+        @param  pName  Name of a shared cache or None.
+        @param  pSize  Maximum number of cache entries.
+        """
+        if (pName is None): return SMTrace_OBISCache(pSize)
+        with SMTrace_OBISCache.__sharedlock:
+            if (pName not in SMTrace_OBISCache.__shared):
+                SMTrace_OBISCache.__shared[pName] = SMTrace_OBISCache(pSize)
+            return SMTrace_OBISCache.__shared[pName]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pSize:int=256):
+        """
+        @brief  Constructor.
+        @param  pSize  Maximum number of cache entries.
+        """
+        if (not isinstance(pSize, int)): raise SMTrace_Exception("Parameter 'pSize' is not of type 'int'.")
+        if (pSize < 1                 ): raise SMTrace_Exception("Parameter 'pSize' is less than 1.")
+        self.__dat  = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__size = pSize
+        self.hits   = 0
+        self.misses = 0
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __len__(self):
+        """
+        @brief  Returns the number of cache entries.
+        """
+        return len(self.__dat)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def lookup(self, pObjName:bytes, pUnit:int, pScaler:int, pObs:pyOBIS.OBIS):
+        """
+        @brief  Returns the tuple (description, unit, scaler, factor); on a cache miss the values are looked up via pObs.
+        @param  pObjName  Raw object name of a SML_ListEntry.
+        @param  pUnit     Raw unit code of a SML_ListEntry or None.
+        @param  pScaler   Scaler of a SML_ListEntry or None.
+        @param  pObs      pyOBIS.OBIS instance used on a cache miss.
+        """
+        vKey = (bytes(pObjName), pUnit, pScaler)
+        with self.__lock:
+            vVal = self.__dat.get(vKey)
+            if (vVal is not None):
+                self.__dat.move_to_end(vKey)
+                self.hits += 1
+                return vVal
+        vVal = (pObs.getDescr(int.from_bytes(vKey[0], "big"))["descr"],
+                pObs.getUnit(pUnit)["native"] if (pUnit is not None) else None,
+                pScaler,
+                (10**abs(pScaler)) if (pScaler is not None) else None)
+        with self.__lock:
+            self.misses += 1
+            self.__dat[vKey] = vVal
+            if (len(self.__dat) > self.__size): self.__dat.popitem(last=False)
+        return vVal
+
+
+########################################################################################################################
+
+
+class SMTrace_Deadband(object):
+    """
+    @brief  Change detection of the values of a meter.
+            A value is reported if it differs from the last reported value by more than the absolute threshold 'abs'
+            and by more than the relative threshold 'rel' (0 for no limit each, so by default every change is reported),
+            or if 'heartbeat' seconds passed since it was last reported. Settings are given per OBIS code, 'default'
+            applies to all other codes. The lazy decoder drops entries whose encoding equals the last reported one
+            before decoding them, if it runs in the thread reporting the meter, i.e. without pipeline or in the
+            pipeline's 'thread' mode. The full pySML decode and the decoding processes of the 'process' and 'shm'
+            modes decode every entry; there the deadband applies to the decoded values only.
+    """
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def settings(pCfg:dict):
+        """
+        @brief  Returns the tuple (abs, rel, heartbeat in ns) of a deadband configuration.
+        @param  pCfg  A deadband configuration of an OBIS code.
+        """
+        return float(pCfg.get("abs", 0)), float(pCfg.get("rel", 0)), int(pCfg.get("heartbeat", 0) * 1000000000)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pCfg:dict):
+        """
+        @brief  Constructor.
+        @param  pCfg  A dict of OBIS code or 'default': dict(abs, rel, heartbeat).
+        """
+        vDflt       = pCfg.get("default") or dict()
+        self.now         = 0
+        self.cnt_skipped = 0
+        self.__dflt = self.settings(vDflt)
+        self.__obis = {SMTrace_SMLDecoder.obis(k): self.settings(dict(vDflt, **(v or dict()))) for k,v in pCfg.items() if (k != "default")}
+        self.__last = dict() # object name: (encoding, value, time of report in ns)
+        self.__pend = dict() # object name: encoding of the entry being decoded
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def prefilter(self, pObjName:bytes, pRaw:bytes):
+        """
+        @brief  Returns whether an entry has to be decoded, i.e. its encoding of unit, scaler and value changed or its
+                heartbeat is due at 'now'.
+        @param  pObjName  Object name.
+        @param  pRaw      Encoding of unit, scaler and value.
+        """
+        vLast = self.__last.get(pObjName)
+        if ((vLast is not None) and (vLast[0] == pRaw)):
+            vHb = self.__obis.get(pObjName, self.__dflt)[2]
+            if ((not vHb) or ((self.now - vLast[2]) < vHb)):
+                self.cnt_skipped += 1
+                return False
+        self.__pend[pObjName] = bytes(pRaw)
+        return True
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def check(self, pObjName:bytes, pValue, pTstmp:int):
+        """
+        @brief  Returns whether a decoded value is reported and remembers it if so.
+        @param  pObjName  Object name.
+        @param  pValue    Scaled value.
+        @param  pTstmp    Reception time in nanoseconds since the epoch.
+        """
+        vAbs, vRel, vHb = self.__obis.get(pObjName, self.__dflt)
+        vLast = self.__last.get(pObjName)
+        vRaw  = self.__pend.pop(pObjName, None)
+        if   (vLast is None                     ): vEmit = True
+        elif (vHb and ((pTstmp - vLast[2]) >= vHb)): vEmit = True
+        elif (    isinstance(pValue,   (int, float)) and (not isinstance(pValue,   bool))
+              and isinstance(vLast[1], (int, float)) and (not isinstance(vLast[1], bool))
+             ):
+            vDiff = abs(pValue - vLast[1])
+            vEmit = (vDiff > 0) and (vDiff > vAbs) and (vDiff > vRel * abs(vLast[1]))
+        else:
+            vEmit = (pValue != vLast[1])
+        if (vEmit): self.__last[pObjName] = (vRaw, pValue, pTstmp)
+        return vEmit
+
+
+########################################################################################################################
+
+
+class SMTrace_HTTPServer(object):
+    """
+    @brief  Local HTTP endpoint serving the latest decoded values of all meters.
+            '/metrics' returns the Prometheus text format, '/values' JSON and '/stats' the SMTrace_Stats snapshots.
+            Non numeric values, e.g. strings and octets, are served by '/values' only: as a Prometheus label every new
+            value would start another time series.
+            A meter re-renders its part of the documents only when its values change and never takes a lock; the
+            server thread joins the parts only after a change, so an unchanged scrape just returns a prepared
+            document.
+    """
+
+    PATHS  = {"/metrics": "text/plain; version=0.0.4; charset=utf-8", "/values": "application/json", "/stats": "application/json"}
+    server = None
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    class Handler(http.server.BaseHTTPRequestHandler):
+        """
+        @brief  Request handler of the SMTrace_HTTPServer.
+        """
+
+        def do_GET(self):
+            vPath = self.path.split("?", 1)[0]
+            if (vPath not in SMTrace_HTTPServer.PATHS):
+                self.send_error(404)
+                return
+            vBody = self.server.owner.document(vPath)
+            self.send_response(200)
+            self.send_header("Content-Type",   SMTrace_HTTPServer.PATHS[vPath])
+            self.send_header("Content-Length", str(len(vBody)))
+            self.end_headers()
+            self.wfile.write(vBody)
+
+        def log_message(self, format, *args):
+            pass
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def HttpInit(pCfg:dict, pLog:pyLOG.Log=None):
+        """
+        @brief  Starts the endpoint if enabled by the configuration. Must be called before the meters are created.
+        @param  pCfg  A HTTP configuration or None.
+        @param  pLog  Logger.
+        """
+        if ((pCfg is not None) and pCfg.get("enabled", False)):
+            SMTrace_HTTPServer.server = SMTrace_HTTPServer(pCfg.get("address", "127.0.0.1"), pCfg.get("port", 9275), pLog)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def HttpStop():
+        """
+        @brief  Stops the endpoint.
+        """
+        if (SMTrace_HTTPServer.server is not None):
+            SMTrace_HTTPServer.server.stop()
+            SMTrace_HTTPServer.server = None
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def label(pValue):
+        """
+        @brief  Returns a value escaped for a Prometheus label.
+        @param  pValue  The value.
+        """
+        return str(pValue).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pAddress:str="127.0.0.1", pPort:int=9275, pLog:pyLOG.Log=None):
+        """
+        @brief  Constructor; starts serving.
+        @param  pAddress  Address to bind to.
+        @param  pPort     TCP port.
+        @param  pLog      Logger.
+        """
+        self.__log = pLog
+        self.__prt = dict() # meter: (values, prometheus value and timestamp lines, JSON)
+        self.__gen = itertools.count(1)
+        self.__chg = 0
+        self.__rdy = (-1, b"", b"")
+        self.__srv = http.server.ThreadingHTTPServer((pAddress, pPort), self.Handler)
+        self.__srv.daemon_threads = True
+        self.__srv.owner = self
+        self.__thd = threading.Thread(target=self.__srv.serve_forever, name="SMTrace_HTTPServer", daemon=True)
+        self.__thd.start()
+        if (self.__log is not None): self.__log.log(pyLOG.LogLvl.INFO, "HTTP endpoint listening on {}:{}".format(*self.__srv.server_address[:2]))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @property
+    def address(self):
+        """
+        @brief  Returns the tuple (address, port) the endpoint listens on.
+        """
+        return self.__srv.server_address[:2]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def publish(self, pMeter:str, pData:dict, pTstmp:int=None):
+        """
+        @brief  Publishes the latest values of a meter. Called by the receive path; renders only if a value changed.
+        @param  pMeter  Meter identifier.
+        @param  pData   Dict of key: dict(valu, unit) as reported to the EMailTxt handler; keys not contained keep
+                        their last value.
+        @param  pTstmp  Reception time in nanoseconds since the epoch; None for now.
+        """
+        vPrt = self.__prt.get(pMeter)
+        if (vPrt is not None):
+            if (all(vPrt[0].get(k) == v for k,v in pData.items())): return
+            pData = dict(vPrt[0], **pData)
+        vTstmp = (time.time_ns() if (pTstmp is None) else pTstmp) / 1e9
+        vMetr  = self.label(pMeter)
+        vVals  = []
+        for vKey, vVal in pData.items():
+            if (not isinstance(vVal["valu"], (int, float))): continue # bool included, as 0 or 1
+            vLbl = "meter=\"{}\",key=\"{}\",unit=\"{}\"".format(vMetr, self.label(vKey), self.label("" if (vVal["unit"] is None) else vVal["unit"]))
+            vVals.append("smtrace_value{{{}}} {}\n".format(vLbl, repr(float(vVal["valu"]))))
+        vStmp = "smtrace_changed_timestamp_seconds{{meter=\"{}\"}} {:.3f}\n".format(vMetr, vTstmp)
+        vJson = "{}: {}".format(json.dumps(pMeter), json.dumps(dict(timestamp=vTstmp, values=pData), default=str))
+        self.__prt[pMeter] = (dict(pData), "".join(vVals), vStmp, vJson)
+        self.__chg = next(self.__gen)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def document(self, pPath:str):
+        """
+        @brief  Returns the body of a path as bytes. Called by the server threads only.
+        @param  pPath  One of PATHS.
+        """
+        if (pPath == "/stats"):
+            return json.dumps(SMTrace_Stats.snapshots()).encode()
+        vRdy = self.__rdy
+        if (vRdy[0] != self.__chg):
+            vChg  = self.__chg
+            vPrts = list(self.__prt.values())
+            vRdy  = (vChg,
+                     ("# HELP smtrace_value Latest decoded value per meter and key.\n# TYPE smtrace_value gauge\n"
+                      + "".join(v[1] for v in vPrts)
+                      + "# HELP smtrace_changed_timestamp_seconds Time of the last change of a value per meter.\n# TYPE smtrace_changed_timestamp_seconds gauge\n"
+                      + "".join(v[2] for v in vPrts)).encode(),
+                     ("{" + ", ".join(v[3] for v in vPrts) + "}").encode())
+            self.__rdy = vRdy
+        return vRdy[1] if (pPath == "/metrics") else vRdy[2]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def stop(self):
+        """
+        @brief  Stops serving and closes the socket.
+        """
+        self.__srv.shutdown()
+        self.__srv.server_close()
+        self.__thd.join()
+
+
+########################################################################################################################
+
+
+class SMTrace_SMLPacket(serial.threaded.Protocol):
+    """
+    @brief  HM data tracing SML packet serial receive class.
+    """
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pIdf:str, pCfg:dict, pPipe=None, pTrg:apscheduler.schedulers.base.BaseScheduler=None):
+        """
+        @brief  Constructor.
+        @param  pIdf   A HM meter identifier.
+        @param  pCfg   A HM meter configuration.
+        @param  pPipe  A SMTrace_Pipeline processing the received packets or None to process them on reception.
+        @param  pTrg   A shared scheduler for the report handlers or None.
+        """
+        self.__badcnt    = 0
+        self.__badlog    = 0
+        self.__badsum    = 0
+        self.__cfg       = dict()
+        self.__dbd       = None
+        self.__framer    = None
+        self.__http      = SMTrace_HTTPServer.server
+        self.__idf       = pIdf
+        self.__obs       = pyOBIS.OBIS()
+        self.__pipe      = pPipe
+        self.clock       = time.time_ns
+        self.__sts       = SMTrace_Stats.get(pIdf)
+        self.__transport = None
+        self.__configure(pCfg)
+        self.__rpt       = SMTrace_Report(pyRPT.Rpt(pCfg["rptref"]), self.__log, pIdf + " / " + pCfg["note"], pTrg)
+        if (self.__sts is not None):
+            for vKey in ("frames", "resyncs", "dropped", "overflw"):
+                self.__sts.gauge(vKey, (lambda k: lambda: getattr(self.__framer, "cnt_" + k))(vKey))
+        self.__log.log_callinfo()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __configure(self, pCfg:dict):
+        """
+        @brief  Sets up checking, decoding and filtering of a meter configuration. The frame buffer and the deadband
+                state are only replaced if their settings changed.
+        @param  pCfg  A HM meter configuration.
+        """
+        self.__badint = pCfg.get("badframelog", 60) * 1000000000
+        self.__crc    = SMTrace_CRC16(pCfg.get("crc", "X25")) if (pCfg.get("crc", "X25") is not None) else None
+        self.__dec    = SMTrace_SMLDecoder(pCfg.get("obis"))
+        self.__log    = pyLOG.Log(pCfg["logref"]) if (pCfg["logref"] != self.__cfg.get("logref")) else self.__log
+        self.__lzy    = (pCfg.get("decode", "full") == "lazy")
+        self.__obc    = SMTrace_OBISCache.get(pCfg.get("obiscache"), pCfg.get("obiscachesize", 256))
+        if ((self.__framer is None) or (pCfg.get("maxframe", 16384) != self.__cfg.get("maxframe", 16384))):
+            self.__framer = SMTrace_SMLFramer(pCfg.get("maxframe", 16384))
+        if ((not self.__cfg) or (pCfg.get("deadband") != self.__cfg.get("deadband"))):
+            self.__dbd = SMTrace_Deadband(pCfg["deadband"]) if (pCfg.get("deadband") is not None) else None
+            if ((self.__sts is not None) and (self.__dbd is not None)):
+                self.__sts.gauge("skipped", lambda: getattr(self.__dbd, "cnt_skipped", 0))
+        self.__cfg = pCfg
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __del__(self):
+        """
+        @brief  Destructor
+        """
+        self.__log.log_callinfo()
+        del(self.__rpt)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __call__(self):
+        """
+        @brief  Call operator.
+        """
+        self.__log.log_callinfo()
+        return self
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def connection_made(self, transport):
+        """
+        @brief  Stores transport.
+        @param  transport  The instance used to write to serial port.
+        """
+        self.__log.log_callinfo()
+        self.__transport = transport
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def connection_lost(self, exc):
+        """
+        @brief  Forgets transport.
+        @param  exc  Exception if connection was terminated by error else None.
+        """
+        self.__log.log_callinfo()
+        self.__transport = None
+        super(SMTrace_SMLPacket, self).connection_lost(exc)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def data_received(self, data:bytes):
+        """
+        @brief  Feeds received data into the frame scanner and calls handle_packet() for every completed SML_Telegram.
+                With a pipeline the completed SML_Telegram is enqueued for processing by the pipeline instead.
+        @param  data  Bytes received via serial port.
+        """
+        if (SMTrace_Stats.trace and SMTrace_Stats.sample()): self.__log.log_callinfo()
+        if (self.__sts is not None): self.__sts.count("bytes", len(data))
+        for packet in self.__framer.feed(data):
+            if (self.__pipe is None): self.__handle_packet(packet)
+            else                    : self.__pipe.put(self, bytes(packet), self.clock())
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __handle_badframe(self, packet:memoryview):
+        """
+        @brief  Counts a packet with invalid CRC. At most one summary per 'badframelog' seconds is logged.
+        @param  packet  A SML_Telegram with invalid CRC.
+        """
+        self.__badcnt += 1
+        self.__badsum += 1
+        vTstmp = time.monotonic_ns()
+        if ((vTstmp - self.__badlog) >= self.__badint):
+            self.__log.log(pyLOG.LogLvl.WARNING, "{} packet(s) with invalid CRC dropped ({} in total), last one {} bytes long".format(self.__badsum, self.__badcnt, len(packet)))
+            self.__badlog = vTstmp
+            self.__badsum = 0
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __handle_packet(self, packet:memoryview):
+        """
+        @brief  Process a completely received packet. This is repetitive called in a threads run method.
+        @param  packet  A SML_Telegram; only valid for the duration of the call.
+        """
+        if (SMTrace_Stats.trace and SMTrace_Stats.sample()): self.__log.log_callinfo()
+        try:
+            vTstmp = self.clock()
+            vFltr  = self.prefilter(vTstmp)
+            if (self.__sts is None):
+                self.report(packet, *self.decode(packet, *self.decoder(), vFltr), vTstmp)
+            else:
+                vStrt = time.perf_counter_ns()
+                vRslt = self.decode(packet, *self.decoder(), vFltr)
+                self.__sts.record("decode", time.perf_counter_ns() - vStrt)
+                self.report(packet, *vRslt, vTstmp)
+        except Exception as e:
+            self.error(packet, e)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @property
+    def idf(self):
+        """
+        @brief  Returns the meter identifier.
+        """
+        return self.__idf
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def decoder(self):
+        """
+        @brief  Returns the tuple (crc, decoder, lazy) of arguments for decode() configured for this meter.
+        """
+        return self.__crc, self.__dec, self.__lzy
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def prefilter(self, pTstmp:int):
+        """
+        @brief  Returns the entry filter for decode() of a packet received at pTstmp, i.e. the deadband prefilter, or
+                None. The filter shares its state with report(), so it must be called by the thread reporting the meter.
+        @param  pTstmp  Reception time in nanoseconds since the epoch; None for now.
+        """
+        if (self.__dbd is None):
+            return None
+        self.__dbd.now = time.time_ns() if (pTstmp is None) else pTstmp
+        return self.__dbd.prefilter
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def decode(pPacket:bytes, pCrc:SMTrace_CRC16, pDec:SMTrace_SMLDecoder, pLazy:bool, pFilter=None):
+        """
+        @brief  Checks and decodes a packet and returns the tuple (telegram, entries). The telegram is None in lazy mode,
+                the entries are a list of tuples (object name, unit, scaler, value) or None if the CRC is invalid.
+                Without any reference to a meter instance this may be run by another thread or process.
+        @param  pPacket  A SML_Telegram.
+        @param  pCrc     CRC16 checker or None.
+        @param  pDec     SML decoder, also used as OBIS filter for the full decode.
+        @param  pLazy    Use the lazy SML decoder instead of pySML.
+        @param  pFilter  Entry filter of the lazy SML decoder or None.
+        """
+        if ((pCrc is not None) and (not pCrc.check(pPacket))):
+            return None, None
+        if (pLazy):
+            return None, pDec.decode(pPacket, pFilter)
+        vTelegram      = pySML.SML_Telegram()
+        vTelegram.data = bytearray(pPacket)
+        vEntries       = []
+        for vMssg in vTelegram.msg:
+            if (isinstance(vMssg.MessageBody.Element, pySML.SML_GetListRes)):
+                for val in vMssg.MessageBody.Element.ValList.valu:
+                    if (pDec.wanted(val.ObjName.valu)):
+                        vEntries.append((val.ObjName.valu, val.Unit.valu, val.Scaler.valu, val.Value.Element.valu))
+        return vTelegram, vEntries
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def report(self, packet:bytes, pTelegram:pySML.SML_Telegram, pEntries:list, pTstmp:int=None):
+        """
+        @brief  Maps the decoded entries of a packet onto OBIS descriptions and units and reports them.
+        @param  packet     A SML_Telegram.
+        @param  pTelegram  The decoded pySML.SML_Telegram or None.
+        @param  pEntries   List of tuples (object name, unit, scaler, value) as returned by decode(); None for a packet
+                           with invalid CRC.
+        @param  pTstmp     Reception time in nanoseconds since the epoch; None for now.
+        """
+        if (pEntries is None):
+            if (self.__sts is not None): self.__sts.count("badcrc")
+            self.__handle_badframe(packet)
+            return
+        vStrt = time.perf_counter_ns() if (self.__sts is not None) else 0
+        vData = dict()
+        vObis = dict()
+        vSupp = 0
+        self.__rpt.log(packet if (pTelegram is None) else pTelegram, pTstmp)
+        if (self.__dbd is not None):
+            if (pTstmp is None): pTstmp = time.time_ns()
+            vSupp = len(pEntries)
+        for vObjName, vUnitCode, vScalerCode, vValue in pEntries:
+            vKey, vUnit, vScaler, vFactor = self.__obc.lookup(vObjName, vUnitCode, vScalerCode, self.__obs)
+            if (    (vValue is not None           )
+                and (isinstance(vValue, bytearray))
+               ):
+                try   : vValue = "\"" + vValue.decode("utf-8") + "\""
+                except: vValue = " ".join(["{:02X}".format(b) for b in vValue])
+            elif (vScaler is not None):
+                if   (0 > vScaler): vValue = vValue / vFactor
+                else              : vValue = vValue * vFactor
+            else:
+                pass
+            if ((self.__dbd is not None) and (not self.__dbd.check(bytes(vObjName), vValue, pTstmp))): continue
+            vData[vKey] = dict(valu=vValue, unit=vUnit)
+            vObis[vKey] = bytes(vObjName)
+        if (self.__dbd is not None):
+            vSupp -= len(vData)
+        if (vData):
+            self.__rpt.log(vData, pTstmp, vObis)
+            if (self.__http is not None): self.__http.publish(self.__idf, vData, pTstmp)
+        if (self.__sts is not None):
+            self.__sts.count("telegrams")
+            if (vSupp): self.__sts.count("suppressed", vSupp)
+            self.__sts.record("report", time.perf_counter_ns() - vStrt)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def trigger(self):
+        """
+        @brief  Runs all report handlers of the meter immediately.
+        """
+        self.__rpt.trigger()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def flush(self):
+        """
+        @brief  Writes the buffered data of all report handlers of the meter to their files.
+        """
+        self.__rpt.flush()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def state(self):
+        """
+        @brief  Returns the state of the report handlers of the meter as JSON serialisable dict.
+        """
+        return dict(rpt=self.__rpt.state())
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def restore(self, pState:dict):
+        """
+        @brief  Restores the state of the report handlers of the meter; to be called before any data is received.
+        @param  pState  A dict returned by state().
+        """
+        self.__rpt.restore(pState.get("rpt", {}))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def reload(self, pCfg:dict):
+        """
+        @brief  Applies a changed meter configuration while receiving continues and returns the tuple (kept, replaced,
+                added, removed) of report handler counts. Decoding settings take effect with the next packet, report
+                handlers are only rebuilt where their configuration changed.
+        @param  pCfg  A HM meter configuration; its source is not evaluated here.
+        """
+        if (pCfg != self.__cfg): self.__configure(pCfg)
+        return self.__rpt.reload(pyRPT.Rpt(pCfg["rptref"]), self.__log, self.__idf + " / " + pCfg["note"])
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def close(self):
+        """
+        @brief  Closes the report handlers of a meter which is removed; packets still queued are dropped by them.
+        """
+        self.__rpt.close()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def error(self, packet:bytes, pError):
+        """
+        @brief  Logs a packet which could not be processed.
+        @param  packet  A SML_Telegram.
+        @param  pError  The exception or error message.
+        """
+        if (self.__sts is not None): self.__sts.count("errors")
+        self.__log.log(pyLOG.LogLvl.ERROR, "\n{}\n{}".format(pError, bytes(packet)))
+
+
+########################################################################################################################
+
+
+class SMTrace_ShmRing(object):
+    """
+    @brief  Single producer, single consumer ring of fixed size slots in shared memory between two processes.
+            A slot holds a header (kind, tag, length, extra) and up to 'size' bytes of data. Two semaphores count the
+            free and the filled slots, so every slot is handed over with a system call which also orders the memory
+            accesses of both processes; the read and write positions are private to either side.
+    """
+
+    HEADER = struct.Struct("<BIIq")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pCtx, pSlots:int=64, pSize:int=16384):
+        """
+        @brief  Constructor, creates the shared memory; the instance is passed to the other process as argument.
+        @param  pCtx    A multiprocessing context.
+        @param  pSlots  Number of slots.
+        @param  pSize   Maximum data size of a slot in bytes.
+        """
+        self.__free  = pCtx.Semaphore(pSlots)
+        self.__full  = pCtx.Semaphore(0)
+        self.__pos   = 0
+        self.__size  = pSize
+        self.__slots = pSlots
+        self.__step  = self.HEADER.size + pSize
+        self.__shm   = multiprocessing.shared_memory.SharedMemory(create=True, size=pSlots * self.__step)
+        self.__own   = True
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __getstate__(self):
+        return (self.__free, self.__full, self.__size, self.__slots, self.__shm.name)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __setstate__(self, pState):
+        self.__free, self.__full, self.__size, self.__slots, vName = pState
+        self.__pos  = 0
+        self.__step = self.HEADER.size + self.__size
+        self.__shm  = multiprocessing.shared_memory.SharedMemory(name=vName)
+        self.__own  = False
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @property
+    def size(self):
+        """
+        @brief  Returns the maximum data size of a slot in bytes.
+        """
+        return self.__size
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def put(self, pKind:int, pTag:int, pData:bytes, pExtra:int=0, pTimeout:float=None):
+        """
+        @brief  Copies data into the next free slot and returns True, or False if no slot became free within pTimeout.
+        @param  pKind     Kind of the data, 0 ... 255.
+        @param  pTag      Tag of the data, 0 ... 2^32-1.
+        @param  pData     Data of at most 'size' bytes.
+        @param  pExtra    Signed 64 bit value passed along.
+        @param  pTimeout  Maximum time in seconds to wait for a free slot; None for forever.
+        """
+        if (len(pData) > self.__size): raise SMTrace_Exception("Data of {} bytes exceeds the slot size of {} bytes.".format(len(pData), self.__size))
+        if (not self.__free.acquire(timeout=pTimeout)): return False
+        vOfs = (self.__pos % self.__slots) * self.__step
+        self.HEADER.pack_into(self.__shm.buf, vOfs, pKind, pTag, len(pData), pExtra)
+        self.__shm.buf[vOfs + self.HEADER.size:vOfs + self.HEADER.size + len(pData)] = pData
+        self.__pos += 1
+        self.__full.release()
+        return True
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def get(self, pTimeout:float=None):
+        """
+        @brief  Returns the tuple (kind, tag, data, extra) of the next filled slot and frees it, or None if no slot was
+                filled within pTimeout.
+        @param  pTimeout  Maximum time in seconds to wait; None for forever, 0 for not at all.
+        """
+        if (not self.__full.acquire(timeout=pTimeout)): return None
+        vOfs = (self.__pos % self.__slots) * self.__step
+        vKind, vTag, vLen, vExtra = self.HEADER.unpack_from(self.__shm.buf, vOfs)
+        vData = bytes(self.__shm.buf[vOfs + self.HEADER.size:vOfs + self.HEADER.size + vLen])
+        self.__pos += 1
+        self.__free.release()
+        return vKind, vTag, vData, vExtra
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def close(self):
+        """
+        @brief  Detaches from the shared memory, which is removed by the creating side.
+        """
+        self.__shm.close()
+        if (self.__own): self.__shm.unlink()
+
+
+########################################################################################################################
+
+
+class SMTrace_ShmWorker(object):
+    """
+    @brief  Decode worker process fed via shared memory.
+            Packets are passed to the process through one SMTrace_ShmRing and the decoded entries come back through a
+            second one, in the order of the packets. The decoder of a meter is pickled once when the meter sends its
+            first packet and again only if it was replaced, e.g. by a reload; the entries are returned packed (see
+            pack()) instead of pickled, so a packet costs two copies and no pickling. A worker process which died is
+            started again, the packets it had not decoded yet are returned as errors.
+    """
+
+    KIND_PACKET     = 1
+    KIND_REGISTER   = 2
+    KIND_STOP       = 3
+    KIND_ENTRIES    = 4
+    KIND_BADCRC     = 5
+    KIND_ERROR      = 6
+    KIND_UNREGISTER = 7
+    ENTRY         = struct.Struct("<BBBbB") # object name length, flags (1 unit, 2 scaler), unit, scaler, value type
+    VALUE         = (type(None), bool, int, bytes) # value types 0 ... 3; 4 is an unsigned 64 bit int, 5 a bool True
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def pack(pEntries:list):
+        """
+        @brief  Returns the entries (object name, unit, scaler, value) as one bytes object of fixed size entry headers,
+                each followed by the object name and the value (signed or unsigned 64 bit int, or length and octets).
+        @param  pEntries  Entries as returned by SMTrace_SMLPacket.decode().
+        """
+        vRslt = bytearray()
+        for vObjName, vUnit, vScaler, vValue in pEntries:
+            vFlgs = (0 if (vUnit is None) else 1) | (0 if (vScaler is None) else 2)
+            if   (vValue is None             ): vType, vData = 0, b""
+            elif (isinstance(vValue, bool)   ): vType, vData = 5 if (vValue) else 1, b""
+            elif (isinstance(vValue, int)    ): vType, vData = (2, struct.pack("<q", vValue)) if (vValue < (1 << 63)) else (4, struct.pack("<Q", vValue))
+            else                              : vType, vData = 3, struct.pack("<H", len(vValue)) + bytes(vValue)
+            vRslt += SMTrace_ShmWorker.ENTRY.pack(len(vObjName), vFlgs, vUnit or 0, vScaler or 0, vType)
+            vRslt += vObjName
+            vRslt += vData
+        return bytes(vRslt)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def unpack(pData:bytes):
+        """
+        @brief  Returns the list of entries (object name, unit, scaler, value) of pack(), with octets as bytearray like
+                the decoders return them.
+        @param  pData  Packed entries.
+        """
+        vRslt = []
+        vIdx  = 0
+        vSize = SMTrace_ShmWorker.ENTRY.size
+        while (vIdx < len(pData)):
+            vLen, vFlgs, vUnit, vScaler, vType = SMTrace_ShmWorker.ENTRY.unpack_from(pData, vIdx)
+            vIdx    += vSize
+            vObjName = bytearray(pData[vIdx:vIdx + vLen])
+            vIdx    += vLen
+            if   (vType == 0): vValue = None
+            elif (vType == 1): vValue = False
+            elif (vType == 5): vValue = True
+            elif (vType == 2): vValue = struct.unpack_from("<q", pData, vIdx)[0]; vIdx += 8
+            elif (vType == 4): vValue = struct.unpack_from("<Q", pData, vIdx)[0]; vIdx += 8
+            else:
+                vLen   = struct.unpack_from("<H", pData, vIdx)[0]
+                vValue = bytearray(pData[vIdx + 2:vIdx + 2 + vLen])
+                vIdx  += 2 + vLen
+            vRslt.append((vObjName, vUnit if (vFlgs & 1) else None, vScaler if (vFlgs & 2) else None, vValue))
+        return vRslt
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def serve(pIn:SMTrace_ShmRing, pOut:SMTrace_ShmRing):
+        """
+        @brief  Main function of the worker process: decodes the packets of pIn into pOut until KIND_STOP.
+        @param  pIn   Ring of the packets and decoder registrations.
+        @param  pOut  Ring of the results, tagged like the packets and carrying the decode duration in ns.
+        """
+        signal.signal(signal.SIGINT, signal.SIG_IGN) # stopped by the parent
+        vDec = dict()
+        while (True):
+            vKind, vTag, vData, vExtra = pIn.get()
+            if   (vKind == SMTrace_ShmWorker.KIND_STOP      ): break
+            elif (vKind == SMTrace_ShmWorker.KIND_REGISTER  ): vDec[vTag] = pickle.loads(vData)
+            elif (vKind == SMTrace_ShmWorker.KIND_UNREGISTER): vDec.pop(vTag, None)
+            else:
+                vStrt = time.perf_counter_ns()
+                try:
+                    vEnt  = SMTrace_SMLPacket.decode(vData, *vDec[vTag])[1]
+                    vKind = SMTrace_ShmWorker.KIND_BADCRC if (vEnt is None) else SMTrace_ShmWorker.KIND_ENTRIES
+                    vData = b"" if (vEnt is None) else SMTrace_ShmWorker.pack(vEnt)
+                except Exception as e:
+                    vKind = SMTrace_ShmWorker.KIND_ERROR
+                    vData = "{}: {}".format(type(e).__name__, e).encode("utf-8")[:pOut.size]
+                if (len(vData) > pOut.size):
+                    vKind = SMTrace_ShmWorker.KIND_ERROR
+                    vData = "Decoded entries of {} bytes exceed the slot size of {} bytes.".format(len(vData), pOut.size).encode("utf-8")
+                pOut.put(vKind, vTag, vData, time.perf_counter_ns() - vStrt)
+        pIn.close()
+        pOut.close()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pSlots:int=64, pSize:int=16384, pName:str="SMTrace_ShmWorker"):
+        """
+        @brief  Constructor, starts the worker process.
+        @param  pSlots  Number of slots of both rings, i.e. the maximum number of packets in flight.
+        @param  pSize   Maximum packet size in bytes; results may be twice as large.
+        @param  pName   Name of the process.
+        """
+        self.__ctx   = multiprocessing.get_context("spawn") # no fork of a process running threads
+        self.__slots = pSlots
+        self.__size  = pSize
+        self.__name  = pName
+        self.__tag   = 0
+        self.__done  = deque() # results of a dead worker process not yet returned
+        self.__rcnt  = 0
+        self.__mssg  = None
+        self.__start()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __start(self):
+        """
+        @brief  Creates the rings and starts the worker process, which knows no decoder yet.
+        """
+        self.__in   = SMTrace_ShmRing(self.__ctx, self.__slots, self.__size)
+        self.__out  = SMTrace_ShmRing(self.__ctx, self.__slots, 2 * self.__size)
+        self.__reg  = dict() # key of a meter -> (tag, decoder tuple)
+        self.__pend = 0
+        self.__prc  = self.__ctx.Process(target=SMTrace_ShmWorker.serve, args=(self.__in, self.__out), name=self.__name, daemon=True)
+        self.__prc.start()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __restart(self):
+        """
+        @brief  Replaces a dead worker process and its rings. The results it passed before are kept, the other packets
+                in flight are returned as errors by result().
+        """
+        self.__mssg  = "Decode worker '{}' exited with {} and was restarted.".format(self.__name, self.__prc.exitcode)
+        for i in range(self.__pend):
+            vRslt = self.__out.get(0)
+            self.__done.append((None, 0, self.__mssg) if (vRslt is None) else self.__unpack(vRslt))
+        self.__rcnt += 1
+        self.__in.close()
+        self.__out.close()
+        self.__start()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __put(self, pKind:int, pTag:int, pData:bytes):
+        """
+        @brief  Passes data to the worker process and returns True, checking it is still alive while waiting for a free
+                slot; a dead worker process is restarted and False returned.
+        """
+        while (not self.__in.put(pKind, pTag, pData, pTimeout=1.0)):
+            if (not self.__prc.is_alive()):
+                self.__restart()
+                return False
+        return True
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @property
+    def restarts(self):
+        """
+        @brief  Returns the number of restarts of the worker process.
+        """
+        return self.__rcnt
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def submit(self, pPacket:bytes, pDecoder:tuple, pKey=None):
+        """
+        @brief  Passes a packet to the worker process; its result is returned by a later call of result(). A dead worker
+                process is restarted first; if the restarted one dies as well, a SMTrace_Exception is raised.
+        @param  pPacket   A SML_Telegram.
+        @param  pDecoder  The tuple (crc, decoder, lazy) of SMTrace_SMLPacket.decoder() for the packet.
+        @param  pKey      Key of the meter, e.g. its identifier; a new decoder of the same key replaces the previous one.
+        """
+        if (not self.__prc.is_alive()): self.__restart()
+        for vTry in range(2):
+            vReg = self.__reg.get(pKey)
+            if ((vReg is None) or (vReg[1] != pDecoder)):
+                vReg = self.__reg[pKey] = (self.__tag if (vReg is None) else vReg[0], pDecoder)
+                if (vReg[0] == self.__tag): self.__tag += 1
+                if (not self.__put(self.KIND_REGISTER, vReg[0], pickle.dumps(pDecoder))): continue
+            if (self.__put(self.KIND_PACKET, vReg[0], pPacket)):
+                self.__pend += 1
+                return
+        raise SMTrace_Exception(self.__mssg)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def forget(self, pKey):
+        """
+        @brief  Removes the decoder of a meter from the worker process; called by the thread which submits the packets.
+        @param  pKey  Key of the meter as given to submit().
+        """
+        vReg = self.__reg.pop(pKey, None)
+        if (vReg is not None): self.__put(self.KIND_UNREGISTER, vReg[0], b"")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def result(self, pBlock:bool=True):
+        """
+        @brief  Returns the tuple (entries, decode duration, error) of the oldest submitted packet like
+                SMTrace_Pipeline.work(), or None if it is not yet decoded and pBlock is False.
+        @param  pBlock  Wait for the result.
+        """
+        if (self.__done):
+            return self.__done.popleft()
+        if (not self.__pend):
+            return None
+        vRslt = self.__out.get(0)
+        while (vRslt is None):
+            if (not self.__prc.is_alive()):
+                vRslt = self.__out.get(0) # the last result may have been passed right before exiting
+                if (vRslt is None):
+                    self.__pend -= 1
+                    self.__restart()
+                    return None, 0, self.__mssg
+            elif (not pBlock):
+                return None
+            else:
+                vRslt = self.__out.get(1.0)
+        self.__pend -= 1
+        return self.__unpack(vRslt)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __unpack(self, pRslt:tuple):
+        """
+        @brief  Returns the tuple (entries, decode duration, error) of a result slot.
+        """
+        vKind, vTag, vData, vDur = pRslt
+        if   (vKind == self.KIND_ENTRIES): return self.unpack(vData), vDur, None
+        elif (vKind == self.KIND_BADCRC ): return None, vDur, None
+        else                             : return None, vDur, vData.decode("utf-8", "replace")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def stop(self, pTimeout:float=10.0):
+        """
+        @brief  Stops the worker process after the submitted packets and removes the shared memory.
+        @param  pTimeout  Maximum time in seconds to wait for the worker process in total; None for forever.
+        """
+        vEnd = None if (pTimeout is None) else time.monotonic() + pTimeout
+        if (self.__prc.is_alive() and self.__in.put(self.KIND_STOP, 0, b"", pTimeout=pTimeout)):
+            self.__prc.join(None if (vEnd is None) else max(0.0, vEnd - time.monotonic()))
+        if (self.__prc.is_alive()): self.__prc.terminate()
+        self.__in.close()
+        self.__out.close()
+
+
+########################################################################################################################
+
+
+class SMTrace_Pipeline(object):
+    """
+    @brief  Decoupled processing of received packets.
+            The receive threads only enqueue completed packets into bounded queues; worker threads check, decode and
+            report them. Every meter is pinned to one queue, which keeps the packets of a meter in order and its report
+            handlers free of concurrent calls. In 'process' mode the workers hand the CRC check and decoding over to a
+            process pool and report the results in order. In 'shm' mode every worker owns a SMTrace_ShmWorker process,
+            which receives the packets and returns the decoded entries through shared memory instead of pickles, so
+            decoding scales with the number of workers and cores. Only the 'thread' mode skips unchanged entries with
+            the deadband prefilter, the decoding processes don't share the deadband state of the meters.
+    """
+
+    MODES    = ("thread", "process", "shm")
+    POLICIES = ("block", "drop", "dropoldest")
+    STAGES   = ("queue", "decode", "report")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def work(pPacket:bytes, pCrc:SMTrace_CRC16, pDec:SMTrace_SMLDecoder, pLazy:bool):
+        """
+        @brief  Decodes a packet within a worker process and returns the tuple (entries, decode duration, error).
+        @param  pPacket  A SML_Telegram.
+        @param  pCrc     CRC16 checker or None.
+        @param  pDec     SML decoder.
+        @param  pLazy    Use the lazy SML decoder instead of pySML.
+        """
+        vTstmp = time.perf_counter_ns()
+        try:
+            return SMTrace_SMLPacket.decode(pPacket, pCrc, pDec, pLazy)[1], time.perf_counter_ns() - vTstmp, None
+        except Exception as e:
+            return None, time.perf_counter_ns() - vTstmp, "{}: {}".format(type(e).__name__, e)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pCfg:dict, pLog:pyLOG.Log=None):
+        """
+        @brief  Constructor.
+        @param  pCfg  A pipeline configuration.
+        @param  pLog  Logger for errors and statistics.
+        """
+        self.__cfg  = pCfg
+        self.__log  = pLog
+        self.__mode = pCfg.get("mode", "thread")
+        self.__plcy = pCfg.get("policy", "dropoldest")
+        self.__tout = pCfg.get("blocktimeout", 1.0)
+        self.__sint = pCfg.get("statsinterval", 0) * 1000000000
+        self.__slog = time.monotonic_ns()
+        if (self.__mode not in self.MODES   ): raise SMTrace_Exception("Pipeline mode '{}' is not one of {}.".format(self.__mode, self.MODES))
+        if (self.__plcy not in self.POLICIES): raise SMTrace_Exception("Pipeline policy '{}' is not one of {}.".format(self.__plcy, self.POLICIES))
+        self.__lock = threading.Lock()
+        self.__map  = dict() # meter identifier -> queue
+        self.__next = 0
+        self.__que  = [queue.Queue(pCfg.get("queuesize", 256)) for i in range(pCfg.get("workers", 2))]
+        self.__pool = concurrent.futures.ProcessPoolExecutor(len(self.__que), mp_context=multiprocessing.get_context("spawn")) if (self.__mode == "process") else None
+        self.__shm  = [SMTrace_ShmWorker(pCfg.get("slots", 64), pCfg.get("slotsize", 16384), "SMTrace_ShmWorker_{}".format(i)) for i in range(len(self.__que))] if (self.__mode == "shm") else None
+        self.__cnt  = dict(enqueued=0, dropped=0, processed=0, errors=0, maxdepth=0)
+        self.__lat  = {vStage: [0, 0, 0] for vStage in self.STAGES} # count, sum, max in ns
+        self.__thd  = [threading.Thread(target=self.__run, args=(vQue, None if (self.__shm is None) else self.__shm[i]), name="SMTrace_Pipeline_{}".format(i), daemon=True) for i,vQue in enumerate(self.__que)]
+        for vThd in self.__thd: vThd.start()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def put(self, pMeter:SMTrace_SMLPacket, pPacket:bytes, pTstmp:int=None):
+        """
+        @brief  Enqueues a packet of a meter, applying the configured policy if the queue is full. 'dropoldest' replaces
+                the oldest enqueued packet of the same meter, or drops the new one if there is none.
+        @param  pMeter   The SMTrace_SMLPacket instance which received the packet.
+        @param  pPacket  A SML_Telegram; must not be modified afterwards.
+        @param  pTstmp   Reception time in nanoseconds since the epoch; None for the time of processing.
+        """
+        vQue = self.__map.get(pMeter.idf)
+        if (vQue is None):
+            with self.__lock:
+                if (pMeter.idf not in self.__map):
+                    self.__map[pMeter.idf] = self.__que[self.__next % len(self.__que)]
+                    self.__next += 1
+                vQue = self.__map[pMeter.idf]
+        vItem = (pMeter, pPacket, pTstmp, time.perf_counter_ns())
+        vEnqd = 1
+        vDrop = 0
+        try:
+            if (self.__plcy == "block"): vQue.put(vItem, timeout=self.__tout)
+            else                       : vQue.put_nowait(vItem)
+        except queue.Full:
+            vEnqd = 0
+            vDrop = 1
+            if ((self.__plcy == "dropoldest") and self.__replace(vQue, pMeter.idf, vItem)):
+                vEnqd = 1
+        with self.__lock:
+            self.__cnt["enqueued"] += vEnqd
+            self.__cnt["dropped"]  += vDrop
+            self.__cnt["maxdepth"]  = max(self.__cnt["maxdepth"], vQue.qsize())
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def __replace(pQue:queue.Queue, pIdf:str, pItem:tuple):
+        """
+        @brief  Removes the oldest enqueued packet of a meter and enqueues a new one in its place at the tail. Packets of
+                other meters sharing the queue and identifiers of removed meters are kept. Returns whether a packet
+                was replaced.
+        @param  pQue   A full queue.
+        @param  pIdf   Identifier of the meter.
+        @param  pItem  The item to enqueue.
+        """
+        with pQue.mutex:
+            for i,vItem in enumerate(pQue.queue):
+                if (isinstance(vItem, tuple) and (vItem[0].idf == pIdf)):
+                    del pQue.queue[i]
+                    pQue.queue.append(pItem)
+                    pQue.not_empty.notify()
+                    return True
+        return False
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def forget(self, pIdf:str):
+        """
+        @brief  Releases the queue of a removed meter; in 'shm' mode its decoder is removed from the worker process too,
+                behind the packets of the meter which are still enqueued. If the queue is full the decoder is kept,
+                which only costs memory until a meter of the same identifier registers another one.
+        @param  pIdf  A HM meter identifier.
+        """
+        with self.__lock:
+            vQue = self.__map.pop(pIdf, None)
+        if ((vQue is not None) and (self.__shm is not None)):
+            try   : vQue.put_nowait(pIdf)
+            except queue.Full: pass
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __latency(self, pStage:str, pDuration:int):
+        """
+        @brief  Accounts the duration of a pipeline stage.
+        @param  pStage     Name of the stage.
+        @param  pDuration  Duration in nanoseconds.
+        """
+        vLat = self.__lat[pStage]
+        vLat[0] += 1
+        vLat[1] += pDuration
+        if (pDuration > vLat[2]): vLat[2] = pDuration
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __finish(self, pMeter:SMTrace_SMLPacket, pPacket:bytes, pTstmp:int, pTelegram, pEntries:list, pError):
+        """
+        @brief  Reports a decoded packet of a meter.
+        @param  pMeter     The SMTrace_SMLPacket instance which received the packet.
+        @param  pPacket    A SML_Telegram.
+        @param  pTstmp     Reception time in nanoseconds since the epoch or None.
+        @param  pTelegram  The decoded pySML.SML_Telegram or None.
+        @param  pEntries   The decoded entries or None.
+        @param  pError     An error which occurred while decoding or None.
+        """
+        vTstmp = time.perf_counter_ns()
+        try:
+            if (pError is not None): raise SMTrace_Exception(pError)
+            pMeter.report(pPacket, pTelegram, pEntries, pTstmp)
+        except Exception as e:
+            pMeter.error(pPacket, e)
+            with self.__lock: self.__cnt["errors"] += 1
+        with self.__lock:
+            self.__cnt["processed"] += 1
+            self.__latency("report", time.perf_counter_ns() - vTstmp)
+        if ((self.__sint) and ((time.monotonic_ns() - self.__slog) >= self.__sint)):
+            self.__slog = time.monotonic_ns()
+            if (self.__log is not None): self.__log.log(pyLOG.LogLvl.INFO, "pipeline statistics: {}".format(self.stats()))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __run(self, pQue:queue.Queue, pShm:SMTrace_ShmWorker=None):
+        """
+        @brief  Worker thread processing the packets of one queue until None is dequeued.
+        @param  pQue  The queue to process.
+        @param  pShm  The decode worker process of the queue in 'shm' mode.
+        """
+        vPend = deque()
+        vDpth = len(self.__que) if (pShm is None) else (self.__cfg.get("slots", 64) - 1) # a free result slot per packet in flight
+        while (True):
+            try:
+                vItem = pQue.get(block=(not vPend))
+            except queue.Empty:
+                vItem = False
+            if (isinstance(vItem, str)): # identifier of a removed meter
+                pShm.forget(vItem)
+            elif (vItem):
+                vMeter, vPacket, vRcvd, vTstmp = vItem
+                vStrt = time.perf_counter_ns()
+                with self.__lock: self.__latency("queue", vStrt - vTstmp)
+                if (pShm is not None):
+                    try:
+                        pShm.submit(vPacket, vMeter.decoder(), vMeter.idf)
+                        vPend.append((vMeter, vPacket, vRcvd, None))
+                    except Exception as e:
+                        self.__finish(vMeter, vPacket, vRcvd, None, None, "{}: {}".format(type(e).__name__, e))
+                elif (self.__pool is None):
+                    vError = None
+                    vTel   = None
+                    vEnt   = None
+                    try   : vTel, vEnt = SMTrace_SMLPacket.decode(vPacket, *vMeter.decoder(), vMeter.prefilter(vRcvd))
+                    except Exception as e: vError = "{}: {}".format(type(e).__name__, e)
+                    with self.__lock: self.__latency("decode", time.perf_counter_ns() - vStrt)
+                    self.__finish(vMeter, vPacket, vRcvd, vTel, vEnt, vError)
+                else:
+                    vPend.append((vMeter, vPacket, vRcvd, self.__pool.submit(self.work, vPacket, *vMeter.decoder())))
+            while (vPend):
+                vBlck = (not vItem) or (len(vPend) > vDpth)
+                try:
+                    if (pShm is None):
+                        if ((not vBlck) and (not vPend[0][3].done())): break
+                        vRslt = vPend[0][3].result()
+                    else:
+                        vRslt = pShm.result(vBlck)
+                        if (vRslt is None): break
+                except Exception as e:
+                    vRslt = None, 0, "{}: {}".format(type(e).__name__, e)
+                vMeter, vPacket, vRcvd, vFutr = vPend.popleft()
+                vEnt, vDur, vError = vRslt
+                with self.__lock: self.__latency("decode", vDur)
+                self.__finish(vMeter, vPacket, vRcvd, None, vEnt, vError)
+            if (vItem is None):
+                break
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def stats(self):
+        """
+        @brief  Returns a dict of the pipeline counters, the current queue depths and per stage latencies in microseconds.
+        """
+        with self.__lock:
+            vRslt = dict(self.__cnt)
+            vRslt["depth"]   = [vQue.qsize() for vQue in self.__que]
+            if (self.__shm is not None): vRslt["restarts"] = sum(vShm.restarts for vShm in self.__shm)
+            vRslt["latency"] = {k: dict(count=v[0], avg_us=(v[1] // v[0] // 1000) if (v[0]) else 0, max_us=v[2] // 1000) for k,v in self.__lat.items()}
+        return vRslt
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def stop(self, pTimeout:float=10.0):
+        """
+        @brief  Processes the already enqueued packets and stops the workers. A queue which does not get room for the
+                stop marker in time drops its oldest packet instead.
+        @param  pTimeout  Maximum time in seconds to wait for all workers together; None for forever.
+        """
+        vEnd  = None if (pTimeout is None) else time.monotonic() + pTimeout
+        vLeft = lambda: None if (vEnd is None) else max(0.0, vEnd - time.monotonic())
+        for vQue in self.__que:
+            try:
+                vQue.put(None, timeout=vLeft())
+            except queue.Full:
+                try   : vQue.get_nowait()
+                except queue.Empty: pass
+                else  :
+                    with self.__lock: self.__cnt["dropped"] += 1
+                try   : vQue.put_nowait(None)
+                except queue.Full: pass
+        for vThd in self.__thd:
+            vThd.join(vLeft())
+        if (self.__pool is not None):
+            self.__pool.shutdown(wait=False)
+        for vShm in (self.__shm or []):
+            vShm.stop(vLeft())
+
+
+########################################################################################################################
+
+
+class SMTrace_AsyncReader(object):
+    """
+    @brief  Event loop driven counterpart of serial.threaded.ReaderThread.
+            The serial port is read non-blocking whenever its file descriptor becomes readable; on platforms without
+            selectable serial ports (Windows) the port is polled instead. The protocol sees the same calls as from a
+            ReaderThread.
+    """
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pLoop:asyncio.AbstractEventLoop, pSerial:serial.Serial, pProtocolFactory, pPoll:float=0.05):
+        """
+        @brief  Constructor.
+        @param  pLoop             The event loop to read within.
+        @param  pSerial           An opened serial port.
+        @param  pProtocolFactory  A callable returning a serial.threaded.Protocol instance.
+        @param  pPoll             Poll interval in seconds if the serial port is not selectable.
+        """
+        self.alive            = False
+        self.protocol         = None
+        self.protocol_factory = pProtocolFactory
+        self.serial           = pSerial
+        self.__fd             = None
+        self.__loop           = pLoop
+        self.__poll           = pPoll
+        self.__timer          = None
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def start(self):
+        """
+        @brief  Attaches the serial port to the event loop.
+        """
+        self.alive = True
+        self.__loop.call_soon_threadsafe(self.__attach)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def close(self):
+        """
+        @brief  Detaches the serial port from the event loop and closes it.
+        """
+        if (self.__loop.is_running()): self.__loop.call_soon_threadsafe(self.__detach, None)
+        else                         : self.__detach(None)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __attach(self):
+        """
+        @brief  Switches the serial port to non-blocking reads and registers it with the event loop.
+        """
+        self.serial.timeout = 0
+        self.protocol = self.protocol_factory()
+        self.protocol.connection_made(self)
+        try:
+            self.__fd = self.serial.fileno()
+            self.__loop.add_reader(self.__fd, self.__read)
+        except (AttributeError, NotImplementedError, OSError):
+            self.__fd    = None
+            self.__timer = self.__loop.call_later(self.__poll, self.__read)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __detach(self, pExc):
+        """
+        @brief  Unregisters and closes the serial port and informs the protocol.
+        @param  pExc  Exception which terminated the connection or None.
+        """
+        if (not self.alive): return
+        self.alive = False
+        if (self.__fd    is not None): self.__loop.remove_reader(self.__fd)
+        if (self.__timer is not None): self.__timer.cancel()
+        self.serial.close()
+        if (self.protocol is not None): self.protocol.connection_lost(pExc)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __read(self):
+        """
+        @brief  Reads all available bytes and passes them to the protocol.
+        """
+        try:
+            data = self.serial.read(self.serial.in_waiting or (1 if (self.__fd is not None) else 0))
+        except serial.SerialException as e:
+            self.__detach(e)
+            return
+        if (data):
+            try:
+                self.protocol.data_received(data)
+            except Exception as e:
+                self.__detach(e)
+                return
+        if (self.__fd is None):
+            self.__timer = self.__loop.call_later(self.__poll, self.__read)
+
+
+########################################################################################################################
+
+
+class SMTrace_AsyncRuntime(object):
+    """
+    @brief  Single event loop runtime for all meters.
+            One thread runs an asyncio event loop reading every serial port, one AsyncIOScheduler triggers the cron jobs
+            of all report handlers and a small shared thread pool runs the blocking handler jobs (e.g. SMTP).
+    """
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pCfg:dict, pLog:pyLOG.Log=None):
+        """
+        @brief  Constructor.
+        @param  pCfg  A runtime configuration.
+        @param  pLog  Logger.
+        """
+        self.__cfg  = pCfg
+        self.__log  = pLog
+        self.__loop = asyncio.new_event_loop()
+        self.__trg  = apscheduler.schedulers.asyncio.AsyncIOScheduler(event_loop=self.__loop, executors={"default": apscheduler.executors.pool.ThreadPoolExecutor(pCfg.get("workers", 2))})
+        self.__thd  = threading.Thread(target=self.__run, name="SMTrace_AsyncRuntime", daemon=True)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @property
+    def scheduler(self):
+        """
+        @brief  Returns the scheduler shared by all report handlers.
+        """
+        return self.__trg
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def reader(self, pSerial:serial.Serial, pProtocolFactory):
+        """
+        @brief  Returns a SMTrace_AsyncReader of a serial port running within the event loop.
+        @param  pSerial           An opened serial port.
+        @param  pProtocolFactory  A callable returning a serial.threaded.Protocol instance.
+        """
+        return SMTrace_AsyncReader(self.__loop, pSerial, pProtocolFactory, self.__cfg.get("pollinterval", 0.05))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __run(self):
+        """
+        @brief  Event loop thread.
+        """
+        asyncio.set_event_loop(self.__loop)
+        self.__trg.start()
+        self.__loop.run_forever()
+        self.__trg.shutdown(wait=False)
+        self.__loop.close()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def start(self):
+        """
+        @brief  Starts the event loop thread.
+        """
+        self.__thd.start()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def stop(self, pTimeout:float=10.0):
+        """
+        @brief  Stops the event loop after the already scheduled callbacks, e.g. closing readers, are done.
+        @param  pTimeout  Maximum time in seconds to wait for the event loop thread.
+        """
+        if (self.__thd.is_alive()):
+            self.__loop.call_soon_threadsafe(self.__loop.stop)
+            self.__thd.join(pTimeout)
+
+
+########################################################################################################################
+
+
+class SMTrace_NetReader(object):
+    """
+    @brief  Multiplexed reader of the network and file sources of all meters.
+            One thread waits on all sockets and files at once and passes the received bytes to the protocol instance of
+            every source with the same calls a serial.threaded.ReaderThread makes. TCP connections are established
+            non-blocking; a failed, lost or (with 'idletimeout') silent source is closed and opened again after a backoff
+            which doubles per failed attempt, without affecting the other sources.
+            Sources are 'tcp: host:port' (e.g. ser2net, Tasmota IR read heads), 'udp: [address:]port' (every datagram
+            is passed on) and 'file: path' (FIFOs and character devices, which are opened again at EOF, or regular files,
+            which are followed like 'tail -f').
+    """
+
+    KINDS = ("tcp", "udp", "file")
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    class Source(object):
+        """
+        @brief  A source of a SMTrace_NetReader, used like a serial.threaded.ReaderThread.
+        """
+
+        def __init__(self, pReader, pName:str, pKind:str, pAddr, pProtocolFactory):
+            self.address          = pAddr
+            self.alive            = False
+            self.backoff          = 0.0   # seconds of the current backoff, 0 after a successful open
+            self.connecting       = False
+            self.connects         = 0
+            self.due              = None  # time.monotonic() of the next open, connect timeout, idle timeout or poll
+            self.handle           = None  # socket or file descriptor
+            self.kind             = pKind
+            self.name             = pName
+            self.polled           = False
+            self.protocol         = None
+            self.protocol_factory = pProtocolFactory
+            self.__rdr            = pReader
+
+        def __repr__(self):
+            return "<{} '{}' {}:{}>".format(type(self).__name__, self.name, self.kind, self.address)
+
+        def start(self):
+            """
+            @brief  Opens the source within the reader thread.
+            """
+            self.alive = True
+            self.__rdr.command(self, True)
+
+        def close(self):
+            """
+            @brief  Closes the source within the reader thread.
+            """
+            self.alive = False
+            self.__rdr.command(self, False)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def address(pKind:str, pValue):
+        """
+        @brief  Returns the address of a source configuration: a tuple (host, port) for 'tcp' and 'udp', a path for 'file'.
+        @param  pKind   One of KINDS.
+        @param  pValue  'host:port' or [host, port]; for 'udp' also a port only, which is bound on all interfaces.
+        """
+        if (pKind not in SMTrace_NetReader.KINDS): raise SMTrace_Exception("Source '{}' is not one of {}.".format(pKind, SMTrace_NetReader.KINDS))
+        if (pKind == "file"):
+            return str(pValue)
+        if (isinstance(pValue, (list, tuple))):
+            vHost, vPort = pValue
+        elif ((pKind == "udp") and (":" not in str(pValue))):
+            vHost, vPort = "0.0.0.0", pValue
+        else:
+            vHost, _, vPort = str(pValue).rpartition(":")
+        if ((not vHost) and (pKind == "tcp")): raise SMTrace_Exception("Source '{}: {}' has no host.".format(pKind, pValue))
+        return (vHost.strip("[]") or "0.0.0.0", int(vPort))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __init__(self, pCfg:dict=None, pLog:pyLOG.Log=None):
+        """
+        @brief  Constructor.
+        @param  pCfg  A runtime configuration (backoff, backoffmax, idletimeout, pollinterval) or None.
+        @param  pLog  Logger.
+        """
+        pCfg = pCfg or dict()
+        self.__bkf = pCfg.get("backoff",      1.0)
+        self.__bkm = pCfg.get("backoffmax",   60.0)
+        self.__cmd = deque()
+        self.__idl = pCfg.get("idletimeout",  0.0)
+        self.__lck = threading.Lock()
+        self.__log = pLog
+        self.__pol = pCfg.get("pollinterval", 0.05)
+        self.__run = False
+        self.__sel = selectors.DefaultSelector()
+        self.__src = []
+        self.__thd = None
+        self.__wak = socket.socketpair()
+        for vSock in self.__wak: vSock.setblocking(False)
+        self.__sel.register(self.__wak[0], selectors.EVENT_READ, None)
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def source(self, pName:str, pKind:str, pValue, pProtocolFactory):
+        """
+        @brief  Returns a new, not yet started source.
+        @param  pName             Name of the meter.
+        @param  pKind             One of KINDS.
+        @param  pValue            Address of the source as configured.
+        @param  pProtocolFactory  A callable returning a serial.threaded.Protocol instance.
+        """
+        vSrc = self.Source(self, pName, pKind, self.address(pKind, pValue), pProtocolFactory)
+        vSts = SMTrace_Stats.get(pName)
+        if (vSts is not None): vSts.gauge("connects", lambda: vSrc.connects)
+        return vSrc
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def __init__(self, pMssg=None):
+    def command(self, pSrc:Source, pOpen:bool):
         """
-        @brief  Constructor.
-        @param  Mssg  The Exception message.
+        @brief  Queues opening or closing a source for the reader thread, which is started with the first source.
+        @param  pSrc   A source of this reader.
+        @param  pOpen  Open if True, close otherwise.
         """
-        self._modl = inspect.stack()[1][0].f_locals["self"].__class__.__module__
-        self._clss = inspect.stack()[1][0].f_locals["self"].__class__.__name__
-        self._mthd = inspect.stack()[1][0].f_code.co_name
-        self._mssg = None
-        if   (pMssg == None): self._mssg = "{}.{}.{}".format(self._modl, self._clss, self._mthd)
-        else                : self._mssg = "{}.{}.{}: {}".format(self._modl, self._clss, self._mthd, {True:"---", False:pMssg}[pMssg==None])
+        with self.__lck:
+            self.__cmd.append((pSrc, pOpen))
+            if ((self.__thd is None) and pOpen):
+                self.__run = True
+                self.__thd = threading.Thread(target=self.__loop, name="SMTrace_NetReader", daemon=True)
+                self.__thd.start()
+        try:
+            self.__wak[1].send(b"\x00")
+        except BlockingIOError:
+            pass # already woken up
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def __str__(self):
+    def stop(self, pTimeout:float=10.0):
         """
-        @brief  Prints a nicely string representation.
+        @brief  Closes all sources and stops the reader thread.
+        @param  pTimeout  Maximum time in seconds to wait for the reader thread.
         """
-        return repr(self._mssg)
+        with self.__lck:
+            vThd = self.__thd
+            self.__run = False
+        if (vThd is not None):
+            self.command(None, False)
+            vThd.join(pTimeout)
 
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __loop(self):
+        """
+        @brief  Reader thread.
+        """
+        while (self.__run):
+            vDue = [s.due for s in self.__src if (s.due is not None)]
+            for vKey, vEvt in self.__sel.select(None if (not vDue) else max(0.0, min(vDue) - time.monotonic())):
+                if   (vKey.data is None          ): self.__drain()
+                elif (vKey.data.connecting       ): self.__connected(vKey.data)
+                elif (vKey.data.handle is not None): self.__read(vKey.data)
+            while (self.__cmd):
+                vSrc, vOpen = self.__cmd.popleft()
+                if   (vSrc is None    ): continue
+                elif (not vOpen       ): self.__close(vSrc, None)
+                elif (vSrc in self.__src): continue
+                else:
+                    self.__src.append(vSrc)
+                    self.__open(vSrc)
+            vNow = time.monotonic()
+            for vSrc in [s for s in self.__src if ((s.due is not None) and (s.due <= vNow))]:
+                if   (vSrc.handle is None): self.__open(vSrc)
+                elif (vSrc.polled       ): self.__read(vSrc)
+                elif (vSrc.connecting   ): self.__lost(vSrc, TimeoutError("connect timed out"))
+                else                     : self.__lost(vSrc, TimeoutError("no data for {} s".format(self.__idl)))
+        for vSrc in list(self.__src):
+            self.__close(vSrc, None)
+        self.__sel.close()
+        for vSock in self.__wak: vSock.close()
 
-########################################################################################################################
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __drain(self):
+        """
+        @brief  Empties the wake up socket.
+        """
+        try:
+            while (self.__wak[0].recv(4096)): pass
+        except BlockingIOError:
+            pass
 
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __open(self, pSrc:Source):
+        """
+        @brief  Opens a source non-blocking and registers it; failures are retried after the backoff.
+        @param  pSrc  A source of this reader.
+        """
+        try:
+            if (pSrc.kind == "file"):
+                pSrc.handle = os.open(pSrc.address, os.O_RDONLY | getattr(os, "O_NONBLOCK", 0))
+                pSrc.polled = os.path.isfile(pSrc.address) # regular files are always readable, so follow them by polling
+                if (not pSrc.polled): self.__sel.register(pSrc.handle, selectors.EVENT_READ, pSrc)
+                self.__up(pSrc)
+                return
+            vFam, vTyp, vPro, _, vAddr = socket.getaddrinfo(pSrc.address[0], pSrc.address[1], type=socket.SOCK_STREAM if (pSrc.kind == "tcp") else socket.SOCK_DGRAM)[0]
+            pSrc.handle = socket.socket(vFam, vTyp, vPro)
+            pSrc.handle.setblocking(False)
+            if (pSrc.kind == "udp"):
+                pSrc.handle.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                pSrc.handle.bind(vAddr)
+                self.__sel.register(pSrc.handle, selectors.EVENT_READ, pSrc)
+                self.__up(pSrc)
+                return
+            pSrc.handle.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            vErr = pSrc.handle.connect_ex(vAddr)
+            if (vErr not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK)): raise OSError(vErr, os.strerror(vErr))
+            pSrc.connecting = True
+            pSrc.due        = time.monotonic() + max(self.__idl or 10.0, self.__bkf)
+            self.__sel.register(pSrc.handle, selectors.EVENT_WRITE, pSrc)
+        except OSError as e:
+            self.__lost(pSrc, e)
 
-class SMTrace_Report(object):
-    """
-    @brief  HM reporting class.
-    """
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __connected(self, pSrc:Source):
+        """
+        @brief  Completes a non-blocking TCP connect.
+        @param  pSrc  A source of this reader.
+        """
+        vErr = pSrc.handle.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if (vErr):
+            self.__lost(pSrc, OSError(vErr, os.strerror(vErr)))
+            return
+        pSrc.connecting = False
+        self.__sel.modify(pSrc.handle, selectors.EVENT_READ, pSrc)
+        self.__up(pSrc)
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    class EMailTxt(object):
+    def __up(self, pSrc:Source):
+        """
+        @brief  Marks a source as opened and informs its protocol, which is created at the first open.
+        @param  pSrc  A source of this reader.
+        """
+        pSrc.connects += 1
+        pSrc.due       = (time.monotonic() + self.__pol) if (pSrc.polled) else (time.monotonic() + self.__idl) if (self.__idl) else None
+        if (pSrc.protocol is None): pSrc.protocol = pSrc.protocol_factory()
+        pSrc.protocol.connection_made(pSrc)
+        if (self.__log is not None): self.__log.log(pyLOG.LogLvl.INFO, "source '{}' {} {} opened".format(pSrc.name, pSrc.kind, pSrc.address))
 
-        def __init__(self, pCfg:dict, pTrg:apscheduler.schedulers.background.BackgroundScheduler, pLog:pyLOG.Log=None, pIdf=None):
-            self.__cfg = pCfg
-            self.__dat = dict()
-            self.__idf = pIdf
-            self.__log = pLog
-            self.__trg = pTrg
-            for v_cron in self.__cfg["cron"]:
-                self.__trg.add_job(self, trigger=apscheduler.triggers.cron.CronTrigger().from_crontab(v_cron))
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __read(self, pSrc:Source):
+        """
+        @brief  Reads the available bytes of a source and passes them to its protocol.
+        @param  pSrc  A source of this reader.
+        """
+        try:
+            vData = os.read(pSrc.handle, 1 << 16) if (pSrc.kind == "file") else pSrc.handle.recv(1 << 16)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self.__lost(pSrc, e)
+            return
+        if   (pSrc.polled): pSrc.due = time.monotonic() + self.__pol
+        elif (self.__idl ): pSrc.due = time.monotonic() + self.__idl
+        if (not vData):
+            if   (pSrc.kind == "tcp"                       ): self.__lost(pSrc, ConnectionResetError("closed by peer"))
+            elif ((pSrc.kind == "file") and (not pSrc.polled)): self.__lost(pSrc, EOFError("end of file"))
+            return
+        pSrc.backoff = 0.0 # only data proves a working source, a peer may accept and close at once
+        try:
+            pSrc.protocol.data_received(vData)
+        except Exception as e:
+            self.__lost(pSrc, e)
 
-        def __call__(self):
-            vSubj = None
-            vText = None
-            vSmtp = None
-            vMssg = email.message.EmailMessage()
-            if (self.__dat):
-                vText = ""
-                vMaxLenKey  = max([0] + [len(x) for x in self.__dat.keys()])
-                vMaxLenUnit = max([2] + [len(v["unit"]) for k,v in self.__dat.items() if v["unit"] is not None])
-                for k,v in sorted(self.__dat.items(), key=lambda x: [x[1]["tstmp"], x[0]]):
-                    vKey  = k
-                    vUnit = v["unit"]
-                    if (isinstance(vKey,  bytes)): vKey  = vKey.decode("utf-8")
-                    if (isinstance(vUnit, bytes)): vUnit = vUnit.decode("utf-8")
-                    vText += "{fTstmp} | {fKey:<{fKeyWidth}} | {fUnit:<{fUnitWidth}} | {fValu}\n".format(fTstmp=v["tstmp"].isoformat(), fKey=vKey, fKeyWidth=vMaxLenKey, fUnit=vUnit if (vUnit is not None) else "--", fUnitWidth=vMaxLenUnit, fValu=v["valu"] if (v["valu"] is not None) else "--")
-                vMssg.add_header("From", self.__cfg["from"])
-                vMssg.add_header("To",   self.__cfg["to"  ])
-                if (self.__cfg["cc"]       is not None): vMssg.add_header("Cc",      self.__cfg["cc"].replace(";", ",").strip(","))
-                if (self.__cfg["subjprfx"] is not None): vSubj = self.__cfg["subjprfx"]
-                if (self.__idf             is not None): vSubj = self.__idf if (vSubj is None) else vSubj + self.__idf
-                if (vSubj                  is not None): vMssg.add_header("Subject", vSubj)
-                vMssg.set_content(vText)
-                with smtplib.SMTP(self.__cfg["srvr"], self.__cfg["port"]) as vSmtp:
-                    if (    (self.__cfg["type"] == "STARTTLS"    )
-                        and (isinstance(self.__cfg["auth"], list))
-                        and (len(self.__cfg["auth"]) == 2        )
-                       ):
-                        vSmtp.starttls()
-                        try:
-                            vSmtp.login(*self.__cfg["auth"])
-                        except:
-                            if (self.__log is not None): self.__log.log(pyLOG.LogLvl.ERROR, "Could not login into '{fSrvr}:{fPort}'".format(fSrvr=self.__cfg["srvr"], fPort=self.__cfg["port"]))
-                    try:
-                        vSmtp.send_message(vMssg, from_addr=None, to_addrs=None)
-                        if (self.__log is not None): self.__log.log(pyLOG.LogLvl.INFO, "Email successfully sent to '{fTo}'".format(fTo=self.__cfg["to"]))
-                    except:
-                        if (self.__log is not None): self.__log.log(pyLOG.LogLvl.ERROR, "Could not send email to '{fTo}'".format(fTo=self.__cfg["to"]))
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __release(self, pSrc:Source, pExc):
+        """
+        @brief  Unregisters and closes the handle of a source and informs its protocol if it was opened.
+        @param  pSrc  A source of this reader.
+        @param  pExc  Exception which terminated the source or None.
+        """
+        vUp = (pSrc.handle is not None) and (not pSrc.connecting)
+        if (pSrc.handle is not None):
+            if (not pSrc.polled): self.__sel.unregister(pSrc.handle)
+            if (pSrc.kind == "file"): os.close(pSrc.handle)
+            else                    : pSrc.handle.close()
+        pSrc.connecting = False
+        pSrc.due        = None
+        pSrc.handle     = None
+        pSrc.polled     = False
+        if (vUp and (pSrc.protocol is not None)):
+            try:
+                pSrc.protocol.connection_lost(pExc)
+            except Exception:
+                pass # serial.threaded.Protocol re-raises pExc
 
-        def log(self, pTimestamp:int, pData:dict):
-            """
-            @brief  tbd
-            @param  pTimestamp  Integer number of nanoseconds since the epoch.
-            @param  pData       tbd
-            """
-            if (not isinstance(pTimestamp, int) ): raise SMTrace_Exception("Parameter 'pTimestamp' is not of type 'int'.")
-            if (not isinstance(pData,      dict)): raise SMTrace_Exception("Parameter 'pData' is not of type 'dict'.")
-            for k,v in pData.items():
-                if (not isinstance(v, dict)                   ): raise SMTrace_Exception("Value for key '{}' of parameter 'pData' is not of type 'dict'.".format(k))
-                if (sorted(list(v.keys())) != ["unit", "valu"]): raise SMTrace_Exception("Value for key '{}' of parameter 'pData' does not include exactly the keys 'valu' and 'unit'.".format(k))
-            for k,v in pData.items():
-                if (k in self.__dat): self.__dat[k].update(dict(tstmp=datetime.datetime.utcfromtimestamp(pTimestamp/1E9), **v))
-                else                : self.__dat[k] = dict(tstmp=datetime.datetime.utcfromtimestamp(pTimestamp/1E9), **v)
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def __lost(self, pSrc:Source, pExc):
+        """
+        @brief  Closes a failed source and schedules opening it again after the backoff.
+        @param  pSrc  A source of this reader.
+        @param  pExc  Exception which terminated the source.
+        """
+        self.__release(pSrc, pExc)
+        pSrc.backoff = min(self.__bkm, max(self.__bkf, pSrc.backoff * 2))
+        pSrc.due     = time.monotonic() + pSrc.backoff
+        if (self.__log is not None): self.__log.log(pyLOG.LogLvl.WARNING, "source '{}' {} {} failed ({}), retrying in {:.1f} s".format(pSrc.name, pSrc.kind, pSrc.address, pExc, pSrc.backoff))
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    class EMailSml(object):
+    def __close(self, pSrc:Source, pExc):
+        """
+        @brief  Closes a source for good.
+        @param  pSrc  A source of this reader.
+        @param  pExc  Exception which terminated the source or None.
+        """
+        self.__release(pSrc, pExc)
+        if (pSrc in self.__src): self.__src.remove(pSrc)
+        if (self.__log is not None): self.__log.log(pyLOG.LogLvl.INFO, "source '{}' {} {} closed".format(pSrc.name, pSrc.kind, pSrc.address))
 
-        def __init__(self, pCfg:dict, pTrg:apscheduler.schedulers.background.BackgroundScheduler, pLog:pyLOG.Log=None, pIdf=None):
-            self.__cfg = pCfg
-            self.__cnt = 0
-            self.__dat = None
-            self.__idb = None
-            self.__idf = pIdf
-            self.__log = pLog
-            self.__nam = None
-            self.__trg = pTrg
-            for v_cron in self.__cfg["cron"]:
-                self.__trg.add_job(self, trigger=apscheduler.triggers.cron.CronTrigger().from_crontab(v_cron))
-            self.__open(time.time_ns())
 
-        def __del__(self):
-            self.__close()
+########################################################################################################################
 
-        def __call__(self):
-            vSubj = None
-            vSmtp = None
-            vPart = None
-            vMssg = email.mime.multipart.MIMEMultipart()
-            vMssg.add_header("From", self.__cfg["from"])
-            vMssg.add_header("To",   self.__cfg["to"  ])
-            if (self.__cfg["cc"]       is not None): vMssg.add_header("Cc",      self.__cfg["cc"].replace(";", ",").strip(","))
-            if (self.__cfg["subjprfx"] is not None): vSubj = self.__cfg["subjprfx"]
-            if (self.__idf             is not None): vSubj = self.__idf if (vSubj is None) else vSubj + self.__idf
-            if (vSubj                  is not None): vMssg.add_header("Subject", vSubj)
-            vMssg.attach(email.mime.text.MIMEText("---"))
-            with open(self.__nam, "rb") as vFhdl:
-                vPart = email.mime.application.MIMEApplication(vFhdl.read(), Name=os.path.basename(self.__nam))
-                vPart.add_header('Content-Disposition', 'attachment; filename={}'.format(os.path.basename(self.__nam)))
-                vMssg.attach(vPart)
-            with smtplib.SMTP(self.__cfg["srvr"], self.__cfg["port"]) as vSmtp:
-                if (    (self.__cfg["type"] == "STARTTLS"    )
-                    and (isinstance(self.__cfg["auth"], list))
-                    and (len(self.__cfg["auth"]) == 2        )
-                   ):
-                    vSmtp.starttls()
-                    try:
-                        vSmtp.login(*self.__cfg["auth"])
-                    except:
-                        if (self.__log is not None): self.__log.log(pyLOG.LogLvl.ERROR, "Could not login into '{fSrvr}:{fPort}'".format(fSrvr=self.__cfg["srvr"], fPort=self.__cfg["port"]))
-                try:
-                    vSmtp.send_message(vMssg, from_addr=None, to_addrs=None)
-                    if (self.__log is not None): self.__log.log(pyLOG.LogLvl.INFO, "Email successfully sent to '{fTo}'".format(fTo=self.__cfg["to"]))
-                except:
-                    if (self.__log is not None): self.__log.log(pyLOG.LogLvl.ERROR, "Could not send email to '{fTo}'".format(fTo=self.__cfg["to"]))
 
-        def __open(self, pTimestamp:int):
-            self.__cnt = 0
-            self.__nam = os.path.join(self.__cfg["location"], datetime.datetime.utcnow().strftime(re.sub("%N", re.sub("\W+", "_", self.__idf), self.__cfg["naming"])))
-            self.__dat = pyPCAPNG.PCAPNGWriter(self.__nam, pMode="w", pAF=self.__cfg["samplerate"])
-            self.__dat.addSHB(pMajorVersion=1, pMinorVersion=0)
-            self.__idb = self.__dat.addIDB(pLinkType=1, pSnapLen=0, pOptions=[(pyPCAPNG.IDBOptionType.TSRESOL, [9]), (pyPCAPNG.IDBOptionType.NAME, bytes(self.__idf, encoding="utf-8")), (pyPCAPNG.IDBOptionType.ENDOFOPT, [])])
-            self.__dat.addISB(pInterfaceId=int(0), pTimestamp=pTimestamp, pOptions=[(pyPCAPNG.ISBOptionType.STARTTIME, struct.pack("II", ((pTimestamp & 0xFFFFFFFF00000000) >> 32), (pTimestamp & 0x00000000FFFFFFFF))), (pyPCAPNG.ISBOptionType.ENDOFOPT, [])])
+class SMTrace_Replay(object):
+    """
+    @brief  Offline replay of recorded SML data.
+            Reads PCAPNG files as written by the EMailSml report handler or raw byte dumps of a serial port and feeds
+            them in chunks into the data_received method of a SMTrace_SMLPacket instance, either as fast as possible or
+            time-scaled. The packets of a PCAPNG file are reported with their recorded timestamps.
+    """
 
-        def __close(self):
-            self.__dat.flush()
-            del(self.__dat)
-            self.__dat = None
+    SHB   = 0x0A0D0D0A
+    IDB   = 0x00000001
+    EPB   = 0x00000006
+    MAGIC = 0x1A2B3C4D
+    LINK  = {1: 14, 101: 0, 228: 0} # link type -> link header size in front of the IPv4 header (Ethernet, raw IP, IPv4)
 
-        def log(self, pTimestamp:int, pData:pySML.SML_Telegram):
-            """
-            @brief  tbd
-            @param  pTimestamp  Integer number of nanoseconds since the epoch.
-            @param  pData       tbd
-            """
-            if (not isinstance(pTimestamp, int)               ): raise SMTrace_Exception("Parameter 'pTimestamp' is not of type 'int'.")
-            if (not isinstance(pData,      pySML.SML_Telegram)): raise SMTrace_Exception("Parameter 'pData' is not of type 'pySML.SML_Telegram'.")
-            if (self.__cnt == self.__cfg["samplerate"]):
-                self.__cnt = 0
-                self.__dat.addEPB(pInterfaceId=self.__dat.getInterfaceId(self.__idb), pPacketData=pyPCAPNG.IPv4(pData=pData.data, pPortSrc=7259).eth, pTimestamp=pTimestamp) # pPortSrc=7259 ... WireShark SML protocol
-            self.__cnt += 1
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def payload(pData:bytes, pLinkType:int):
+        """
+        @brief  Returns the UDP payload of a captured IPv4 packet, None for any other packet, or the data itself for a
+                link type without IP headers.
+        @param  pData      Captured packet data.
+        @param  pLinkType  Link type of the capturing interface.
+        """
+        vOfs = SMTrace_Replay.LINK.get(pLinkType)
+        if (vOfs is None): return pData
+        if ((vOfs) and (pData[12:14] != b"\x08\x00")): return None # not IPv4
+        if ((len(pData) < vOfs + 20) or ((pData[vOfs] >> 4) != 4) or (pData[vOfs + 9] != 17)): return None # not UDP
+        vOfs += (pData[vOfs] & 0x0F) * 4
+        if (len(pData) < vOfs + 8): return None
+        vLen = int.from_bytes(pData[vOfs + 4:vOfs + 6], "big") # excludes the Ethernet padding of short frames
+        return pData[vOfs + 8:vOfs + max(8, vLen)]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def pcapng(pFile:str):
+        """
+        @brief  Generator yielding the tuple (timestamp in nanoseconds since the epoch, packet data) of every enhanced
+                packet block of a PCAPNG file, with the packet data being the UDP payload (see payload()).
+        @param  pFile  Name of the PCAPNG file.
+        """
+        vOrdr = "<"
+        vRslt = []
+        with open(pFile, "rb") as vHdl:
+            while (True):
+                vHead = vHdl.read(8)
+                if (len(vHead) < 8): break
+                if (vHead[0:4] == struct.pack("<I", SMTrace_Replay.SHB)):
+                    vOrdr = "<" if (vHdl.peek(4)[0:4] == struct.pack("<I", SMTrace_Replay.MAGIC)) else ">"
+                    vRslt = []
+                vType, vLen = struct.unpack(vOrdr + "II", vHead)
+                if ((vLen < 12) or (vLen % 4)): raise SMTrace_Exception("PCAPNG file '{}' contains an invalid block length {}.".format(pFile, vLen))
+                vBody = vHdl.read(vLen - 8)
+                if (len(vBody) < (vLen - 8)): raise SMTrace_Exception("PCAPNG file '{}' is truncated.".format(pFile))
+                if   (vType == SMTrace_Replay.IDB):
+                    vRes = 10 ** 6 # if_tsresol defaults to microseconds
+                    vLnk = struct.unpack(vOrdr + "H", vBody[0:2])[0]
+                    vPos = 8
+                    while (vPos + 4 <= len(vBody) - 4):
+                        vCode, vOlen = struct.unpack(vOrdr + "HH", vBody[vPos:vPos + 4])
+                        if (vCode == 0): break
+                        if (vCode == 9 and vOlen >= 1):
+                            vRes = (2 ** (vBody[vPos + 4] & 0x7F)) if (vBody[vPos + 4] & 0x80) else (10 ** vBody[vPos + 4])
+                        vPos += 4 + ((vOlen + 3) & ~3)
+                    vRslt.append((vRes, vLnk))
+                elif (vType == SMTrace_Replay.EPB):
+                    vIdf, vHigh, vLow, vCap = struct.unpack(vOrdr + "IIII", vBody[0:16])
+                    vRes, vLnk = vRslt[vIdf] if (vIdf < len(vRslt)) else (10 ** 6, 1)
+                    vData = SMTrace_Replay.payload(vBody[20:20 + vCap], vLnk)
+                    if (vData is not None): yield ((vHigh << 32) | vLow) * 1000000000 // vRes, vData
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def raw(pFile:str, pSize:int=4096):
+        """
+        @brief  Generator yielding the tuple (None, data) for consecutive blocks of a raw byte dump.
+        @param  pFile  Name of the raw byte dump.
+        @param  pSize  Block size in bytes.
+        """
+        with open(pFile, "rb") as vHdl:
+            while (True):
+                vData = vHdl.read(pSize)
+                if (not vData): break
+                yield None, vData
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def __init__(self, pCfg:dict, pLog:pyLOG.Log=None, pIdf=None):
+    def __init__(self, pIdf:str, pCfg:dict, pPipe=None, pChunk:int=0, pSpeed:float=0.0):
         """
         @brief  Constructor.
-        @param  pCfg  A Reporter configuration.
-        @param  pIdf  A custom identifier.
+        @param  pIdf    Meter identifier.
+        @param  pCfg    Meter configuration.
+        @param  pPipe   A SMTrace_Pipeline or None to process packets directly.
+        @param  pChunk  Number of bytes per call of data_received; 0 for whole records.
+        @param  pSpeed  Time scale factor; 0 for maximum speed.
         """
-        self.__cfg = pCfg
-        self.__idf = pIdf
-        self.__trg = apscheduler.schedulers.background.BackgroundScheduler()
-        self.__log = pLog
-        self.__hdl = [eval(pyRPT.Hdl(vHdl)["class"]+"(vHdl, vTrg, vLog, vIdf)", {"SMTrace_Report": self, "vHdl":pyRPT.Hdl(vHdl), "vTrg": self.__trg, "vLog":self.__log, "vIdf": self.__idf}) for vHdl in self.__cfg["handlers"]]
-        self.__trg.start()
+        self.__cfg   = pCfg
+        self.__pipe  = pPipe
+        self.__chunk = pChunk
+        self.__speed = pSpeed
+        self.__now   = None
+        self.__cnt   = dict(files=0, bytes=0, telegrams=0, badcrc=0)
+        self.__dur   = dict(total=0, framing=0, decode=0, report=0) # in ns
+        self.__mtr   = SMTrace_SMLPacket(pIdf, pCfg, pPipe)
+        self.__mtr.clock  = self.__clock
+        self.__mtr.decode = self.__timed("decode", self.__mtr.decode)
+        self.__mtr.report = self.__timed("report", self.__mtr.report)
+        vSer         = pCfg.get("serial") or [None, 9600, 8, 1, "none"]
+        self.__bits  = (1 + vSer[2] + (vSer[4] != "none") + (1.5 if (vSer[3] == 15) else vSer[3])) / vSer[1] # seconds per byte
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def __del__(self):
+    def __clock(self):
         """
-        @brief  Destructor.
+        @brief  Returns the recorded timestamp of the currently replayed packet or the current time for raw dumps.
         """
-        self.__trg.shutdown()
+        return time.time_ns() if (self.__now is None) else self.__now
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def log(self, pData:dict):
+    def __timed(self, pStage:str, pFunc):
         """
-        @brief  Process a completely received packet. This is repetitive called in a threads run method.
-        @param  pData  A SML_Telegram.
+        @brief  Returns pFunc wrapped to accumulate its duration into the stage pStage.
+        @param  pStage  Stage name.
+        @param  pFunc   Function to wrap.
         """
-        vTstmp = time.time_ns()
-        for vHdl in self.__hdl:
-            if   (isinstance(vHdl, self.EMailTxt) and isinstance(pData, dict              )): vHdl.log(vTstmp, pData)
-            elif (isinstance(vHdl, self.EMailSml) and isinstance(pData, pySML.SML_Telegram)): vHdl.log(vTstmp, pData)
+        def timed(*args):
+            vStrt = time.perf_counter_ns()
+            try:
+                return pFunc(*args)
+            finally:
+                self.__dur[pStage] += time.perf_counter_ns() - vStrt
+                if (pStage == "report"):
+                    self.__cnt["telegrams"] += 1
+                    if (args[2] is None): self.__cnt["badcrc"] += 1
+        return timed
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    def run(self, pFiles:list):
+        """
+        @brief  Replays the given files in order, stops the pipeline after it processed all packets, runs all report
+                handlers of the meter once and returns the statistics.
+        @param  pFiles  Names of PCAPNG files or raw byte dumps.
+        """
+        vStrt = time.perf_counter()
+        for vFile in pFiles:
+            with open(vFile, "rb") as vHdl:
+                vPcap = (vHdl.read(4) == struct.pack("<I", self.SHB))
+            self.__cnt["files"] += 1
+            vWall = time.perf_counter()
+            vOffs = 0.0
+            vFrst = None
+            for vTstmp, vData in (self.pcapng(vFile) if vPcap else self.raw(vFile, self.__chunk or 4096)):
+                if (self.__speed > 0):
+                    if (vTstmp is None):
+                        vWait  = vWall + vOffs - time.perf_counter()
+                        vOffs += len(vData) * self.__bits / self.__speed
+                    else:
+                        vFrst  = vTstmp if (vFrst is None) else vFrst
+                        vWait  = vWall + (vTstmp - vFrst) / 1e9 / self.__speed - time.perf_counter()
+                    if (vWait > 0): time.sleep(vWait)
+                self.__now = vTstmp
+                vSize = self.__chunk or len(vData)
+                vFeed = time.perf_counter_ns()
+                for i in range(0, len(vData), vSize):
+                    self.__mtr.data_received(vData[i:i + vSize])
+                self.__dur["total"] += time.perf_counter_ns() - vFeed
+                self.__cnt["bytes"] += len(vData)
+        self.__now = None
+        if (self.__pipe is not None):
+            self.__pipe.stop(None)
+        vElps = time.perf_counter() - vStrt
+        self.__mtr.trigger()
+        vRslt = dict(self.__cnt)
+        vRslt["seconds"]  = round(vElps, 3)
+        vRslt["rate"]     = round(self.__cnt["telegrams"] / vElps, 1) if (vElps > 0) else 0.0
+        vRslt["stages"]   = dict(framing=self.__dur["total"] - ((self.__dur["decode"] + self.__dur["report"]) if (self.__pipe is None) else 0), decode=self.__dur["decode"], report=self.__dur["report"])
+        if (self.__pipe is not None):
+            del vRslt["stages"]["decode"] # measured by the pipeline
+        vRslt["stages"]   = {k: dict(total_ms=round(v / 1e6, 3), avg_us=round(v / 1e3 / self.__cnt["telegrams"], 1) if (self.__cnt["telegrams"]) else 0.0) for k,v in vRslt["stages"].items()}
+        if (self.__pipe is not None):
+            vRslt["pipeline"] = self.__pipe.stats()
+        return vRslt
 
 
 ########################################################################################################################
 
 
-class SMTrace_SMLPacket(serial.threaded.Protocol):
+class SMTrace_State(object):
     """
-    @brief  HM data tracing SML packet serial receive class.
+    @brief  Periodic snapshots of the report handler state of all meters, restored at the next start.
+            A snapshot is written as compact JSON to a temporary file, synced and renamed onto the state file, so an
+            interruption at any time leaves either the previous or the new snapshot behind.
     """
 
+    VERSION = 1
+
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def __init__(self, pIdf:str, pCfg:dict):
+    def __init__(self, pCfg:dict=None, pLog:pyLOG.Log=None):
         """
         @brief  Constructor.
-        @param  pIdf  A HM meter identifier.
-        @param  pCfg  A HM meter configuration.
+        @param  pCfg  A state configuration (file, interval) or None.
+        @param  pLog  Logger.
         """
-        self.__buffer    = bytearray()
-        self.__log       = pyLOG.Log(pCfg["logref"])
-        self.__obs       = pyOBIS.OBIS()
-        self.__rpt       = SMTrace_Report(pyRPT.Rpt(pCfg["rptref"]), self.__log, pIdf + " / " + pCfg["note"])
-        self.__transport = None
-        self.__log.log_callinfo()
+        pCfg = pCfg or dict()
+        self.__evt  = threading.Event()
+        self.__file = pCfg.get("file")
+        self.__int  = pCfg.get("interval", 60)
+        self.__lck  = threading.Lock()
+        self.__log  = pLog
+        self.__thd  = None
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def __del__(self):
+    @property
+    def enabled(self):
         """
-        @brief  Destructor
+        @brief  Returns whether a state file is configured.
         """
-        self.__log.log_callinfo()
-        del(self.__rpt)
+        return self.__file is not None
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def __call__(self):
+    def load(self):
         """
-        @brief  Call operator.
+        @brief  Returns the dict mapping the meters onto their state of the last snapshot; empty if there is none or it
+                is unreadable.
         """
-        self.__log.log_callinfo()
-        return self
+        if ((not self.enabled) or (not os.path.isfile(self.__file))): return dict()
+        try:
+            with open(self.__file, "r") as fhdl:
+                vData = json.load(fhdl)
+            if (vData.get("version") != self.VERSION): raise SMTrace_Exception("State version {} is not {}.".format(vData.get("version"), self.VERSION))
+            if (self.__log is not None): self.__log.log(pyLOG.LogLvl.INFO, "state of {} meter(s) of {} loaded".format(len(vData["meters"]), datetime.datetime.fromtimestamp(vData["time"] / 1E9).isoformat()))
+            return vData["meters"]
+        except Exception as e:
+            if (self.__log is not None): self.__log.log(pyLOG.LogLvl.ERROR, "loading state '{}' failed: {}: {}".format(self.__file, type(e).__name__, e))
+            return dict()
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def connection_made(self, transport):
+    def save(self, pMeters:dict):
         """
-        @brief  Stores transport.
-        @param  transport  The instance used to write to serial port.
+        @brief  Writes a snapshot atomically.
+        @param  pMeters  A dict mapping the meters onto their state.
         """
-        self.__log.log_callinfo()
-        self.__transport = transport
+        if (not self.enabled): return
+        vData = json.dumps(dict(version=self.VERSION, time=time.time_ns(), meters=pMeters), separators=(",", ":"), default=lambda o: bytes(o).decode("utf-8", "replace") if isinstance(o, (bytes, bytearray, memoryview)) else str(o))
+        with self.__lck:
+            with open(self.__file + ".tmp", "w") as fhdl:
+                fhdl.write(vData)
+                fhdl.flush()
+                os.fsync(fhdl.fileno())
+            os.replace(self.__file + ".tmp", self.__file)
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def connection_lost(self, exc):
+    def start(self, pFunc):
         """
-        @brief  Forgets transport.
-        @param  exc  Exception if connection was terminated by error else None.
+        @brief  Starts writing a snapshot of pFunc() every 'interval' seconds.
+        @param  pFunc  A callable returning the dict mapping the meters onto their state.
         """
-        self.__log.log_callinfo()
-        self.__transport = None
-        super(SMTrace_SMLPacket, self).connection_lost(exc)
+        if ((not self.enabled) or (not self.__int)): return
+        self.__evt.clear()
+        self.__thd = threading.Thread(target=self.__run, args=(pFunc,), name="SMTrace_State", daemon=True)
+        self.__thd.start()
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def data_received(self, data:bytes):
+    def __run(self, pFunc):
         """
-        @brief  Buffer receives data and searchs for SML_Telegram terminators, when found, call handle_packet().
-        @param  data  Bytes received via serial port.
+        @brief  Snapshot thread.
         """
-        self.__log.log_callinfo()
-        self.__buffer.extend(data)
-        packets = [packet for packet in re.finditer(bytes("(?<!\x1b\x1b\x1b\x1b)\x1b\x1b\x1b\x1b\x01\x01\x01\x01.*?(?<!\x1b\x1b\x1b\x1b)\x1b\x1b\x1b\x1b\x1a(\x00|\x01|\x02|\x03)..".encode("ascii")), self.__buffer, re.DOTALL)]
-        if ( packets != [] ):
-            for packet in packets:
-                self.__handle_packet(self.__buffer[packet.start():packet.end()])
-            del self.__buffer[:packets[-1].end()]
+        while (not self.__evt.wait(self.__int)):
+            try:
+                self.save(pFunc())
+            except Exception as e:
+                if (self.__log is not None): self.__log.log(pyLOG.LogLvl.ERROR, "saving state '{}' failed: {}: {}".format(self.__file, type(e).__name__, e))
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def __handle_packet(self, packet:bytes):
+    def stop(self, pTimeout:float=10.0):
         """
-        @brief  Process a completely received packet. This is repetitive called in a threads run method.
-        @param  packet  A SML_Telegram.
+        @brief  Stops the snapshot thread.
+        @param  pTimeout  Maximum time in seconds to wait for a running snapshot.
+        """
+        self.__evt.set()
+        if (self.__thd is not None):
+            self.__thd.join(pTimeout)
+            self.__thd = None
+
+
+########################################################################################################################
+
+
+class SMTrace_Config(object):
+    """
+    @brief  Loading and validation of the configuration file.
+            A configuration is checked as a whole before it is used, so a faulty edit is rejected with a list of all its
+            problems instead of failing half applied: the types of the known sections and keys, unknown keys (typos),
+            the references between meters, reporters, handlers and loggers, exactly one source per meter and the
+            settings parsed by their classes, e.g. cron lines, OBIS codes, CRC variants and deadbands.
+    """
+
+    NONE     = type(None)
+    NUMBER   = (int, float)
+    GENERAL  = {"logger": (dict,), "logref": (str,), "reporter": (dict,), "mailer": (dict, NONE), "stats": (dict, NONE), "http": (dict, NONE),
+                "runtime": (dict, NONE), "pipeline": (dict, NONE), "state": (dict, NONE), "reload": (dict, NONE)}
+    RESTART  = ("stats", "http", "runtime", "pipeline", "state") # sections of 'general' only evaluated at start
+    METER    = {"serial": (list, NONE), "tcp": (str, list, NONE), "udp": (str, int, list, NONE), "file": (str, NONE),
+                "logref": (str,), "rptref": (str,), "note": (str,), "maxframe": (int,), "crc": (str, NONE), "badframelog": NUMBER,
+                "obiscache": (str, NONE), "obiscachesize": (int,), "decode": (str,), "obis": (list, NONE), "deadband": (dict, NONE)}
+    MAIL     = {"srvr": (str,), "port": (int,), "auth": (list, str, NONE), "from": (str,), "to": (str,), "cc": (str, NONE), "subjprfx": (str, NONE),
+                "type": (str, NONE)}
+    HANDLERS = {"SMTrace_Report.EMailTxt": (dict(MAIL, mode=(str,), aggregate=(list, NONE), retention=(int,), downsample=NUMBER), tuple(MAIL) + ("cron",)),
+                "SMTrace_Report.EMailSml": (dict(MAIL, location=(str,), naming=(str,), samplerate=(int,), compress=(str, NONE), maxsize=(int, NONE), keep=(bool,)), tuple(MAIL) + ("cron", "location", "naming", "samplerate")),
+                "SMTrace_Report.Archive" : (dict(location=(str,), name=(str, NONE), keys=(list, NONE), fsync=NUMBER), ("location",))}
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def load(pPath:str):
+        """
+        @brief  Returns the validated configuration of a file.
+        @param  pPath  Name of the configuration file.
+        """
+        with open(pPath, "r") as fhdl:
+            vCfg = yaml.load(fhdl.read(), Loader=yaml.SafeLoader)
+        SMTrace_Config.validate(vCfg)
+        return vCfg
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def check(pErrs:list, pPath:str, pData, pKeys:dict, pRequired:tuple=()):
+        """
+        @brief  Appends the problems of a section to pErrs: not a mapping, missing required keys, unknown keys and values
+                of another type. Returns whether the section is a mapping.
+        @param  pErrs      List of problems.
+        @param  pPath      Path of the section used in the messages.
+        @param  pData      The section.
+        @param  pKeys      A dict mapping the known keys onto a tuple of their allowed types.
+        @param  pRequired  Keys which have to be present.
+        """
+        if (not isinstance(pData, dict)):
+            pErrs.append("{}: is not a mapping".format(pPath))
+            return False
+        for k in pRequired:
+            if (k not in pData): pErrs.append("{}: '{}' is missing".format(pPath, k))
+        for k,v in pData.items():
+            if   (k not in pKeys): pErrs.append("{}: '{}' is unknown".format(pPath, k))
+            elif (    (not isinstance(v, pKeys[k]))
+                   or (isinstance(v, bool) and (bool not in pKeys[k]))
+                 ):
+                pErrs.append("{}.{}: {!r} is not of type {}".format(pPath, k, v, " or ".join("None" if (t is SMTrace_Config.NONE) else t.__name__ for t in pKeys[k])))
+        return True
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def parse(pErrs:list, pPath:str, pFunc, *pArgs):
+        """
+        @brief  Appends the problem to pErrs if pFunc(*pArgs) fails, i.e. a setting is rejected by the class using it.
+        @param  pErrs  List of problems.
+        @param  pPath  Path of the setting used in the message.
+        @param  pFunc  A callable, e.g. a constructor.
+        @param  pArgs  Its arguments.
         """
-        self.__log.log_callinfo()
         try:
-            vTelegram      = pySML.SML_Telegram()
-            vTelegram.data = packet
-            vData          = dict()
-            self.__rpt.log(vTelegram)
-            for vMssg in vTelegram.msg:
-                if (isinstance(vMssg.MessageBody.Element, pySML.SML_GetListRes)):
-                    for i,val in enumerate(vMssg.MessageBody.Element.ValList.valu):
-                        vKey    = self.__obs.getDescr(int(val.ObjName.valu.hex(), 16))["descr"]
-                        vValue  = val.Value.Element.valu
-                        vScaler = val.Scaler.valu
-                        vUnit   = None
-                        if (val.Unit.valu is not None):
-                            vUnit = self.__obs.getUnit(val.Unit.valu)["native"]
-                        if (    (vValue is not None           )
-                            and (isinstance(vValue, bytearray))
-                           ):
-                            try   : vValue = "\"" + vValue.decode("utf-8") + "\""
-                            except: vValue = " ".join(["{:02X}".format(b) for b in vValue])
-                        elif (vScaler is not None):
-                            if   (0 > vScaler): vValue = vValue / (10*(-vScaler))
-                            else              : vValue = vValue * (10**vScaler)
-                        else:
-                            pass
-                        vData[vKey] = dict(valu=vValue, unit=vUnit)
-            if (vData):
-                self.__rpt.log(vData)
+            pFunc(*pArgs)
         except Exception as e:
-            self.__log.log(pyLOG.LogLvl.ERROR, "\n{}\n{}".format(e, packet))
+            pErrs.append("{}: {}: {}".format(pPath, type(e).__name__, e))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    @staticmethod
+    def validate(pCfg:dict):
+        """
+        @brief  Raises a SMTrace_Exception listing all problems of a configuration.
+        @param  pCfg  A SMTrace configuration.
+        """
+        vErrs = []
+        if (    SMTrace_Config.check(vErrs, "", pCfg, {"general": (dict,), "meters": (dict,)}, ("general", "meters"))
+            and isinstance(pCfg.get("general"), dict)
+            and isinstance(pCfg.get("meters"),  dict)
+           ):
+            vGen = pCfg["general"]
+            SMTrace_Config.check(vErrs, "general", vGen, SMTrace_Config.GENERAL, ("logger", "logref", "reporter"))
+            vLog = vGen.get("logger") if (isinstance(vGen.get("logger"), dict)) else dict()
+            vLog = None if (not isinstance(vLog.get("loggers"), dict)) else vLog["loggers"]
+            vLgr = lambda p, n: vErrs.append("{}.logref: logger '{}' is not configured".format(p, n)) if ((vLog is not None) and isinstance(n, str) and (n not in vLog)) else None
+            vLgr("general", vGen.get("logref"))
+            vRtm = vGen.get("runtime")  if (isinstance(vGen.get("runtime"),  dict)) else dict()
+            vPip = vGen.get("pipeline") if (isinstance(vGen.get("pipeline"), dict)) else dict()
+            if (vRtm.get("mode") not in (None, "asyncio")                     ): vErrs.append("general.runtime.mode: '{}' is not one of {}".format(vRtm.get("mode"), [None, "asyncio"]))
+            if (vPip.get("mode") not in (None,) + SMTrace_Pipeline.MODES      ): vErrs.append("general.pipeline.mode: '{}' is not one of {}".format(vPip.get("mode"), [None] + list(SMTrace_Pipeline.MODES)))
+            if (vPip.get("policy", "dropoldest") not in SMTrace_Pipeline.POLICIES): vErrs.append("general.pipeline.policy: '{}' is not one of {}".format(vPip.get("policy"), list(SMTrace_Pipeline.POLICIES)))
+            vRpt = vGen.get("reporter") if (isinstance(vGen.get("reporter"), dict)) else dict()
+            SMTrace_Config.check(vErrs, "general.reporter", vRpt, {"version": (int,), "handlers": (dict,), "reporters": (dict,)}, ("handlers", "reporters"))
+            vHdls = vRpt.get("handlers") if (isinstance(vRpt.get("handlers"), dict)) else dict()
+            vRpts = vRpt.get("reporters") if (isinstance(vRpt.get("reporters"), dict)) else dict()
+            for idf_hdl, cfg_hdl in vHdls.items():
+                vPath = "general.reporter.handlers.{}".format(idf_hdl)
+                vClss = cfg_hdl.get("class") if (isinstance(cfg_hdl, dict)) else None
+                if (vClss not in SMTrace_Config.HANDLERS):
+                    vErrs.append("{}.class: '{}' is not one of {}".format(vPath, vClss, list(SMTrace_Config.HANDLERS)))
+                    continue
+                vKeys, vReqd = SMTrace_Config.HANDLERS[vClss]
+                SMTrace_Config.check(vErrs, vPath, cfg_hdl, dict(vKeys, **{"class": (str,), "logref": (str,), "cron": (list, SMTrace_Config.NONE)}), vReqd)
+                vLgr(vPath, cfg_hdl.get("logref"))
+                for v_cron in cfg_hdl.get("cron") or []:
+                    SMTrace_Config.parse(vErrs, vPath + ".cron", apscheduler.triggers.cron.CronTrigger.from_crontab, v_cron)
+                if (cfg_hdl.get("mode", "last") not in SMTrace_Report.EMailTxt.MODES                  ): vErrs.append("{}.mode: '{}' is not one of {}".format(vPath, cfg_hdl.get("mode"), list(SMTrace_Report.EMailTxt.MODES)))
+                for v_obis in (cfg_hdl.get("aggregate") if (isinstance(cfg_hdl.get("aggregate"), list)) else []):
+                    SMTrace_Config.parse(vErrs, vPath + ".aggregate", SMTrace_SMLDecoder.obis, v_obis)
+                if (cfg_hdl.get("compress") not in [None] + list(SMTrace_Report.EMailSml.COMPRESS.keys())): vErrs.append("{}.compress: '{}' is not one of {}".format(vPath, cfg_hdl.get("compress"), list(SMTrace_Report.EMailSml.COMPRESS.keys())))
+            for idf_rpt, cfg_rpt in vRpts.items():
+                vPath = "general.reporter.reporters.{}".format(idf_rpt)
+                if (not SMTrace_Config.check(vErrs, vPath, cfg_rpt, {"handlers": (list,)}, ("handlers",))): continue
+                for vHdl in cfg_rpt.get("handlers") or []:
+                    if (vHdl not in vHdls): vErrs.append("{}.handlers: handler '{}' is not configured".format(vPath, vHdl))
+            for idf_meter, cfg_meter in pCfg["meters"].items():
+                vPath = "meters.{}".format(idf_meter)
+                if (not SMTrace_Config.check(vErrs, vPath, cfg_meter, SMTrace_Config.METER, ("logref", "rptref", "note"))): continue
+                vLgr(vPath, cfg_meter.get("logref"))
+                if (isinstance(cfg_meter.get("rptref"), str) and (cfg_meter["rptref"] not in vRpts)): vErrs.append("{}.rptref: reporter '{}' is not configured".format(vPath, cfg_meter["rptref"]))
+                vSrc = [k for k in ("serial",) + SMTrace_NetReader.KINDS if (cfg_meter.get(k) is not None)]
+                if (len(vSrc) != 1): vErrs.append("{}: has not exactly one of the sources {} but {}".format(vPath, ("serial",) + SMTrace_NetReader.KINDS, vSrc))
+                for k in vSrc:
+                    if (k != "serial"):
+                        SMTrace_Config.parse(vErrs, "{}.{}".format(vPath, k), SMTrace_NetReader.address, k, cfg_meter[k])
+                    elif (    (len(cfg_meter[k]) != 5                       )
+                           or (cfg_meter[k][2] not in SMTrace.BYTESIZE)
+                           or (cfg_meter[k][3] not in SMTrace.STOPBITS)
+                           or (cfg_meter[k][4] not in SMTrace.PARITY  )
+                         ):
+                        vErrs.append("{}.serial: {!r} is not [port, baudrate, {}, {}, {}]".format(vPath, cfg_meter[k], "|".join(str(x) for x in SMTrace.BYTESIZE), "|".join(str(x) for x in SMTrace.STOPBITS), "|".join(SMTrace.PARITY)))
+                if (cfg_meter.get("decode", "full") not in ("full", "lazy")): vErrs.append("{}.decode: '{}' is not one of {}".format(vPath, cfg_meter.get("decode"), ["full", "lazy"]))
+                if (isinstance(cfg_meter.get("maxframe"), int)): SMTrace_Config.parse(vErrs, vPath + ".maxframe", SMTrace_SMLFramer, cfg_meter["maxframe"])
+                if (cfg_meter.get("crc")      is not None): SMTrace_Config.parse(vErrs, vPath + ".crc",      SMTrace_CRC16,      cfg_meter["crc"])
+                if (cfg_meter.get("obis")     is not None): SMTrace_Config.parse(vErrs, vPath + ".obis",     SMTrace_SMLDecoder, cfg_meter["obis"])
+                if (cfg_meter.get("deadband") is not None): SMTrace_Config.parse(vErrs, vPath + ".deadband", SMTrace_Deadband,   cfg_meter["deadband"])
+        if (vErrs): raise SMTrace_Exception("Configuration invalid:\n  " + "\n  ".join(vErrs))
 
 
 ########################################################################################################################
@@ -396,6 +4155,10 @@ class SMTrace:
   @brief  SMTrace data tracing main class.
   """
 
+  BYTESIZE = {5:serial.FIVEBITS, 6:serial.SIXBITS, 7:serial.SEVENBITS, 8:serial.EIGHTBITS}
+  STOPBITS = {1:serial.STOPBITS_ONE, 15:serial.STOPBITS_ONE_POINT_FIVE, 2:serial.STOPBITS_TWO}
+  PARITY   = {"none":serial.PARITY_NONE, "even":serial.PARITY_EVEN, "odd":serial.PARITY_ODD, "mark":serial.PARITY_MARK, "space":serial.PARITY_SPACE}
+
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def __init__(self, pCfg:dict):
     """
@@ -405,31 +4168,148 @@ class SMTrace:
     self.__cfg   = pCfg
     self.__log   = pyLOG.Log(self.__cfg["general"]["logref"])
     self.__thd   = {}
+    self.__mtr   = {}
+    self.__net   = None
+    self.__pipe  = None
+    self.__rtm   = None
+    self.__ste   = SMTrace_State(self.__cfg["general"].get("state"), self.__log)
 
     self.__log.log_callinfo()
 
-    vMapBytesize = {5:serial.FIVEBITS, 6:serial.SIXBITS, 7:serial.SEVENBITS, 8:serial.EIGHTBITS}
-    vMapStopbits = {1:serial.STOPBITS_ONE, 15:serial.STOPBITS_ONE_POINT_FIVE, 2:serial.STOPBITS_TWO}
-    vMapParity   = {"none":serial.PARITY_NONE, "even":serial.PARITY_EVEN, "odd":serial.PARITY_ODD, "mark":serial.PARITY_MARK, "space":serial.PARITY_SPACE}
+    if ((self.__cfg["general"].get("runtime") or {}).get("mode") == "asyncio"):
+      self.__rtm = SMTrace_AsyncRuntime(self.__cfg["general"]["runtime"], self.__log)
+      self.__log.log(pyLOG.LogLvl.INFO, "asyncio runtime selected")
+
+    if ((self.__cfg["general"].get("pipeline") or {}).get("mode") is not None):
+      self.__pipe = SMTrace_Pipeline(self.__cfg["general"]["pipeline"], self.__log)
+      self.__log.log(pyLOG.LogLvl.INFO, "pipeline '{}' with {} worker(s) started".format(self.__cfg["general"]["pipeline"]["mode"], self.__cfg["general"]["pipeline"].get("workers", 2)))
+
+    self.__rdr = serial.threaded.ReaderThread if (self.__rtm is None) else self.__rtm.reader
+    self.__trg = None                          if (self.__rtm is None) else self.__rtm.scheduler
+    vState     = self.__ste.load()
 
     for idf_meter, cfg_meter in self.__cfg["meters"].items():
-      self.__log.log(pyLOG.LogLvl.INFO, "configuring meter '{}' started".format(idf_meter))
+      self.__start(idf_meter, cfg_meter, vState.get(idf_meter))
+
+    if (self.__rtm is not None):
+      self.__rtm.start()
+
+    self.__ste.start(self.state)
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __start(self, pIdf:str, pCfg:dict, pState:dict=None):
+    """
+    @brief  Configures a meter and starts receiving; failures are logged.
+    @param  pIdf    A HM meter identifier.
+    @param  pCfg    A HM meter configuration.
+    @param  pState  A state of the meter to restore or None.
+    """
+    self.__log.log(pyLOG.LogLvl.INFO, "configuring meter '{}' started".format(pIdf))
+    try:
+      self.__mtr[pIdf] = SMTrace_SMLPacket(pIdf, pCfg, self.__pipe, self.__trg)
+      if (pState is not None):
+        self.__mtr[pIdf].restore(pState)
+        self.__log.log(pyLOG.LogLvl.INFO, "  state restored")
+      self.__thd[pIdf] = self.__reader(pIdf, pCfg)
+      self.__thd[pIdf].start()
+      self.__log.log(pyLOG.LogLvl.INFO, "  receive thread '{}' started".format(self.__thd[pIdf]))
+      self.__log.log(pyLOG.LogLvl.INFO, "configuring meter '{}' done".format(pIdf))
+    except:
+      self.__log.log(pyLOG.LogLvl.ERROR, "configuring meter '{}' failed".format(pIdf))
+      self.__log.log(pyLOG.LogLvl.ERROR, "{}".format(traceback.format_exc()))
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __reader(self, pIdf:str, pCfg:dict):
+    """
+    @brief  Returns a new, not yet started reader of the source of a configured meter.
+    @param  pIdf  A HM meter identifier.
+    @param  pCfg  A HM meter configuration.
+    """
+    vSrc = [k for k in ("serial",) + SMTrace_NetReader.KINDS if (pCfg.get(k) is not None)]
+    if (len(vSrc) != 1): raise SMTrace_Exception("Meter '{}' has not exactly one of the sources {}.".format(pIdf, ("serial",) + SMTrace_NetReader.KINDS))
+    if (vSrc[0] == "serial"):
+      return self.__rdr(serial.Serial(port     = pCfg["serial"][0],
+                                      baudrate = pCfg["serial"][1],
+                                      bytesize = self.BYTESIZE[pCfg["serial"][2]],
+                                      stopbits = self.STOPBITS[pCfg["serial"][3]],
+                                      parity   = self.PARITY  [pCfg["serial"][4]],
+                                      timeout  = None
+                                     ),
+                        self.__mtr[pIdf]
+                       )
+    if (self.__net is None): self.__net = SMTrace_NetReader(self.__cfg["general"].get("runtime"), self.__log)
+    return self.__net.source(pIdf, vSrc[0], pCfg[vSrc[0]], self.__mtr[pIdf])
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def reload(self, pCfg:dict):
+    """
+    @brief  Applies a changed, validated configuration without restarting what did not change. Removed meters are
+            stopped and their report handlers closed, added meters are started, a meter with a changed source gets a new
+            reader and the report handlers and cron jobs of every meter are only rebuilt where their configuration
+            changed. Unchanged readers keep running with their frame buffers. Changes of the sections of 'general' only
+            evaluated at start are logged and take effect after a restart.
+    @param  pCfg  A SMTrace configuration checked by SMTrace_Config.validate().
+    """
+    vOld = self.__cfg
+    vGen = [k for k in SMTrace_Config.RESTART if (vOld["general"].get(k) != pCfg["general"].get(k))]
+    vSrc = lambda c: [c.get(k) for k in ("serial",) + SMTrace_NetReader.KINDS]
+    if (vOld["general"]["logger"] != pCfg["general"]["logger"]):
+      pyLOG.LogInit(pCfg["general"]["logger"])
+    self.__log = pyLOG.Log(pCfg["general"]["logref"])
+    self.__log.log(pyLOG.LogLvl.INFO, "reloading configuration started")
+    if (vGen): self.__log.log(pyLOG.LogLvl.WARNING, "  changes of general {} take effect after a restart".format(vGen))
+    pyRPT.RptInit(pCfg["general"]["reporter"])
+    if (    (vOld["general"].get("mailer") != pCfg["general"].get("mailer"))
+         or (vOld["general"]["reporter"]["handlers"] != pCfg["general"]["reporter"]["handlers"])
+       ):
+      SMTrace_Mailer.MailInit(pCfg["general"].get("mailer"), pCfg["general"]["reporter"]["handlers"], self.__log)
+    self.__cfg = dict(pCfg, general=dict(pCfg["general"], **{k: vOld["general"].get(k) for k in SMTrace_Config.RESTART}))
+    for idf_meter in [k for k in vOld["meters"] if (k not in pCfg["meters"])]:
+      self.__log.log(pyLOG.LogLvl.INFO, "  meter '{}' removed".format(idf_meter))
+      self.__remove(idf_meter)
+    for idf_meter, cfg_meter in pCfg["meters"].items():
+      if (idf_meter not in self.__mtr):
+        self.__start(idf_meter, cfg_meter, None)
+        continue
       try:
-        self.__thd[idf_meter] = serial.threaded.ReaderThread(serial.Serial(port     = cfg_meter["serial"][0],
-                                                                           baudrate = cfg_meter["serial"][1],
-                                                                           bytesize = vMapBytesize[cfg_meter["serial"][2]],
-                                                                           stopbits = vMapStopbits[cfg_meter["serial"][3]],
-                                                                           parity   = vMapParity  [cfg_meter["serial"][4]],
-                                                                           timeout  = None
-                                                                          ),
-                                                             SMTrace_SMLPacket(idf_meter, cfg_meter)
-                                                            )
-        self.__thd[idf_meter].start()
-        self.__log.log(pyLOG.LogLvl.INFO, "  receive thread '{}' started".format(self.__thd[idf_meter]))
-        self.__log.log(pyLOG.LogLvl.INFO, "configuring meter '{}' done".format(idf_meter))
+        if ((idf_meter not in self.__thd) or (vSrc(cfg_meter) != vSrc(vOld["meters"].get(idf_meter, dict())))):
+          if (idf_meter in self.__thd): self.__thd.pop(idf_meter).close()
+          self.__thd[idf_meter] = self.__reader(idf_meter, cfg_meter)
+          self.__thd[idf_meter].start()
+          self.__log.log(pyLOG.LogLvl.INFO, "  meter '{}' receive thread '{}' restarted".format(idf_meter, self.__thd[idf_meter]))
+        vCnt = self.__mtr[idf_meter].reload(cfg_meter)
+        if (vCnt[1:] != (0, 0, 0)): self.__log.log(pyLOG.LogLvl.INFO, "  meter '{}' report handlers kept {}, replaced {}, added {}, removed {}".format(idf_meter, *vCnt))
       except:
-        self.__log.log(pyLOG.LogLvl.ERROR, "configuring meter '{}' failed".format(idf_meter))
+        self.__log.log(pyLOG.LogLvl.ERROR, "  reloading meter '{}' failed".format(idf_meter))
         self.__log.log(pyLOG.LogLvl.ERROR, "{}".format(traceback.format_exc()))
+    self.__log.log(pyLOG.LogLvl.INFO, "reloading configuration done")
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def __remove(self, pIdf:str):
+    """
+    @brief  Stops receiving of a meter and closes its report handlers.
+    @param  pIdf  A HM meter identifier.
+    """
+    try:
+      if (pIdf in self.__thd): self.__thd.pop(pIdf).close()
+      if (pIdf in self.__mtr): self.__mtr.pop(pIdf).close()
+      if (self.__pipe is not None): self.__pipe.forget(pIdf)
+    except:
+      self.__log.log(pyLOG.LogLvl.ERROR, "deconfiguring meter '{}' failed".format(pIdf))
+      self.__log.log(pyLOG.LogLvl.ERROR, "{}".format(traceback.format_exc()))
+
+  #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+  def state(self):
+    """
+    @brief  Returns the dict mapping the meters onto their state.
+    """
+    vRslt = {}
+    for tk, tv in list(self.__mtr.items()):
+      try:
+        vRslt[tk] = tv.state()
+      except Exception:
+        self.__log.log(pyLOG.LogLvl.ERROR, "state of meter '{}' failed\n{}".format(tk, traceback.format_exc()))
+    return vRslt
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
   def isalive(self):
@@ -441,30 +4321,69 @@ class SMTrace:
     return False
 
   #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-  def stop(self):
+  def stop(self, pTimeout:float=None):
     """
-    @brief  Trigger exiting threads.
+    @brief  Stops receiving, drains the pipeline, flushes the files of all report handlers and writes a last state
+            snapshot, within pTimeout seconds in total as far as possible.
+    @param  pTimeout  Shutdown deadline in seconds; None for 'stoptimeout' of the state configuration.
     """
     self.__log.log_callinfo()
+    vEnd  = time.monotonic() + ((self.__cfg["general"].get("state") or {}).get("stoptimeout", 20.0) if (pTimeout is None) else pTimeout)
+    vLeft = lambda: max(0.1, vEnd - time.monotonic())
     for tk, tv in self.__thd.items():
       self.__log.log(pyLOG.LogLvl.INFO, "deconfiguring meter '{}' started".format(tk))
       tv.close()
       self.__log.log(pyLOG.LogLvl.INFO, "  receive thread '{}' stopped".format(tv))
       self.__log.log(pyLOG.LogLvl.INFO, "deconfiguring meter '{}' done".format(tk))
+    if (self.__net is not None):
+      self.__net.stop(vLeft())
+    if (self.__rtm is not None):
+      self.__rtm.stop(vLeft())
+    if (self.__pipe is not None):
+      self.__pipe.stop(vLeft())
+      self.__log.log(pyLOG.LogLvl.INFO, "pipeline stopped: {}".format(self.__pipe.stats()))
+    self.__ste.stop(vLeft())
+    for tk, tv in self.__mtr.items():
+      try:
+        tv.flush()
+      except Exception:
+        self.__log.log(pyLOG.LogLvl.ERROR, "flushing meter '{}' failed\n{}".format(tk, traceback.format_exc()))
+    try:
+      self.__ste.save(self.state())
+    except Exception:
+      self.__log.log(pyLOG.LogLvl.ERROR, "saving state failed\n{}".format(traceback.format_exc()))
+    SMTrace_Mailer.MailStop(vLeft())
+    SMTrace_Stats.StatsStop()
+    SMTrace_HTTPServer.HttpStop()
+    self.__log.log(pyLOG.LogLvl.INFO, "stopped with {:.1f} s of the deadline left".format(vEnd - time.monotonic()))
 
 
 ########################################################################################################################
 
 
-def signal_handler(signal, frame):
+def signal_handler(signum, frame):
   """
   @brief  Application interrupt handler function.
   """
   global vSMTrace
+  signal.signal(signal.SIGINT,  signal.SIG_DFL) # a second signal terminates at once
+  signal.signal(signal.SIGTERM, signal.SIG_DFL)
   vSMTrace.stop()
-  while (True == vSMTrace.isalive()):
-    time.sleep(2.5)
-  os._exit(1)
+  vEnd = time.monotonic() + 5.0
+  while ((True == vSMTrace.isalive()) and (time.monotonic() < vEnd)):
+    time.sleep(0.1)
+  os._exit(1 if (vSMTrace.isalive()) else 0) # all files are flushed, skip waiting for the scheduler threads
+
+
+########################################################################################################################
+
+
+def reload_handler(signum, frame):
+  """
+  @brief  Application reload handler function; the configuration is reloaded by the main loop.
+  """
+  global vReload
+  vReload = True
 
 
 ########################################################################################################################
@@ -476,16 +4395,77 @@ if (__name__ == '__main__'):
 
     vCfg = None
 
-    with open("pySMTrace.cfg", "r") as fhdl:
-        vCfg = yaml.load(fhdl.read(), Loader=yaml.SafeLoader)
+    vPrs = argparse.ArgumentParser(description="Smart Meter tracing application")
+    vPrs.add_argument("--config", default="pySMTrace.cfg", help="configuration file (default: %(default)s)")
+    vPrs.add_argument("--replay", nargs="+", metavar="FILE", help="replay PCAPNG files or raw byte dumps instead of reading the serial ports")
+    vPrs.add_argument("--meter",  help="meter configuration used for the replay (default: first meter)")
+    vPrs.add_argument("--chunk",  type=int,   default=0,   help="bytes per data_received call of the replay; 0 for whole records (default: %(default)s)")
+    vPrs.add_argument("--speed",  type=float, default=0.0, help="time scale factor of the replay; 0 for maximum speed (default: %(default)s)")
+    vPrs.add_argument("--archive",   metavar="DIR", help="query the archive directory of a meter instead of tracing; lists its keys without --key")
+    vPrs.add_argument("--key",       help="archived key to query")
+    vPrs.add_argument("--start",     help="start of the query in ISO format, local time unless an offset is given (incl.)")
+    vPrs.add_argument("--end",       help="end of the query in ISO format, local time unless an offset is given (excl.)")
+    vPrs.add_argument("--aggregate", choices=SMTrace_Archive.FUNCS, help="aggregate the values of the query")
+    vPrs.add_argument("--bucket",    type=float, help="seconds per aggregation bucket, aligned to UTC (default: one bucket)")
+    vArgs = vPrs.parse_args()
 
-    signal.signal(signal.SIGINT,  signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    if (vArgs.archive):
+        vPrs.exit(0, SMTrace_Archive.cli(vArgs.archive, vArgs.key, vArgs.start, vArgs.end, vArgs.aggregate, vArgs.bucket))
+
+    try:
+        vCfg = SMTrace_Config.load(vArgs.config)
+    except SMTrace_Exception as e:
+        vPrs.exit(1, "{}\n".format(e._mssg))
 
     pyLOG.LogInit(vCfg["general"]["logger"])
     pyRPT.RptInit(vCfg["general"]["reporter"])
+    SMTrace_Stats.StatsInit(vCfg["general"].get("stats"), pyLOG.Log(vCfg["general"]["logref"]))
+    SMTrace_HTTPServer.HttpInit(vCfg["general"].get("http"), pyLOG.Log(vCfg["general"]["logref"]))
+
+    if (vArgs.replay):
+        vCfg["general"]["mailer"] = dict(vCfg["general"].get("mailer") or {}, sink=True)
+        SMTrace_Mailer.MailInit(vCfg["general"]["mailer"], None, pyLOG.Log(vCfg["general"]["logref"]))
+        vIdf  = vArgs.meter or next(iter(vCfg["meters"]))
+        vPipe = None
+        if ((vCfg["general"].get("pipeline") or {}).get("mode") is not None):
+            vPipe = SMTrace_Pipeline(dict(vCfg["general"]["pipeline"], policy="block", blocktimeout=None), pyLOG.Log(vCfg["general"]["logref"]))
+        vRslt = SMTrace_Replay(vIdf, vCfg["meters"][vIdf], vPipe, vArgs.chunk, vArgs.speed).run(vArgs.replay)
+        vRslt["mails"] = SMTrace_Mailer.sunk
+        print(yaml.safe_dump({vIdf: vRslt}, default_flow_style=False, sort_keys=False), end="", flush=True)
+        SMTrace_Mailer.MailStop()
+        SMTrace_Stats.StatsStop()
+        SMTrace_HTTPServer.HttpStop()
 
-    vSMTrace = SMTrace(vCfg)
+    else:
+        signal.signal(signal.SIGINT,  signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
 
-    while (True):
-        time.sleep(30.0)
+        SMTrace_Mailer.MailInit(vCfg["general"].get("mailer"), vCfg["general"]["reporter"]["handlers"], pyLOG.Log(vCfg["general"]["logref"]))
+
+        vSMTrace = SMTrace(vCfg)
+        vReload  = False
+        vMtime   = [os.stat(vArgs.config).st_mtime_ns] * 2 # applied, last seen
+        vCheck   = time.monotonic()
+        if (hasattr(signal, "SIGHUP")):
+            signal.signal(signal.SIGHUP, reload_handler)
+
+        while (True):
+            time.sleep(1.0)
+            vWatch = vCfg["general"].get("reload") or dict()
+            if (vWatch.get("watch", False) and (time.monotonic() >= vCheck)):
+                vCheck = time.monotonic() + vWatch.get("interval", 5.0)
+                try:
+                    vSeen = os.stat(vArgs.config).st_mtime_ns
+                except OSError:
+                    vSeen = vMtime[1] # being replaced
+                if ((vSeen != vMtime[0]) and (vSeen == vMtime[1])): vReload = True # unchanged for one interval
+                vMtime[1] = vSeen
+            if (vReload):
+                vReload = False
+                try:
+                    vMtime[0] = vMtime[1] = os.stat(vArgs.config).st_mtime_ns
+                    vNew = SMTrace_Config.load(vArgs.config)
+                    vSMTrace.reload(vNew)
+                    vCfg = vNew
+                except Exception as e:
+                    pyLOG.Log(vCfg["general"]["logref"]).log(pyLOG.LogLvl.ERROR, "reloading '{}' rejected, the configuration in use is kept\n{}".format(vArgs.config, e._mssg if isinstance(e, SMTrace_Exception) else "{}: {}".format(type(e).__name__, e)))
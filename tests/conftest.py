@@ -0,0 +1,57 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+########################################################################################################################
+
+
+import os
+import os.path
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+
+########################################################################################################################
+
+
+@pytest.fixture
+def wait():
+    """
+    @brief  Returns a function waiting until a condition holds, returning its last result.
+    """
+    def wait(pCond, pTimeout:float=5.0):
+        vEnd = time.monotonic() + pTimeout
+        while ((not pCond()) and (time.monotonic() < vEnd)):
+            time.sleep(0.01)
+        return pCond()
+    return wait
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def numpy(request, monkeypatch):
+    """
+    @brief  Runs a test with and without the numpy code paths; returns whether numpy is used.
+    """
+    import pySMTrace
+    if (not request.param):
+        monkeypatch.setattr(pySMTrace, "numpy", None)
+    elif (pySMTrace.numpy is None):
+        pytest.skip("numpy is not installed")
+    return request.param
@@ -0,0 +1,108 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+########################################################################################################################
+
+
+import os
+
+import pytest
+
+import pySMTrace
+
+
+########################################################################################################################
+
+
+DAY  = 86400 * 1000000000
+BASE = 1735689600 * 1000000000 # 2025-01-01T00:00:00Z
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def records():
+    """
+    @brief  Returns the list of (timestamp, energy, power) written by the tests: every 10 minutes over two UTC days.
+    """
+    return [(BASE + i * 600 * 1000000000, 1000.0 + i * 2.5, float((i * 37) % 500)) for i in range(2 * 144)]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def archive(tmp_path):
+    """
+    @brief  Returns the directory of an archive of records() with a late record and non numeric values.
+    """
+    vHdl = pySMTrace.SMTrace_Report.Archive({"location": str(tmp_path), "keys": ["energy", "power"], "fsync": 0.0}, None, None, "meter 1")
+    vLate = None
+    for i, (vT, vE, vP) in enumerate(records()):
+        if (i == 100):
+            vLate = (vT, vE, vP)
+            continue
+        vHdl.log(vT, {b"energy": {"valu": vE, "unit": b"Wh"}, "power": {"valu": vP, "unit": "W"}, "name": {"valu": b"SMT", "unit": None}, "other": {"valu": 1, "unit": None}})
+    vHdl.log(vLate[0], {"energy": {"valu": vLate[1], "unit": "Wh"}, "power": {"valu": vLate[2], "unit": "W"}, "flag": {"valu": True, "unit": None}})
+    vHdl.close()
+    return vHdl.path
+
+
+########################################################################################################################
+
+
+def test_archive_layout(archive):
+    vArc = pySMTrace.SMTrace_Archive(archive)
+    assert os.path.basename(archive) == "meter_1"
+    assert vArc.keys() == {"energy": "Wh", "power": "W"}
+    assert vArc.days() == ["20250101", "20250102"]
+    assert pySMTrace.SMTrace_Archive.index(archive)["unsorted"] == ["20250101"]
+    with pytest.raises(pySMTrace.SMTrace_Exception):
+        vArc.scan("name")
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_archive_scan(archive, numpy):
+    vArc = pySMTrace.SMTrace_Archive(archive)
+    vRec = records()
+    vTs, vVs = vArc.scan("energy")
+    assert [int(t) for t in vTs] == [r[0] for r in vRec]
+    assert [float(v) for v in vVs] == [r[1] for r in vRec]
+    vTs, vVs = vArc.scan("power", BASE + DAY - 3600 * 1000000000, BASE + DAY + 3600 * 1000000000)
+    assert [int(t) for t in vTs] == [r[0] for r in vRec[138:150]]
+    assert [float(v) for v in vVs] == [r[2] for r in vRec[138:150]]
+    assert len(vArc.scan("power", BASE + 2 * DAY)[0]) == 0
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("pFunc", pySMTrace.SMTrace_Archive.FUNCS)
+def test_archive_aggregate(archive, numpy, pFunc):
+    vArc  = pySMTrace.SMTrace_Archive(archive)
+    vVals = [r[2] for r in records()]
+    vFunc = {"count": len, "sum": sum, "min": min, "max": max, "mean": lambda v: sum(v) / len(v), "first": lambda v: v[0], "last": lambda v: v[-1], "delta": lambda v: v[-1] - v[0]}[pFunc]
+    assert vArc.aggregate("power", pFunc) == [(BASE, pytest.approx(vFunc(vVals)))]
+    assert vArc.aggregate("power", pFunc, BASE + 3600 * 1000000000, BASE + 2 * DAY, 86400) == [(BASE, pytest.approx(vFunc(vVals[6:144]))), (BASE + DAY, pytest.approx(vFunc(vVals[144:])))]
+    assert vArc.aggregate("power", pFunc, BASE + 2 * DAY) == []
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_archive_append(archive, numpy):
+    with open(os.path.join(archive, "20250102.seg"), "ab") as fhdl:
+        fhdl.write(b"\x01\x02\x03") # partially written record of an interrupted run
+    vHdl = pySMTrace.SMTrace_Report.Archive({"location": os.path.dirname(archive), "name": "meter 1", "fsync": 0.0}, None)
+    vHdl.log(BASE + 2 * DAY - 1, {"power": {"valu": 7, "unit": "W"}, "voltage": {"valu": 230.5, "unit": "V"}})
+    vHdl.close()
+    vArc = pySMTrace.SMTrace_Archive(archive)
+    assert vArc.keys() == {"energy": "Wh", "power": "W", "voltage": "V"}
+    assert vArc.aggregate("power", "last") == [(BASE, 7.0)]
+    assert vArc.aggregate("power", "count") == [(BASE, len(records()) + 1)]
+    assert [float(v) for v in vArc.scan("voltage")[1]] == [230.5]
+    assert pySMTrace.SMTrace_Archive.index(archive)["unsorted"] == ["20250101"]
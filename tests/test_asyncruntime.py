@@ -0,0 +1,139 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+
+########################################################################################################################
+
+
+import os
+import threading
+
+import pytest
+import serial
+
+import pySMTrace
+
+
+########################################################################################################################
+
+
+class Recorder(object):
+    """
+    @brief  Protocol recording the calls of a SMTrace_AsyncReader and the threads they are made from.
+    """
+
+    def __init__(self):
+        self.chunks  = []
+        self.lost    = []
+        self.threads = set()
+
+    def __call__(self):
+        return self
+
+    @property
+    def data(self):
+        return b"".join(self.chunks)
+
+    def connection_made(self, pTransport):
+        self.threads.add(threading.current_thread().name)
+
+    def data_received(self, pData):
+        self.threads.add(threading.current_thread().name)
+        self.chunks.append(bytes(pData))
+
+    def connection_lost(self, pExc):
+        self.lost.append(pExc)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def runtime():
+    vRtm = pySMTrace.SMTrace_AsyncRuntime(dict(workers=2, pollinterval=0.02))
+    vRtm.start()
+    yield vRtm
+    vRtm.stop()
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture(params=["selected", "polled"])
+def port(request):
+    """
+    @brief  Yields the tuple (opened serial port, write function feeding it): a pseudo terminal whose file descriptor is
+            selectable, or a loop:// port without file descriptor which is polled.
+    """
+    if (request.param == "polled"):
+        vSer = serial.serial_for_url("loop://", timeout=0)
+        yield vSer, vSer.write
+        return
+    vMstr, vSlve = os.openpty()
+    vSer = serial.Serial(os.ttyname(vSlve), 9600, timeout=0)
+    yield vSer, lambda d: os.write(vMstr, d)
+    os.close(vMstr)
+    os.close(vSlve)
+
+
+########################################################################################################################
+
+
+def test_asyncruntime_reader(runtime, port, wait):
+    vSer, vWrite = port
+    vRec = Recorder()
+    vRdr = runtime.reader(vSer, vRec)
+    vRdr.start()
+    assert wait(lambda: vRec.threads)
+    for i in range(5): vWrite(bytes([i]) * 100)
+    assert wait(lambda: len(vRec.data) == 500)
+    assert vRec.data == b"".join(bytes([i]) * 100 for i in range(5))
+    assert vRec.threads == {"SMTrace_AsyncRuntime"}
+    vRdr.close()
+    assert wait(lambda: vRec.lost == [None])
+    assert (not vRdr.alive) and (not vSer.is_open)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_asyncruntime_reader_detaches_on_protocol_error(runtime, wait):
+    vSer = serial.serial_for_url("loop://", timeout=0)
+    vRec = Recorder()
+    vRec.data_received = lambda d: 1 / 0
+    runtime.reader(vSer, vRec).start()
+    vSer.write(b"\x00")
+    assert wait(lambda: vRec.lost)
+    assert isinstance(vRec.lost[0], ZeroDivisionError) and (not vSer.is_open)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_asyncruntime_scheduler_runs_jobs_in_the_pool(runtime, wait):
+    vDone  = threading.Event()
+    vThrds = []
+    def job():
+        vThrds.append(threading.current_thread().name)
+        vDone.set()
+    runtime.scheduler.add_job(job, "interval", seconds=0.05, max_instances=1)
+    assert vDone.wait(5.0)
+    assert vThrds[0] != "SMTrace_AsyncRuntime"
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_asyncruntime_stop_closes_readers_first(wait):
+    vRtm = pySMTrace.SMTrace_AsyncRuntime(dict(workers=1, pollinterval=0.02))
+    vRtm.start()
+    vSer = serial.serial_for_url("loop://", timeout=0)
+    vRec = Recorder()
+    vRdr = vRtm.reader(vSer, vRec)
+    vRdr.start()
+    assert wait(lambda: vRec.threads)
+    vRdr.close()
+    vRtm.stop()
+    assert vRec.lost == [None] and (not vSer.is_open)
@@ -0,0 +1,72 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+########################################################################################################################
+
+
+import os
+
+import pytest
+
+import pySMTrace
+import smtpserve
+
+
+########################################################################################################################
+
+
+def handler(pDir, pPort:int, **pArgs):
+    """
+    @brief  Returns an EMailSml handler capturing every telegram into pDir and mailing it via localhost:pPort.
+    """
+    vCfg = {"srvr": "127.0.0.1", "port": pPort, "auth": None, "type": "PLAIN", "from": "meter@localhost", "to": "user@localhost", "cc": None, "subjprfx": None,
+            "cron": [], "location": str(pDir), "naming": "%N.pcapng", "samplerate": 1, "compress": None, "maxsize": None, "keep": False}
+    return pySMTrace.SMTrace_Report.EMailSml(dict(vCfg, **pArgs), None, None, "meter")
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def server():
+    vSrv = smtpserve.SMTP_Server()
+    pySMTrace.SMTrace_Mailer.MailInit(None)
+    yield vSrv
+    vSrv.stop()
+
+
+########################################################################################################################
+
+
+@pytest.mark.parametrize("pCompress", [None, "gzip"])
+def test_capture_kept_until_sent(server, tmp_path, pCompress):
+    vPort = server.port
+    server.stop()
+    vHdl = handler(tmp_path, vPort, compress=pCompress, maxsize=600)
+    for i in range(40): vHdl.log(1735689600000000000 + i, os.urandom(40))
+    vHdl()
+    vOrph = vHdl.state()["orphans"]
+    assert [os.path.basename(f) for f in vOrph] == ["meter.pcapng" + ("" if (pCompress is None) else ".gz")]
+    assert os.path.isfile(vOrph[0])
+    vSize = os.path.getsize(vOrph[0])
+    server = smtpserve.SMTP_Server(("127.0.0.1", vPort))
+    try:
+        vHdl.send()
+        assert vHdl.state()["orphans"] == []
+        assert not os.path.exists(vOrph[0])
+        vData = b"".join(m[2].get_payload()[1].get_payload(decode=True) for m in server.messages)
+        assert len(vData) == vSize
+        assert len(server.messages) == -(-vSize // 570)
+    finally:
+        vHdl.close()
+        server.stop()
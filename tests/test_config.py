@@ -0,0 +1,116 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+########################################################################################################################
+
+
+import copy
+import os.path
+
+import pytest
+
+import pySMTrace
+
+
+########################################################################################################################
+
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pySMTrace.cfg")
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def config():
+    """
+    @brief  Returns a copy of the validated example configuration.
+    """
+    return copy.deepcopy(pySMTrace.SMTrace_Config.load(CONFIG))
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def problems(pCfg:dict):
+    """
+    @brief  Returns the problems of a configuration listed by SMTrace_Config.validate().
+    """
+    try:
+        pySMTrace.SMTrace_Config.validate(pCfg)
+    except pySMTrace.SMTrace_Exception as e:
+        return [vLine.strip() for vLine in e._mssg.splitlines()[1:]]
+    return []
+
+
+########################################################################################################################
+
+
+ACCEPT = {"tcp source"      : lambda c: c["meters"]["NameOfMeter01"].update(serial=None, tcp="192.168.1.10:7259"),
+          "udp port"        : lambda c: c["meters"]["NameOfMeter01"].update(serial=None, udp=7259),
+          "file source"     : lambda c: c["meters"]["NameOfMeter01"].update(serial=None, file="/dev/ttyUSB0"),
+          "lazy decoder"    : lambda c: c["meters"]["NameOfMeter01"].update(decode="lazy", obis=["1-0:1.8.0*255", "0100020800ff"]),
+          "deadband"        : lambda c: c["meters"]["NameOfMeter01"].update(deadband={"default": {"abs": 1}, "1-0:16.7.0": {"rel": 0.01, "heartbeat": 300}}),
+          "kermit crc"      : lambda c: c["meters"]["NameOfMeter01"].update(crc="KERMIT"),
+          "asyncio runtime" : lambda c: c["general"]["runtime"].update(mode="asyncio"),
+          "shm pipeline"    : lambda c: c["general"]["pipeline"].update(mode="shm", policy="block"),
+          "no optional"     : lambda c: [c["general"].pop(k) for k in pySMTrace.SMTrace_Config.RESTART + ("mailer", "reload")]}
+
+REJECT = {"no meters"       : (lambda c: c.pop("meters"),                                                        "'meters' is missing"),
+          "unknown section" : (lambda c: c.update(metres={}),                                                    "'metres' is unknown"),
+          "wrong type"      : (lambda c: c["meters"]["NameOfMeter01"].update(badframelog="often"),                "meters.NameOfMeter01.badframelog: 'often' is not of type int or float"),
+          "unknown key"     : (lambda c: c["meters"]["NameOfMeter01"].update(crcc="X25"),                        "meters.NameOfMeter01: 'crcc' is unknown"),
+          "missing key"     : (lambda c: c["meters"]["NameOfMeter01"].pop("rptref"),                             "meters.NameOfMeter01: 'rptref' is missing"),
+          "no source"       : (lambda c: c["meters"]["NameOfMeter01"].update(serial=None),                       "meters.NameOfMeter01: has not exactly one of the sources"),
+          "two sources"     : (lambda c: c["meters"]["NameOfMeter01"].update(udp=7259),                          "meters.NameOfMeter01: has not exactly one of the sources"),
+          "bad serial"      : (lambda c: c["meters"]["NameOfMeter01"].update(serial=["COM5", 9600, 9, 1, "none"]), "meters.NameOfMeter01.serial:"),
+          "tcp without host": (lambda c: c["meters"]["NameOfMeter01"].update(serial=None, tcp=":7259"),         "meters.NameOfMeter01.tcp:"),
+          "bad crc"         : (lambda c: c["meters"]["NameOfMeter01"].update(crc="CCITT"),                       "meters.NameOfMeter01.crc:"),
+          "bad obis"        : (lambda c: c["meters"]["NameOfMeter01"].update(obis=["1-0:1.8"]),                  "meters.NameOfMeter01.obis:"),
+          "bad deadband"    : (lambda c: c["meters"]["NameOfMeter01"].update(deadband={"1.8.0": {"abs": 1}}),    "meters.NameOfMeter01.deadband:"),
+          "small maxframe"  : (lambda c: c["meters"]["NameOfMeter01"].update(maxframe=8),                        "meters.NameOfMeter01.maxframe:"),
+          "bad decoder"     : (lambda c: c["meters"]["NameOfMeter01"].update(decode="fast"),                     "meters.NameOfMeter01.decode:"),
+          "unknown logger"  : (lambda c: c["meters"]["NameOfMeter01"].update(logref="__LOGGER__NONE__"),         "meters.NameOfMeter01.logref: logger '__LOGGER__NONE__' is not configured"),
+          "unknown reporter": (lambda c: c["meters"]["NameOfMeter01"].update(rptref="__REPORTER__NONE__"),       "meters.NameOfMeter01.rptref: reporter '__REPORTER__NONE__' is not configured"),
+          "unknown handler" : (lambda c: c["general"]["reporter"]["reporters"]["__REPORTER__NameOfMeter01__"]["handlers"].append("hndl_NONE"), "handler 'hndl_NONE' is not configured"),
+          "unknown class"   : (lambda c: c["general"]["reporter"]["handlers"]["hndl_NameOfMeter01_day"].update({"class": "SMTrace_Report.EMailHtml"}), "hndl_NameOfMeter01_day.class:"),
+          "bad cron"        : (lambda c: c["general"]["reporter"]["handlers"]["hndl_NameOfMeter01_day"].update(cron=["0 0 * *"]), "hndl_NameOfMeter01_day.cron:"),
+          "bad mode"        : (lambda c: c["general"]["reporter"]["handlers"]["hndl_NameOfMeter01_day"].update(mode="mean"), "hndl_NameOfMeter01_day.mode:"),
+          "bad aggregate"   : (lambda c: c["general"]["reporter"]["handlers"]["hndl_NameOfMeter01_day"].update(aggregate=["Zaehlerstand"]), "hndl_NameOfMeter01_day.aggregate:"),
+          "bad runtime"     : (lambda c: c["general"]["runtime"].update(mode="trio"),                            "general.runtime.mode:"),
+          "bad pipeline"    : (lambda c: c["general"]["pipeline"].update(mode="fork"),                           "general.pipeline.mode:"),
+          "bad policy"      : (lambda c: c["general"]["pipeline"].update(policy="dropnewest"),                   "general.pipeline.policy:")}
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("pEdit", ACCEPT.values(), ids=ACCEPT.keys())
+def test_config_accept(config, pEdit):
+    pEdit(config)
+    assert problems(config) == []
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("pEdit, pMssg", REJECT.values(), ids=REJECT.keys())
+def test_config_reject(config, pEdit, pMssg):
+    pEdit(config)
+    vErrs = problems(config)
+    assert len(vErrs) == 1
+    assert pMssg in vErrs[0]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_config_all_problems(config):
+    vCases = ("unknown section", "wrong type", "bad crc", "unknown reporter", "unknown handler", "bad cron", "bad policy")
+    for vCase in vCases: REJECT[vCase][0](config)
+    vErrs = problems(config)
+    assert len(vErrs) == len(vCases)
+    for vCase in vCases: assert any(REJECT[vCase][1] in vErr for vErr in vErrs)
+    assert problems([]) == [": is not a mapping"]
@@ -0,0 +1,120 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+
+########################################################################################################################
+
+
+import threading
+
+import pySMTrace
+import smlgen
+
+
+########################################################################################################################
+
+
+POWER  = pySMTrace.SMTrace_SMLDecoder.obis("1-0:16.7.0*255")
+ENERGY = pySMTrace.SMTrace_SMLDecoder.obis("1-0:1.8.0*255")
+SEC    = 1000000000
+
+
+class Meter(object):
+    """
+    @brief  Stand-in of a SMTrace_SMLPacket with a deadband, recording the entries it reports.
+    """
+
+    def __init__(self, pIdf:str, pCfg:dict):
+        self.idf     = pIdf
+        self.dec     = pySMTrace.SMTrace_SMLDecoder(None)
+        self.dbd     = pySMTrace.SMTrace_Deadband(pCfg)
+        self.reports = []
+        self.errors  = []
+
+    def decoder(self):
+        return None, self.dec, True
+
+    def prefilter(self, pTstmp:int):
+        self.dbd.now = pTstmp
+        return self.dbd.prefilter
+
+    def report(self, pPacket:bytes, pTelegram, pEntries:list, pTstmp:int=None):
+        self.reports.append([bytes(e[0]) for e in pEntries if self.dbd.check(bytes(e[0]), e[3], pTstmp)])
+
+    def error(self, pPacket:bytes, pExc:Exception):
+        self.errors.append(pExc)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def values(pDbd:pySMTrace.SMTrace_Deadband, pObjName:bytes, pValues:list):
+    """
+    @brief  Returns the values reported of a series of (value, time in s) of one object.
+    """
+    return [v for v, t in pValues if pDbd.check(pObjName, v, t * SEC)]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_deadband_thresholds():
+    vDbd = pySMTrace.SMTrace_Deadband({"default": {"abs": 5}, "1-0:1.8.0": {"rel": 0.1}})
+    assert values(vDbd, POWER,  [(100, 0), (105, 1), (106, 2), (103, 3), (112, 4), (112, 5)]) == [100, 106, 112]
+    assert values(vDbd, ENERGY, [(100, 0), (109, 1), (111, 2), (122, 3), (135, 4)])           == [100, 111, 135]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_deadband_reports_every_change_by_default():
+    vDbd = pySMTrace.SMTrace_Deadband({})
+    assert values(vDbd, POWER,  [(1, 0), (1, 1), (1.5, 2), (1.5, 3), (True, 4), (2, 5)]) == [1, 1.5, True, 2]
+    assert values(vDbd, ENERGY, [(b"a", 0), (b"a", 1), (b"b", 2)])                         == [b"a", b"b"]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_deadband_heartbeat():
+    vDbd = pySMTrace.SMTrace_Deadband({"default": {"abs": 100, "heartbeat": 10}})
+    assert values(vDbd, POWER, [(1, 0), (2, 5), (3, 9), (4, 10), (5, 15), (6, 21)]) == [1, 4, 6]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_deadband_prefilter_skips_unchanged_encodings():
+    vDbd = pySMTrace.SMTrace_Deadband({"1-0:16.7.0": {"heartbeat": 10}})
+    assert vDbd.prefilter(POWER, b"\x62\x1b\x52\x00\x55\x00\x00\x00\x64")
+    assert vDbd.check(POWER, 100, 0)
+    vDbd.now = 5 * SEC
+    assert not vDbd.prefilter(POWER, b"\x62\x1b\x52\x00\x55\x00\x00\x00\x64")
+    assert vDbd.prefilter(POWER, b"\x62\x1b\x52\x00\x55\x00\x00\x00\x65")
+    assert vDbd.check(POWER, 101, 5 * SEC)
+    vDbd.now = 14 * SEC
+    assert not vDbd.prefilter(POWER, b"\x62\x1b\x52\x00\x55\x00\x00\x00\x65")
+    vDbd.now = 15 * SEC
+    assert vDbd.prefilter(POWER, b"\x62\x1b\x52\x00\x55\x00\x00\x00\x65")
+    assert vDbd.check(POWER, 101, 15 * SEC)
+    assert vDbd.cnt_skipped == 2
+    assert vDbd.prefilter(ENERGY, b"\x01") and vDbd.check(ENERGY, 1, 15 * SEC)
+    assert not vDbd.prefilter(ENERGY, b"\x01") # no heartbeat
+    assert vDbd.cnt_skipped == 3
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_deadband_prefilter_in_pipeline(wait):
+    vTel  = smlgen.SML_Generator(pEntries=4, pSeed=3).telegram()
+    vMtr  = Meter("m", {})
+    vPipe = pySMTrace.SMTrace_Pipeline(dict(mode="thread", workers=2, queuesize=16, policy="block", blocktimeout=1.0, statsinterval=0))
+    try:
+        for i in range(3): vPipe.put(vMtr, vTel, i * SEC)
+        assert wait(lambda: len(vMtr.reports) == 3)
+    finally:
+        vPipe.stop()
+    assert (not vMtr.errors) and (len(vMtr.reports[0]) == 6)
+    assert vMtr.reports[1:]      == [[], []]
+    assert vMtr.dbd.cnt_skipped  == 12
@@ -0,0 +1,57 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+########################################################################################################################
+
+
+import json
+import urllib.request
+
+import pytest
+
+import pySMTrace
+
+
+########################################################################################################################
+
+
+@pytest.fixture
+def server():
+    vSrv = pySMTrace.SMTrace_HTTPServer("127.0.0.1", 0)
+    yield vSrv
+    vSrv.stop()
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def get(pServer:pySMTrace.SMTrace_HTTPServer, pPath:str):
+    """
+    @brief  Returns the body of a path of the endpoint as text.
+    """
+    with urllib.request.urlopen("http://{}:{}{}".format(*pServer.address, pPath), timeout=5.0) as vRsp:
+        return vRsp.read().decode()
+
+
+########################################################################################################################
+
+
+def test_http_values(server):
+    for i in range(3):
+        server.publish("meter 1", {"energy": {"valu": 1000 + i, "unit": "Wh"}, "on": {"valu": True, "unit": None}, "time": {"valu": "SMT{}".format(i), "unit": None}}, 1735689600000000000 + i)
+    vMetr = get(server, "/metrics")
+    assert 'smtrace_value{meter="meter 1",key="energy",unit="Wh"} 1002.0\n' in vMetr
+    assert 'smtrace_value{meter="meter 1",key="on",unit=""} 1.0\n' in vMetr
+    assert "SMT" not in vMetr
+    assert 'smtrace_changed_timestamp_seconds{meter="meter 1"} 1735689600.000\n' in vMetr
+    assert json.loads(get(server, "/values")) == {"meter 1": {"timestamp": 1735689600.000000002, "values": {"energy": {"valu": 1002, "unit": "Wh"}, "on": {"valu": True, "unit": None}, "time": {"valu": "SMT2", "unit": None}}}}
@@ -0,0 +1,195 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+########################################################################################################################
+
+
+import email.message
+import os
+import time
+
+import pytest
+
+import pySMTrace
+import smtpserve
+
+
+########################################################################################################################
+
+
+def message(pText:str):
+    """
+    @brief  Returns a text message with pText as subject and content.
+    """
+    vMssg = email.message.EmailMessage()
+    vMssg.add_header("From",    "meter@localhost")
+    vMssg.add_header("To",      "user@localhost")
+    vMssg.add_header("Subject", pText)
+    vMssg.set_content(pText)
+    return vMssg
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def account(pPort:int):
+    """
+    @brief  Returns a report handler configuration of the SMTP account on localhost:pPort.
+    """
+    return {"srvr": "127.0.0.1", "port": pPort, "auth": None, "type": "PLAIN", "to": "user@localhost"}
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def pool(**pArgs):
+    """
+    @brief  Returns a mailer configuration with pooling enabled and short delays.
+    """
+    return dict(dict(pool=True, batchdelay=0.2, backoff=0.05, backoffmax=0.1, idle=10.0, retries=3, timeout=5.0), **pArgs)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def server():
+    vSrv = smtpserve.SMTP_Server()
+    yield vSrv
+    pySMTrace.SMTrace_Mailer.MailStop(5.0)
+    pySMTrace.SMTrace_Mailer.MailInit(None)
+    vSrv.stop()
+
+
+########################################################################################################################
+
+
+def test_unpooled_send(server):
+    pySMTrace.SMTrace_Mailer.MailInit(None)
+    assert pySMTrace.SMTrace_Mailer.sendmail(account(server.port), message("one"))
+    assert pySMTrace.SMTrace_Mailer.sendmail(account(server.port), message("two"))
+    assert [m[2]["Subject"] for m in server.messages] == ["one", "two"]
+    assert server.counts["connects"] == 2
+
+
+def test_unpooled_send_fails_without_server(server):
+    pySMTrace.SMTrace_Mailer.MailInit(None)
+    vCfg = account(server.port)
+    server.stop()
+    assert not pySMTrace.SMTrace_Mailer.sendmail(vCfg, message("one"))
+
+
+def test_pool_batches_and_reuses_the_connection(server, wait):
+    vCfg = account(server.port)
+    pySMTrace.SMTrace_Mailer.MailInit(pool(batchdelay=0.5), {"h": vCfg})
+    vMlr = pySMTrace.SMTrace_Mailer.get(vCfg)
+    for vText in ("a", "b", "c"):
+        assert pySMTrace.SMTrace_Mailer.sendmail(vCfg, message(vText))
+        time.sleep(0.1)
+    assert wait(lambda: len(server.messages) == 3)
+    assert server.messages[2][1] - server.messages[0][1] < 0.15 # sent in one batch, not as queued
+    assert wait(lambda: vMlr.stats()["sent"] == 3)
+    assert pySMTrace.SMTrace_Mailer.sendmail(vCfg, message("d"))
+    assert wait(lambda: len(server.messages) == 4)
+    assert [m[2]["Subject"] for m in server.messages] == ["a", "b", "c", "d"]
+    assert {m[0] for m in server.messages} == {1}
+    assert server.counts["connects"] == 1
+    assert server.counts["noops"] >= 1
+    assert vMlr.stats()["connects"] == 1
+
+
+def test_pool_retries_temporary_failures(server, wait):
+    vCfg = account(server.port)
+    server.stop()
+    server = smtpserve.SMTP_Server(("127.0.0.1", vCfg["port"]), [451, 421])
+    try:
+        pySMTrace.SMTrace_Mailer.MailInit(pool(), {"h": vCfg})
+        vMlr = pySMTrace.SMTrace_Mailer.get(vCfg)
+        assert pySMTrace.SMTrace_Mailer.sendmail(vCfg, message("a"))
+        assert wait(lambda: vMlr.stats()["sent"] == 1)
+        assert [m[2]["Subject"] for m in server.messages] == ["a"]
+        assert server.counts["rejected"] == 2
+        assert vMlr.stats()["retries"] == 2
+        assert vMlr.stats()["failed"] == 0
+    finally:
+        pySMTrace.SMTrace_Mailer.MailStop(5.0)
+        server.stop()
+
+
+def test_pool_keeps_permanently_rejected_mail_as_failed(server, wait, tmp_path):
+    vCfg = account(server.port)
+    server.stop()
+    server = smtpserve.SMTP_Server(("127.0.0.1", vCfg["port"]), [550])
+    try:
+        pySMTrace.SMTrace_Mailer.MailInit(pool(spool=str(tmp_path)), {"h": vCfg})
+        vMlr = pySMTrace.SMTrace_Mailer.get(vCfg)
+        assert pySMTrace.SMTrace_Mailer.sendmail(vCfg, message("a"))
+        assert wait(lambda: vMlr.stats()["failed"] == 1)
+        assert vMlr.stats()["retries"] == 0
+        assert server.messages == []
+        assert [os.path.splitext(f)[1] for d in tmp_path.iterdir() for f in os.listdir(d)] == [".failed"]
+    finally:
+        pySMTrace.SMTrace_Mailer.MailStop(5.0)
+        server.stop()
+
+
+def test_pool_resends_spooled_mail_after_restart(server, wait, tmp_path):
+    vCfg = account(server.port)
+    server.stop()
+    pySMTrace.SMTrace_Mailer.MailInit(pool(spool=str(tmp_path), retries=0), {"h": vCfg})
+    vMlr = pySMTrace.SMTrace_Mailer.get(vCfg)
+    vMlr.stop(0.0) # no dispatching, the messages stay spooled as after a crash
+    vMlr.send(message("a"))
+    vMlr.send(message("b"))
+    pySMTrace.SMTrace_Mailer.MailStop(5.0)
+    assert len([f for d in tmp_path.iterdir() for f in os.listdir(d) if f.endswith(".eml")]) == 2
+    server = smtpserve.SMTP_Server(("127.0.0.1", vCfg["port"]))
+    try:
+        pySMTrace.SMTrace_Mailer.MailInit(pool(spool=str(tmp_path)), {"h": vCfg})
+        assert wait(lambda: len(server.messages) == 2)
+        assert [m[2]["Subject"] for m in server.messages] == ["a", "b"]
+        assert wait(lambda: [f for d in tmp_path.iterdir() for f in os.listdir(d)] == [])
+    finally:
+        pySMTrace.SMTrace_Mailer.MailStop(5.0)
+        server.stop()
+
+
+def test_pool_fails_unreadable_spool_files_and_goes_on(server, wait, tmp_path):
+    vCfg = account(server.port)
+    vDir = tmp_path / "127_0_0_1_{}".format(server.port)
+    os.makedirs(vDir / "00000000000000000001_000001.eml") # not readable as file
+    with open(vDir / "00000000000000000002_000002.eml", "wb") as fhdl:
+        fhdl.write(b"Subject: truncated\r\n") # no recipients
+    pySMTrace.SMTrace_Mailer.MailInit(pool(spool=str(tmp_path)), {"h": vCfg})
+    vMlr = pySMTrace.SMTrace_Mailer.get(vCfg)
+    assert wait(lambda: vMlr.stats()["failed"] == 2)
+    assert sorted(os.listdir(vDir)) == ["00000000000000000001_000001.failed", "00000000000000000002_000002.failed"]
+    assert pySMTrace.SMTrace_Mailer.sendmail(vCfg, message("a"))
+    assert wait(lambda: len(server.messages) == 1)
+    assert vMlr.stats()["retries"] == 0
+
+
+def test_pool_requeues_spooled_mail_after_all_retries(server, wait, tmp_path):
+    vCfg = account(server.port)
+    server.stop()
+    server = smtpserve.SMTP_Server(("127.0.0.1", vCfg["port"]), [451, 451, 451])
+    try:
+        pySMTrace.SMTrace_Mailer.MailInit(pool(spool=str(tmp_path), retries=1, backoffmax=0.3), {"h": vCfg})
+        vMlr = pySMTrace.SMTrace_Mailer.get(vCfg)
+        assert pySMTrace.SMTrace_Mailer.sendmail(vCfg, message("a"))
+        assert wait(lambda: vMlr.stats()["failed"] == 1)
+        assert vMlr.stats()["deferred"] == 1
+        assert wait(lambda: len(server.messages) == 1)
+        assert [m[2]["Subject"] for m in server.messages] == ["a"]
+        assert server.counts["rejected"] == 3
+        assert wait(lambda: [f for d in tmp_path.iterdir() for f in os.listdir(d)] == [])
+        assert vMlr.stats()["deferred"] == 0
+    finally:
+        pySMTrace.SMTrace_Mailer.MailStop(5.0)
+        server.stop()
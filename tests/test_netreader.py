@@ -0,0 +1,178 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+########################################################################################################################
+
+
+import os
+import socket
+import threading
+
+import pytest
+
+import pySMTrace
+import smlgen
+import smlserve
+
+
+########################################################################################################################
+
+
+class Recorder(object):
+    """
+    @brief  Protocol recording the calls of a SMTrace_NetReader source, and the backoff of the source at every call.
+    """
+
+    def __init__(self):
+        self.chunks  = []
+        self.lost    = []
+        self.made    = []
+        self.backoff = []
+        self.__src   = None
+
+    def __call__(self):
+        return self
+
+    @property
+    def data(self):
+        return b"".join(self.chunks)
+
+    def connection_made(self, pTransport):
+        self.__src = pTransport
+        self.made.append(pTransport.backoff)
+
+    def data_received(self, pData):
+        self.chunks.append(bytes(pData))
+        self.backoff.append(self.__src.backoff)
+
+    def connection_lost(self, pExc):
+        self.lost.append(pExc)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def free_port(pType:int=socket.SOCK_STREAM):
+    """
+    @brief  Returns a port of localhost nobody listens on.
+    """
+    with socket.socket(socket.AF_INET, pType) as vSock:
+        vSock.bind(("127.0.0.1", 0))
+        return vSock.getsockname()[1]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def whole_telegrams(pData:bytes, pRef:list):
+    """
+    @brief  Returns the number of reference telegrams pData consists of, in order and each complete, or -1.
+    """
+    vPos = 0
+    vCnt = 0
+    for vTel in pRef:
+        if (pData.startswith(vTel, vPos)):
+            vPos += len(vTel)
+            vCnt += 1
+    return vCnt if (vPos == len(pData)) else -1
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def reader():
+    vRdr = pySMTrace.SMTrace_NetReader(dict(backoff=0.05, backoffmax=0.1, pollinterval=0.02))
+    yield vRdr
+    vRdr.stop()
+
+
+########################################################################################################################
+
+
+def test_tcp_reconnects_after_drop_and_pause(reader, wait):
+    vSrv = smlserve.SML_Server(smlgen.SML_Generator(pEntries=2, pSeed=1), ("127.0.0.1", 0), pInterval=0.05, pDrop=5, pPause=0.2)
+    vRec = Recorder()
+    vSrc = reader.source("m", "tcp", "127.0.0.1:{}".format(vSrv.port), vRec)
+    vSrc.start()
+    assert wait(lambda: vSrc.connects == 1)
+    vSrv.start(30)
+    try:
+        assert wait(lambda: vSrv.sent == 30, 15.0)
+        assert wait(lambda: len(vRec.lost) >= 6)
+    finally:
+        vSrc.close()
+        vSrv.stop()
+    vCnt = whole_telegrams(vRec.data, smlgen.SML_Generator(pEntries=2, pSeed=1).telegrams(30))
+    assert vSrc.connects == 6                # one connection per 5 telegrams
+    assert vCnt >= 25                        # every telegram sent while connected, and only whole ones
+    assert max(vRec.made) > 0.0              # connects were refused while paused
+    assert set(vRec.backoff) == {0.0}        # data resets the backoff
+
+
+def test_tcp_backoff_doubles_up_to_maximum(reader, wait):
+    vRec = Recorder()
+    vSrc = reader.source("m", "tcp", ["127.0.0.1", free_port()], vRec)
+    vBkf = []
+    vSrc.start()
+    assert wait(lambda: (vBkf.append(vSrc.backoff) or (vSrc.backoff == 0.1)))
+    vSrc.close()
+    assert vSrc.connects == 0
+    assert vRec.made == []
+    assert 0.05 in vBkf
+
+
+def test_udp_passes_every_datagram(reader, wait):
+    vPort = free_port(socket.SOCK_DGRAM)
+    vRec  = Recorder()
+    vSrc  = reader.source("m", "udp", "127.0.0.1:{}".format(vPort), vRec)
+    vSrc.start()
+    assert wait(lambda: vSrc.connects == 1)
+    vSrv  = smlserve.SML_Server(smlgen.SML_Generator(pEntries=2, pSeed=2), pUdp=("127.0.0.1", vPort), pInterval=0.01)
+    vSrv.start(20)
+    try:
+        assert wait(lambda: len(vRec.chunks) == 20)
+    finally:
+        vSrc.close()
+        vSrv.stop()
+    assert vRec.chunks == smlgen.SML_Generator(pEntries=2, pSeed=2).telegrams(20)
+    assert vSrc.connects == 1
+
+
+def test_file_is_followed(reader, wait, tmp_path):
+    vPath = tmp_path / "dump.bin"
+    vPath.write_bytes(b"abc")
+    vRec  = Recorder()
+    vSrc  = reader.source("m", "file", str(vPath), vRec)
+    vSrc.start()
+    assert wait(lambda: vRec.data == b"abc")
+    with open(vPath, "ab") as vHdl: vHdl.write(b"def")
+    assert wait(lambda: vRec.data == b"abcdef")
+    vSrc.close()
+    assert wait(lambda: vRec.lost == [None]) # closed without error
+    assert vSrc.connects == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="no FIFOs")
+def test_fifo_is_opened_again_at_eof(reader, wait, tmp_path):
+    vPath = str(tmp_path / "fifo")
+    os.mkfifo(vPath)
+    vRec  = Recorder()
+    vSrc  = reader.source("m", "file", vPath, vRec)
+    vSrc.start()
+    def write():
+        for i in range(3):
+            with open(vPath, "wb") as vHdl: vHdl.write(b"fifo%d" % i)
+            assert wait(lambda: vRec.data.endswith(b"fifo%d" % i))
+    vThd  = threading.Thread(target=write, daemon=True)
+    vThd.start()
+    vThd.join(10.0)
+    vSrc.close()
+    assert vRec.data == b"fifo0fifo1fifo2"
+    assert vSrc.connects >= 3
@@ -0,0 +1,102 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+
+########################################################################################################################
+
+
+import pytest
+
+import pySMTrace
+
+
+########################################################################################################################
+
+
+class Obis(object):
+    """
+    @brief  Stand-in of a pyOBIS.OBIS counting the lookups.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def getDescr(self, pObis:int):
+        self.calls += 1
+        return dict(descr="{:012X}".format(pObis))
+
+    def getUnit(self, pUnit:int):
+        return dict(native={27: "W", 30: "Wh"}.get(pUnit, "?"))
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def obis(pC:int):
+    """
+    @brief  Returns the object name of the OBIS code 1-0:pC.8.0*255.
+    """
+    return bytes([1, 0, pC, 8, 0, 255])
+
+
+########################################################################################################################
+
+
+def test_obiscache_lookup():
+    vObs = Obis()
+    vObc = pySMTrace.SMTrace_OBISCache(4)
+    assert vObc.lookup(bytearray(obis(1)), 30, -1, vObs) == ("0100010800FF", "Wh", -1, 10)
+    assert vObc.lookup(obis(1), 30, -1, vObs)            == ("0100010800FF", "Wh", -1, 10)
+    assert (vObc.hits, vObc.misses, vObs.calls) == (1, 1, 1)
+    assert vObc.lookup(obis(1), 30, 0, vObs)[3] == 1 # unit and scaler are part of the key
+    assert vObc.lookup(obis(2), None, None, vObs) == ("0100020800FF", None, None, None)
+    assert (vObc.hits, vObc.misses, len(vObc)) == (1, 3, 3)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("pScaler, pValue", [(-3, 12.345), (-2, 123.45), (-1, 1234.5), (0, 12345), (2, 1234500)])
+def test_obiscache_factor(pScaler, pValue):
+    vFactor = pySMTrace.SMTrace_OBISCache().lookup(obis(1), 27, pScaler, Obis())[3]
+    assert (12345 / vFactor if (pScaler < 0) else 12345 * vFactor) == pytest.approx(pValue)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_obiscache_lru_eviction():
+    vObs = Obis()
+    vObc = pySMTrace.SMTrace_OBISCache(2)
+    for c in (1, 2, 1, 3): vObc.lookup(obis(c), 30, 0, vObs) # 2 is the least recently used one when 3 is added
+    assert (len(vObc), vObs.calls) == (2, 3)
+    vObc.lookup(obis(1), 30, 0, vObs)
+    vObc.lookup(obis(3), 30, 0, vObs)
+    assert vObs.calls == 3
+    vObc.lookup(obis(2), 30, 0, vObs)
+    assert (len(vObc), vObs.calls, vObc.hits, vObc.misses) == (2, 4, 3, 4)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_obiscache_shared_by_name():
+    vObc = pySMTrace.SMTrace_OBISCache.get("test_obiscache_shared", 8)
+    assert pySMTrace.SMTrace_OBISCache.get("test_obiscache_shared", 16) is vObc
+    assert pySMTrace.SMTrace_OBISCache.get("test_obiscache_other") is not vObc
+    assert pySMTrace.SMTrace_OBISCache.get(None) is not pySMTrace.SMTrace_OBISCache.get(None)
+    vObs = Obis()
+    vObc.lookup(obis(1), 30, 0, vObs)
+    pySMTrace.SMTrace_OBISCache.get("test_obiscache_shared").lookup(obis(1), 30, 0, vObs)
+    assert (vObc.hits, vObs.calls) == (1, 1)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("pSize", [0, "8"])
+def test_obiscache_size(pSize):
+    with pytest.raises(pySMTrace.SMTrace_Exception):
+        pySMTrace.SMTrace_OBISCache(pSize)
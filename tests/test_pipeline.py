@@ -0,0 +1,162 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+########################################################################################################################
+
+
+import queue
+import threading
+
+import pytest
+
+import pySMTrace
+import smlgen
+
+
+########################################################################################################################
+
+
+ENTRIES = [(bytearray(b"\x01\x00\x01\x08\x00\xff"), 30, -1, 123456789012),
+           (b"\x01\x00\x10\x07\x00\xff", 27, 0, -5),
+           (b"\x01\x00\x60\x01\x00\xff", None, None, bytearray(b"SMTRACE")),
+           (b"\x81\x81\xc7\x82\x03\xff", None, None, b"\x1b\x1b\x1b\x1b" + bytes(range(256)) * 2),
+           (b"", 255, -128, b""),
+           (b"\x00", None, 3, True),
+           (b"\x01", 1, None, False),
+           (b"\x02", None, None, None),
+           (b"\x03", 0, 0, -(1 << 63)),
+           (b"\x04", 0, 0, (1 << 63) - 1),
+           (b"\x05", 0, 0, 1 << 63),
+           (b"\x06", 0, 0, (1 << 64) - 1)]
+
+
+class Meter(object):
+    """
+    @brief  Stand-in of a SMTrace_SMLPacket recording what the pipeline reports, optionally held until a gate opens.
+    """
+
+    def __init__(self, pIdf:str, pObis:list=None, pGate:threading.Event=None):
+        self.idf     = pIdf
+        self.dec     = pySMTrace.SMTrace_SMLDecoder(pObis)
+        self.gate    = pGate
+        self.reports = []
+        self.errors  = []
+
+    def decoder(self):
+        return None, self.dec, True
+
+    def prefilter(self, pTstmp:int):
+        return None
+
+    def report(self, pPacket:bytes, pTelegram, pEntries:list, pTstmp:int=None):
+        if (self.gate is not None): self.gate.wait(5.0)
+        self.reports.append((pTstmp, threading.current_thread().name, len(pEntries)))
+
+    def error(self, pPacket:bytes, pExc:Exception):
+        self.errors.append(pExc)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def pipeline(**pArgs):
+    """
+    @brief  Returns a started pipeline with short timeouts.
+    """
+    return pySMTrace.SMTrace_Pipeline(dict(dict(mode="thread", workers=2, queuesize=16, policy="block", blocktimeout=1.0, slots=8, statsinterval=0), **pArgs))
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture(scope="module")
+def telegrams():
+    return smlgen.SML_Generator(pEntries=4, pSeed=8).telegrams(8)
+
+
+########################################################################################################################
+
+
+@pytest.mark.parametrize("pPolicy, pReported", [("block", [0, 1, 2]), ("drop", [0, 1, 2]), ("dropoldest", [0, 4, 5])])
+def test_pipeline_policy(telegrams, wait, pPolicy, pReported):
+    vGate = threading.Event()
+    vMtr  = Meter("meter", pGate=vGate)
+    vPipe = pipeline(workers=1, queuesize=2, policy=pPolicy, blocktimeout=0.05)
+    vPipe.put(vMtr, telegrams[0], 0)
+    assert wait(lambda: vPipe.stats()["depth"] == [0]) # held by the worker
+    for i in range(1, 6): vPipe.put(vMtr, telegrams[i], i)
+    vStat = vPipe.stats()
+    assert (vStat["enqueued"], vStat["dropped"], vStat["maxdepth"]) == (6 if (pPolicy == "dropoldest") else 3, 3, 2)
+    vGate.set()
+    vPipe.stop()
+    assert [r[0] for r in vMtr.reports] == pReported
+    assert vPipe.stats()["processed"] == vPipe.stats()["enqueued"] - (3 if (pPolicy == "dropoldest") else 0)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_pipeline_dropoldest_keeps_other_meters(telegrams, wait):
+    vGate = threading.Event()
+    vMtrs = dict(a=Meter("a", pGate=vGate), b=Meter("b"), c=Meter("c"))
+    vPipe = pipeline(workers=1, queuesize=3, policy="dropoldest")
+    vPipe.put(vMtrs["a"], telegrams[0], 0)
+    assert wait(lambda: vPipe.stats()["depth"] == [0]) # held by the worker
+    for i, vIdf in enumerate("baaaabc", 1): vPipe.put(vMtrs[vIdf], telegrams[i % len(telegrams)], i)
+    vStat = vPipe.stats()
+    assert (vStat["enqueued"], vStat["dropped"]) == (7, 4)
+    vGate.set()
+    vPipe.stop()
+    assert [r[0] for r in vMtrs["a"].reports] == [0, 4, 5]
+    assert [r[0] for r in vMtrs["b"].reports] == [6]
+    assert vMtrs["c"].reports == []
+    vQue = queue.Queue(2)
+    vQue.put("a")
+    vQue.put((vMtrs["b"], b"", 0, 0))
+    assert not pySMTrace.SMTrace_Pipeline._SMTrace_Pipeline__replace(vQue, "a", (vMtrs["a"], b"", 1, 0))
+    assert list(vQue.queue) == ["a", (vMtrs["b"], b"", 0, 0)] # identifiers of removed meters are kept
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("pMode", pySMTrace.SMTrace_Pipeline.MODES)
+def test_pipeline_meters(telegrams, pMode):
+    vPipe = pipeline(mode=pMode)
+    try:
+        vMtrs = [Meter("a"), Meter("b"), Meter("a", ["1-0:1.8.0*255"])] # the last one is "a" reconfigured
+        for i, vTel in enumerate(telegrams): vPipe.put(vMtrs[i % 2], vTel, i)
+        vPipe.forget("a")
+        for i, vTel in enumerate(telegrams): vPipe.put(vMtrs[2], vTel, i)
+    finally:
+        vPipe.stop()
+    assert [r[0] for r in vMtrs[0].reports] == list(range(0, len(telegrams), 2))
+    assert [r[0] for r in vMtrs[2].reports] == list(range(len(telegrams)))
+    assert [r[2] for r in vMtrs[0].reports + vMtrs[1].reports] == [6] * len(telegrams)
+    assert [r[2] for r in vMtrs[2].reports] == [1] * len(telegrams)
+    assert len({r[1] for r in vMtrs[0].reports}) == len({r[1] for r in vMtrs[1].reports}) == len({r[1] for r in vMtrs[2].reports}) == 1
+    assert {r[1] for r in vMtrs[0].reports} != {r[1] for r in vMtrs[1].reports}
+    assert vPipe.stats()["errors"] == 0
+
+
+########################################################################################################################
+
+
+def test_shm_pack():
+    vRslt = pySMTrace.SMTrace_ShmWorker.unpack(pySMTrace.SMTrace_ShmWorker.pack(ENTRIES))
+    assert vRslt == [(bytearray(o), u, s, bytearray(v) if isinstance(v, (bytes, bytearray)) else v) for o,u,s,v in ENTRIES]
+    assert all(isinstance(e[0], bytearray) for e in vRslt)
+    assert [type(e[3]) for e in vRslt] == [int, int, bytearray, bytearray, bytearray, bool, bool, type(None), int, int, int, int]
+    assert pySMTrace.SMTrace_ShmWorker.unpack(pySMTrace.SMTrace_ShmWorker.pack([])) == []
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_shm_pack_decoded():
+    vDec = pySMTrace.SMTrace_SMLDecoder()
+    for vTel in smlgen.SML_Generator(pEntries=12, pStrings=2, pOctets=4, pSeed=7).telegrams(20):
+        vEnts = vDec.decode(vTel)
+        assert pySMTrace.SMTrace_ShmWorker.unpack(pySMTrace.SMTrace_ShmWorker.pack(vEnts)) == [tuple(bytearray(x) if isinstance(x, (bytes, bytearray, memoryview)) else x for x in e) for e in vEnts]
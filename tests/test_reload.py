@@ -0,0 +1,130 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+
+########################################################################################################################
+
+
+import copy
+import os.path
+import socket
+
+import pytest
+
+import pySMTrace
+
+
+########################################################################################################################
+
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pySMTrace.cfg")
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def free_port():
+    """
+    @brief  Returns a UDP port of localhost nobody listens on.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as vSock:
+        vSock.bind(("127.0.0.1", 0))
+        return vSock.getsockname()[1]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def handlers(pTrc:pySMTrace.SMTrace, pIdf:str):
+    """
+    @brief  Returns the report handlers of a meter.
+    """
+    return list(pTrc._SMTrace__mtr[pIdf]._SMTrace_SMLPacket__rpt._SMTrace_Report__hdl)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def config(tmp_path):
+    """
+    @brief  Returns the example configuration with UDP sources, without cron jobs and with the capture files in
+            tmp_path; mail is discarded.
+    """
+    vCfg = copy.deepcopy(pySMTrace.SMTrace_Config.load(CONFIG))
+    for vMtr in vCfg["meters"].values():
+        vMtr.update(serial=None, udp=free_port())
+    for vHdl in vCfg["general"]["reporter"]["handlers"].values():
+        vHdl.update(cron=[], location=str(tmp_path)) if ("location" in vHdl) else vHdl.update(cron=[])
+    pySMTrace.pyRPT.RptInit(vCfg["general"]["reporter"])
+    pySMTrace.SMTrace_Mailer.MailInit(dict(sink=True))
+    return vCfg
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def trace(config):
+    vTrc = pySMTrace.SMTrace(copy.deepcopy(config))
+    yield vTrc
+    vTrc.stop(5.0)
+    pySMTrace.SMTrace_Mailer.MailInit(None)
+
+
+########################################################################################################################
+
+
+def test_reload_unchanged_keeps_everything(config, trace):
+    vMtrs = dict(trace._SMTrace__mtr)
+    vThds = dict(trace._SMTrace__thd)
+    vHdls = {k: handlers(trace, k) for k in vMtrs}
+    trace.reload(copy.deepcopy(config))
+    assert trace._SMTrace__mtr == vMtrs
+    assert all(trace._SMTrace__thd[k] is v for k,v in vThds.items())
+    assert all(all(a is b for a,b in zip(handlers(trace, k), v)) for k,v in vHdls.items())
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_reload_meters(config, trace):
+    vMtr  = trace._SMTrace__mtr["NameOfMeter01"]
+    vThd  = trace._SMTrace__thd["NameOfMeter01"]
+    vOld  = trace._SMTrace__thd["NameOfMeter02"]
+    vCfg  = copy.deepcopy(config)
+    vCfg["meters"]["NameOfMeter03"] = dict(vCfg["meters"].pop("NameOfMeter02"), udp=free_port())
+    vCfg["meters"]["NameOfMeter01"]["decode"] = "lazy"
+    trace.reload(vCfg)
+    assert set(trace._SMTrace__mtr) == set(trace._SMTrace__thd) == {"NameOfMeter01", "NameOfMeter03"}
+    assert (trace._SMTrace__mtr["NameOfMeter01"] is vMtr) and (trace._SMTrace__thd["NameOfMeter01"] is vThd) # decoding changed only
+    assert vMtr.decoder()[2]
+    assert not vOld.alive
+    vCfg = copy.deepcopy(vCfg)
+    vCfg["meters"]["NameOfMeter01"]["udp"] = free_port()
+    trace.reload(vCfg)
+    assert (trace._SMTrace__mtr["NameOfMeter01"] is vMtr) and (trace._SMTrace__thd["NameOfMeter01"] is not vThd) # new source, same frame buffer
+    assert not vThd.alive
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_reload_handlers(config, trace):
+    vTxt, vSml = handlers(trace, "NameOfMeter01")
+    vTxt.log(1735689600000000000, {"power": dict(valu=5, unit="W")})
+    vCfg = copy.deepcopy(config)
+    vCfg["general"]["reporter"]["handlers"]["hndl_NameOfMeter01_day"]["mode"] = "aggregate"
+    vCfg["general"]["reporter"]["reporters"]["__REPORTER__NameOfMeter01__"]["handlers"].append("hndl_NameOfMeter01_archive")
+    vCfg["general"]["reporter"]["reporters"]["__REPORTER__NameOfMeter02__"]["handlers"].remove("hndl_NameOfMeter02_week")
+    vOthr = handlers(trace, "NameOfMeter02")
+    trace.reload(vCfg)
+    vHdls = handlers(trace, "NameOfMeter01")
+    assert [type(h).__name__ for h in vHdls] == ["EMailTxt", "EMailSml", "Archive"]
+    assert (vHdls[0] is not vTxt) and (vHdls[1] is vSml)
+    assert vHdls[0].state()["dat"] == vTxt.state()["dat"] # the successor took over the state
+    assert handlers(trace, "NameOfMeter02") == vOthr[:1]
+    assert trace._SMTrace__mtr["NameOfMeter01"].reload(vCfg["meters"]["NameOfMeter01"]) == (3, 0, 0, 0)
+    vCfg = copy.deepcopy(vCfg)
+    vCfg["meters"]["NameOfMeter01"]["note"] = "renamed"
+    assert trace._SMTrace__mtr["NameOfMeter01"].reload(vCfg["meters"]["NameOfMeter01"]) == (0, 3, 0, 0) # a changed identifier replaces all
@@ -0,0 +1,177 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+
+########################################################################################################################
+
+
+import struct
+import time
+
+import pytest
+
+import pySMTrace
+import smlgen
+
+
+########################################################################################################################
+
+
+T0 = 1735689600000000000
+
+
+class Meter(object):
+    """
+    @brief  Stand-in of a SMTrace_SMLPacket framing the replayed data and recording the reported telegrams.
+    """
+
+    def __init__(self, pIdf:str, pCfg:dict, pPipe=None):
+        self.clock     = time.time_ns
+        self.chunks    = []
+        self.reports   = []
+        self.triggered = 0
+        self.__crc     = pySMTrace.SMTrace_CRC16("X25")
+        self.__dec     = pySMTrace.SMTrace_SMLDecoder()
+        self.__framer  = pySMTrace.SMTrace_SMLFramer()
+
+    def data_received(self, pData:bytes):
+        self.chunks.append(len(pData))
+        for vFrame in self.__framer.feed(pData):
+            self.report(bytes(vFrame), None, *self.decode(vFrame))
+
+    def decode(self, pFrame:bytes):
+        return (self.__dec.decode(pFrame) if self.__crc.check(pFrame) else None), self.clock()
+
+    def report(self, pPacket:bytes, pTelegram, pEntries:list, pTstmp:int=None):
+        self.reports.append((pTstmp, pPacket))
+
+    def trigger(self):
+        self.triggered += 1
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def block(pOrdr:str, pType:int, pBody:bytes):
+    """
+    @brief  Returns a PCAPNG block of the byte order pOrdr with the body padded to 32 bit.
+    """
+    vBody = pBody + b"\x00" * ((-len(pBody)) % 4)
+    return struct.pack(pOrdr + "II", pType, len(vBody) + 12) + vBody + struct.pack(pOrdr + "I", len(vBody) + 12)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def section(pOrdr:str, pLinkType:int, pResol:int, pPackets:list):
+    """
+    @brief  Returns a PCAPNG section with one interface of pLinkType and an enhanced packet block per tuple
+            (timestamp in units of the interface, packet data) of pPackets. pResol is the if_tsresol option or None.
+    """
+    vOpts = b"" if (pResol is None) else struct.pack(pOrdr + "HHBxxx", 9, 1, pResol) + struct.pack(pOrdr + "HH", 0, 0)
+    vData = block(pOrdr, 0x0A0D0D0A, struct.pack(pOrdr + "IHHq", 0x1A2B3C4D, 1, 0, -1))
+    vData += block(pOrdr, 0x00000001, struct.pack(pOrdr + "HHI", pLinkType, 0, 0) + vOpts)
+    for vTstmp, vPckt in pPackets:
+        vData += block(pOrdr, 0x00000006, struct.pack(pOrdr + "IIIII", 0, vTstmp >> 32, vTstmp & 0xFFFFFFFF, len(vPckt), len(vPckt)) + vPckt)
+    return vData
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def ipv4(pPayload:bytes, pProto:int=17, pEthernet:bool=True):
+    """
+    @brief  Returns an IPv4 packet of pPayload, as UDP datagram with pProto 17, optionally in an Ethernet frame padded to
+            its minimum size.
+    """
+    if (pProto == 17): pPayload = struct.pack(">HHHH", 7259, 7259, len(pPayload) + 8, 0) + pPayload
+    vData = struct.pack(">BBHHHBBH4s4s", 0x45, 0, len(pPayload) + 20, 0, 0, 64, pProto, 0, b"\x7f\x00\x00\x01", b"\x7f\x00\x00\x01") + pPayload
+    if (not pEthernet): return vData
+    vData = b"\x00\x11\x22\x33\x44\x55" * 2 + b"\x08\x00" + vData
+    return vData + b"\x00" * max(0, 60 - len(vData))
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def replay(monkeypatch):
+    """
+    @brief  Returns a function creating a SMTrace_Replay which feeds a Meter.
+    """
+    monkeypatch.setattr(pySMTrace, "SMTrace_SMLPacket", Meter)
+    def replay(**pArgs):
+        vRpl = pySMTrace.SMTrace_Replay("meter", dict(serial=["COM1", 9600, 8, 1, "none"]), **pArgs)
+        return vRpl, vRpl._SMTrace_Replay__mtr
+    return replay
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture(scope="module")
+def telegrams():
+    return smlgen.SML_Generator(pEntries=4, pSeed=10).telegrams(6)
+
+
+########################################################################################################################
+
+
+def test_replay_payload():
+    vData = b"\x01\x02"
+    assert pySMTrace.SMTrace_Replay.payload(ipv4(vData), 1) == vData # without the Ethernet padding
+    assert pySMTrace.SMTrace_Replay.payload(ipv4(vData, pEthernet=False), 101) == vData
+    assert pySMTrace.SMTrace_Replay.payload(ipv4(vData, pProto=6), 1) is None
+    assert pySMTrace.SMTrace_Replay.payload(b"\x00" * 12 + b"\x86\xdd" + ipv4(vData)[14:], 1) is None
+    assert pySMTrace.SMTrace_Replay.payload(vData, 147) == vData
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_replay_pcapng(replay, telegrams, tmp_path):
+    vFile = tmp_path / "meter.pcapng"
+    vData = section("<", 1, 9, [(T0 + i, ipv4(t)) for i, t in enumerate(telegrams[:3])] + [(T0 + 3, ipv4(b"", pProto=6))])
+    vData += section(">", 101, None, [(T0 // 1000 + 1000 * i, ipv4(t, pEthernet=False)) for i, t in enumerate(telegrams[3:], 4)])
+    vFile.write_bytes(vData)
+    assert [t for t, d in pySMTrace.SMTrace_Replay.pcapng(str(vFile))] == [T0, T0 + 1, T0 + 2, T0 + 4000000, T0 + 5000000, T0 + 6000000]
+    vRpl, vMtr = replay()
+    vRslt = vRpl.run([str(vFile)])
+    assert vMtr.reports == [(T0, telegrams[0]), (T0 + 1, telegrams[1]), (T0 + 2, telegrams[2]), (T0 + 4000000, telegrams[3]), (T0 + 5000000, telegrams[4]), (T0 + 6000000, telegrams[5])]
+    assert (vRslt["files"], vRslt["telegrams"], vRslt["badcrc"], vRslt["bytes"]) == (1, 6, 0, sum(len(t) for t in telegrams))
+    assert vMtr.triggered == 1
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_replay_pcapng_truncated(tmp_path):
+    vFile = tmp_path / "meter.pcapng"
+    vFile.write_bytes(section("<", 1, 9, [(T0, ipv4(b"\x00" * 16))])[:-6])
+    with pytest.raises(pySMTrace.SMTrace_Exception):
+        list(pySMTrace.SMTrace_Replay.pcapng(str(vFile)))
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_replay_raw(replay, telegrams, tmp_path):
+    vBad  = bytearray(telegrams[1])
+    vBad[-1] ^= 0xFF
+    vData = b"\x55\xaa" + telegrams[0] + bytes(vBad) + b"".join(telegrams[2:])
+    vFile = tmp_path / "meter.bin"
+    vFile.write_bytes(vData)
+    vRpl, vMtr = replay(pChunk=7)
+    vStrt = time.time_ns()
+    vRslt = vRpl.run([str(vFile), str(vFile)])
+    assert [d for t, d in vMtr.reports] == ([telegrams[0], bytes(vBad)] + telegrams[2:]) * 2
+    assert all(t >= vStrt for t, d in vMtr.reports) # raw dumps are reported at the time of replay
+    assert set(vMtr.chunks) == {7, len(vData) % 7}
+    assert (vRslt["files"], vRslt["telegrams"], vRslt["badcrc"], vRslt["bytes"]) == (2, 12, 2, 2 * len(vData))
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_replay_speed(replay, telegrams, tmp_path):
+    vFile = tmp_path / "meter.pcapng"
+    vFile.write_bytes(section("<", 1, 9, [(T0 + i * 100000000, ipv4(t)) for i, t in enumerate(telegrams[:3])]))
+    vRpl, vMtr = replay(pSpeed=2.0)
+    vStrt = time.perf_counter()
+    vRpl.run([str(vFile)])
+    assert 0.09 <= time.perf_counter() - vStrt < 1.0 # 200 ms recorded, replayed twice as fast
+    assert len(vMtr.reports) == 3
@@ -0,0 +1,156 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+########################################################################################################################
+
+
+import random
+
+import pytest
+
+import pySMTrace
+import smlgen
+
+
+########################################################################################################################
+
+
+def frames(pFramer:pySMTrace.SMTrace_SMLFramer, pData:bytes, pChunk:int):
+    """
+    @brief  Returns the frames of pData fed in chunks of pChunk bytes, copied out of the framer buffer.
+    """
+    return [bytes(f) for i in range(0, len(pData), pChunk) for f in pFramer.feed(pData[i:i + pChunk])]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def normalized(pEntries:list):
+    """
+    @brief  Returns decoded entries with all octets as bytes, for comparing the results of different decoders.
+    """
+    return [tuple(bytes(x) if isinstance(x, (bytes, bytearray, memoryview)) else x for x in e) for e in pEntries]
+
+
+########################################################################################################################
+
+
+@pytest.mark.parametrize("pVariant, pCrc", [("X25", 0x906E), ("KERMIT", 0x2189)])
+def test_crc_known_answer(pVariant, pCrc):
+    vCrc = pySMTrace.SMTrace_CRC16(pVariant)
+    assert vCrc.calc(b"123456789")       == pCrc
+    assert vCrc.calc_table(b"123456789") == pCrc
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_crc_unknown_variant():
+    with pytest.raises(pySMTrace.SMTrace_Exception):
+        pySMTrace.SMTrace_CRC16("CCITT")
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_crc_check(numpy):
+    vCrc = pySMTrace.SMTrace_CRC16("X25")
+    vTels = smlgen.SML_Generator(pSeed=1).telegrams(20)
+    vTels[3] = vTels[3][:-1] + bytes([vTels[3][-1] ^ 0x01])
+    vTels[9] = vTels[9][:20] + bytes([vTels[9][20] ^ 0x80]) + vTels[9][21:]
+    vTels.append(smlgen.SML_Generator.frame(b""))
+    vGood = [i not in (3, 9) for i in range(len(vTels))]
+    assert [vCrc.check(t) for t in vTels] == vGood
+    assert list(vCrc.check_batch(vTels)) == vGood
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("pChunk", [1, 3, 4, 7, 64, 1 << 20])
+def test_framer_chunk_size(pChunk):
+    vRnd  = random.Random(2)
+    vTels = smlgen.SML_Generator(pSeed=2).telegrams(50)
+    vData = b"".join(bytes(vRnd.randrange(0x1b) for i in range(vRnd.randrange(17))) + t for t in vTels)
+    vFrmr = pySMTrace.SMTrace_SMLFramer()
+    assert frames(vFrmr, vData, pChunk) == vTels
+    assert vFrmr.cnt_frames == len(vTels)
+    assert (vFrmr.cnt_resyncs, vFrmr.cnt_overflw) == (0, 0)
+    assert vFrmr.cnt_dropped == len(vData) - sum(len(t) for t in vTels)
+    assert len(vFrmr) == 0
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("pChunk", [1, 5, 1 << 20])
+def test_framer_escapes(pChunk):
+    vMssgs = [pySMTrace.SMTrace_SMLFramer.ESC + b"\x1a\x00\x00\x00",  # escaped end sequence
+              pySMTrace.SMTrace_SMLFramer.START + b"\x01\x02",        # escaped start sequence
+              b"\x00\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1b\x1a\x01"]       # unaligned escape sequences, not escaped
+    vTels  = [smlgen.SML_Generator.frame(m) for m in vMssgs]
+    vFrmr  = pySMTrace.SMTrace_SMLFramer()
+    assert frames(vFrmr, b"".join(vTels), pChunk) == vTels
+    assert vFrmr.cnt_resyncs == 0
+    for vMssg, vTel in zip(vMssgs, vTels):
+        assert pySMTrace.SMTrace_SMLDecoder.payload(vTel)[:len(vMssg)] == vMssg
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("pChunk", [1, 1 << 20])
+def test_framer_truncated(pChunk):
+    vTels = smlgen.SML_Generator(pSeed=3).telegrams(3)
+    vFrmr = pySMTrace.SMTrace_SMLFramer()
+    assert frames(vFrmr, vTels[0][:-8] + vTels[1] + vTels[2], pChunk) == vTels[1:]
+    assert (vFrmr.cnt_frames, vFrmr.cnt_resyncs) == (2, 1)
+    assert vFrmr.cnt_dropped == len(vTels[0]) - 8
+    assert frames(vFrmr, vTels[0][:-8], pChunk) == []
+    assert len(vFrmr) == len(vTels[0]) - 8
+    assert frames(vFrmr, vTels[0][-8:], pChunk) == vTels[:1]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("pChunk", [1, 7, 1 << 20])
+def test_framer_overflow(pChunk):
+    vLong  = smlgen.SML_Generator.frame(b"\x01" * 200)
+    vShort = smlgen.SML_Generator.frame(b"\x02" * 8)
+    vFrmr  = pySMTrace.SMTrace_SMLFramer(64)
+    assert frames(vFrmr, vLong + vShort + vLong[:-8] + b"\x03" + vShort, pChunk) == [vShort, vShort]
+    assert vFrmr.cnt_frames  == 2
+    assert vFrmr.cnt_overflw == 2
+    assert len(vFrmr) < 64
+    with pytest.raises(pySMTrace.SMTrace_Exception):
+        pySMTrace.SMTrace_SMLFramer(15)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_decoder_entries():
+    vRef = smlgen.SML_Generator(pEntries=8, pStrings=2, pOctets=4, pSeed=4)
+    vGen = smlgen.SML_Generator(pEntries=8, pStrings=2, pOctets=4, pSeed=4)
+    vDec = pySMTrace.SMTrace_SMLDecoder()
+    for i in range(20):
+        vEnts = [(o, u, s, "SMTRACE{:08d}".format(i).encode() if (o[2] == 96) else v) for o,u,s,v in vRef.entries()]
+        assert normalized(vDec.decode(vGen.telegram())) == vEnts
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_decoder_obis():
+    vTel = smlgen.SML_Generator(pEntries=8, pSeed=5).telegram()
+    vDec = pySMTrace.SMTrace_SMLDecoder(["1-0:1.8.0*255", "1-0:2.7.0*255"])
+    assert [bytes(e[0]) for e in vDec.decode(vTel)] == [bytes([1, 0, 1, 8, 0, 0xFF]), bytes([1, 0, 2, 7, 0, 0xFF])]
+    assert [bytes(e[0]) for e in vDec.decode(vTel, lambda o, e: o[2] == 2)] == [bytes([1, 0, 2, 7, 0, 0xFF])]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("pObis", [None, ["1-0:1.8.0*255", "129-129:199.130.3*255"]])
+def test_decoder_lazy_full(pObis):
+    vCrc = pySMTrace.SMTrace_CRC16("X25")
+    vDec = pySMTrace.SMTrace_SMLDecoder(pObis)
+    for vTel in smlgen.SML_Generator(pEntries=12, pStrings=2, pOctets=4, pSeed=6).telegrams(20):
+        vFull = pySMTrace.SMTrace_SMLPacket.decode(vTel, vCrc, vDec, False)
+        vLazy = pySMTrace.SMTrace_SMLPacket.decode(vTel, vCrc, vDec, True)
+        assert vLazy[0] is None
+        assert normalized(vLazy[1]) == normalized(vFull[1])
+        assert len(vLazy[1]) == (18 if (pObis is None) else 2)
@@ -0,0 +1,101 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+########################################################################################################################
+
+
+import json
+import os
+
+import pytest
+
+import pySMTrace
+
+
+########################################################################################################################
+
+
+def handler(pState:dict=None):
+    """
+    @brief  Returns an EMailTxt handler aggregating all numeric keys, restored from pState if given.
+    """
+    vHdl = pySMTrace.SMTrace_Report.EMailTxt({"mode": "aggregate", "aggregate": None, "retention": 10, "cron": []}, None)
+    if (pState is not None): vHdl.restore(pState)
+    return vHdl
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def feed(pHdl, pStart:int, pCount:int):
+    """
+    @brief  Logs pCount samples of an energy and a power value and a string into a handler.
+    """
+    for i in range(pStart, pStart + pCount):
+        pHdl.log(1000000000 * (1735689600 + i), {"energy": {"valu": 1000 + i, "unit": "Wh"}, "power": {"valu": (i * 37) % 500, "unit": "W"}, "name": {"valu": b"SMT", "unit": None}})
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def state(tmp_path):
+    return pySMTrace.SMTrace_State({"file": str(tmp_path / "pySMTrace.state"), "interval": 0.05})
+
+
+########################################################################################################################
+
+
+def test_state_round_trip(state, tmp_path):
+    vHdl = handler()
+    feed(vHdl, 0, 30)
+    vHdl.store.window()
+    feed(vHdl, 30, 20)
+    state.save({"meter": {"txt": vHdl.state()}})
+    assert os.listdir(tmp_path) == ["pySMTrace.state"]
+    vCopy = handler(state.load()["meter"]["txt"])
+    assert vCopy.store.window(False)[2] == vHdl.store.window(False)[2]
+    assert vCopy.store.window(False)[2]["energy"]["delta"] == 20
+    feed(vCopy, 50, 10)
+    feed(vHdl,  50, 10)
+    assert vCopy.store.window()[2] == vHdl.store.window()[2]
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_state_unusable(state, tmp_path):
+    assert state.load() == dict()
+    state.save({"meter": {"octets": bytearray(b"\x01SMT")}})
+    assert state.load() == {"meter": {"octets": "\x01SMT"}}
+    with open(tmp_path / "pySMTrace.state", "r+") as fhdl:
+        vData = json.load(fhdl)
+        fhdl.seek(0)
+        json.dump(dict(vData, version=pySMTrace.SMTrace_State.VERSION + 1), fhdl)
+    assert state.load() == dict()
+    with open(tmp_path / "pySMTrace.state", "w") as fhdl:
+        fhdl.write('{"version": 1, "meters": {')
+    assert state.load() == dict()
+    vNone = pySMTrace.SMTrace_State(None)
+    vNone.save({"meter": {}})
+    assert (not vNone.enabled) and (vNone.load() == dict())
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_state_periodic(state, wait):
+    vCnt = [0]
+    def snapshot():
+        vCnt[0] += 1
+        return {"meter": {"count": vCnt[0]}}
+    state.start(snapshot)
+    try:
+        assert wait(lambda: state.load().get("meter", {}).get("count", 0) >= 3)
+    finally:
+        state.stop()
+    assert state.load()["meter"]["count"] == vCnt[0]
@@ -0,0 +1,106 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+
+########################################################################################################################
+
+
+import os
+import signal
+
+import pytest
+
+import pySMTrace
+
+
+########################################################################################################################
+
+
+@pytest.fixture
+def stats():
+    """
+    @brief  Returns a function enabling the statistics with additional settings; disables them afterwards and restores
+            the SIGUSR1 handler.
+    """
+    vHdl = signal.getsignal(signal.SIGUSR1) if hasattr(signal, "SIGUSR1") else None
+    def stats(**pArgs):
+        pySMTrace.SMTrace_Stats.StatsInit(dict(dict(enabled=True, interval=0), **pArgs))
+    yield stats
+    pySMTrace.SMTrace_Stats.StatsInit(None)
+    if (vHdl is not None): signal.signal(signal.SIGUSR1, vHdl)
+
+
+########################################################################################################################
+
+
+def test_stats_buckets():
+    assert [pySMTrace.SMTrace_Stats.bucket(v) for v in range(16)] == list(range(16))
+    for v in list(range(16, 5000)) + [10 ** e + d for e in range(4, 12) for d in (-1, 0, 1)]:
+        vIdx = pySMTrace.SMTrace_Stats.bucket(v)
+        assert pySMTrace.SMTrace_Stats.lower(vIdx) <= v < pySMTrace.SMTrace_Stats.lower(vIdx + 1)
+        assert pySMTrace.SMTrace_Stats.lower(vIdx + 1) - pySMTrace.SMTrace_Stats.lower(vIdx) <= max(1, v / 8)
+    assert pySMTrace.SMTrace_Stats.bucket(1 << 60) == pySMTrace.SMTrace_Stats.BUCKETS - 1
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_stats_histogram():
+    vSts = pySMTrace.SMTrace_Stats("test")
+    assert vSts.percentile("decode", 50) is None
+    for i in range(1, 1001): vSts.record("decode", i * 1000)
+    for p in (50, 90, 99):
+        assert p * 10000 <= vSts.percentile("decode", p) <= p * 10000 * 1.125
+    assert vSts.percentile("decode", 100) == 1000000
+    vSts.count("telegrams", 3)
+    vSts.count("telegrams")
+    vSts.gauge("depth", lambda: 7)
+    vSts.gauge("broken", lambda: 1 / 0)
+    vSnap = vSts.snapshot(pReset=True)
+    assert (vSnap["telegrams"], vSnap["depth"], vSnap["broken"]) == (4, 7, None)
+    assert vSnap["latency"]["decode"]["count"] == 1000
+    assert vSnap["latency"]["decode"]["avg_us"] == 500.5
+    assert vSnap["latency"]["decode"]["max_us"] == 1000.0
+    assert 500 <= vSnap["latency"]["decode"]["p50_us"] <= 562.5
+    assert vSts.snapshot() == dict(depth=7, broken=None) # gauges survive a reset
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_stats_registry(stats):
+    pySMTrace.SMTrace_Stats.StatsInit(None)
+    assert pySMTrace.SMTrace_Stats.get("test_stats_registry") is None
+    stats()
+    vSts = pySMTrace.SMTrace_Stats.get("test_stats_registry")
+    assert pySMTrace.SMTrace_Stats.get("test_stats_registry") is vSts
+    vSts.count("bytes", 10)
+    assert pySMTrace.SMTrace_Stats.snapshots()["test_stats_registry"] == dict(bytes=10)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="no SIGUSR1")
+@pytest.mark.parametrize("pTrace, pOn", [(4, 4), (0, 1)])
+def test_stats_sigusr1_toggles_tracing(stats, pTrace, pOn):
+    stats(trace=pTrace)
+    vSeq = [pySMTrace.SMTrace_Stats.trace]
+    for i in range(3):
+        os.kill(os.getpid(), signal.SIGUSR1)
+        vSeq.append(pySMTrace.SMTrace_Stats.trace)
+    assert vSeq == ([pTrace, 0, pOn, 0] if (pTrace) else [0, pOn, 0, pOn])
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_stats_sample(stats):
+    stats(trace=4)
+    assert sum(pySMTrace.SMTrace_Stats.sample() for i in range(40)) == 10
+    pySMTrace.SMTrace_Stats.toggle()
+    assert pySMTrace.SMTrace_Stats.trace == 0
@@ -0,0 +1,136 @@
+# pySMTrace
+# Copyright (C) 2025  Hallabalooza
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not, see
+# <http://www.gnu.org/licenses/>.
+
+
+
+
+########################################################################################################################
+
+
+import pytest
+
+import pySMTrace
+import smtpserve
+
+
+########################################################################################################################
+
+
+SEC    = 1000000000
+POWER  = pySMTrace.SMTrace_SMLDecoder.obis("1-0:16.7.0*255")
+ENERGY = pySMTrace.SMTrace_SMLDecoder.obis("1-0:1.8.0*255")
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def handler(pPort:int, **pArgs):
+    """
+    @brief  Returns an EMailTxt handler mailing via localhost:pPort when called.
+    """
+    vCfg = {"srvr": "127.0.0.1", "port": pPort, "auth": None, "type": "PLAIN", "from": "meter@localhost", "to": "user@localhost", "cc": None, "subjprfx": None,
+            "cron": [], "mode": "aggregate"}
+    return pySMTrace.SMTrace_Report.EMailTxt(dict(vCfg, **pArgs), None, None, "meter")
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def server():
+    vSrv = smtpserve.SMTP_Server()
+    pySMTrace.SMTrace_Mailer.MailInit(None)
+    yield vSrv
+    vSrv.stop()
+
+
+########################################################################################################################
+
+
+def test_store_window():
+    vSto = pySMTrace.SMTrace_Store()
+    for i, v in enumerate([10, 30, 20]): vSto.add("a", i * SEC, v)
+    vSto.add("b", 0, 1.5)
+    vBeg, vEnd, vAggr = vSto.window()
+    assert vBeg <= vEnd
+    assert vAggr["a"] == dict(count=3, min=10, max=30, mean=20, first=10, last=20, delta=10, tfirst=0, tlast=2 * SEC)
+    assert vAggr["b"]["delta"] == 0
+    assert vSto.window(pReset=False)[2] == dict() # every window starts empty
+    for i, v in enumerate([25, 40]): vSto.add("a", (3 + i) * SEC, v)
+    vAggr = vSto.window(pReset=False)[2]
+    assert set(vAggr) == {"a"}
+    assert (vAggr["a"]["min"], vAggr["a"]["max"], vAggr["a"]["mean"], vAggr["a"]["first"]) == (25, 40, 32.5, 25)
+    assert vAggr["a"]["delta"] == 20 # from the last value of the previous window
+    assert vSto.window()[2] == vAggr
+    vSto.add("a", 5 * SEC, 30)
+    assert vSto.window()[2]["a"]["delta"] == -10
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_store_series():
+    vSto = pySMTrace.SMTrace_Store(3, 1.0)
+    for t, v in [(0, 1), (SEC // 2, 2), (SEC, 3), (2 * SEC, 4), (3 * SEC, 5)]: vSto.add("a", t, v)
+    assert vSto.series("a") == [(SEC, 3.0), (2 * SEC, 4.0), (3 * SEC, 5.0)]
+    assert vSto.series("a", 2 * SEC) == [(2 * SEC, 4.0), (3 * SEC, 5.0)]
+    assert vSto.series("a", None, 2 * SEC) == [(SEC, 3.0)]
+    assert vSto.series("b") == []
+    assert vSto.window()[2]["a"]["count"] == 5 # downsampling applies to the kept samples only
+    assert pySMTrace.SMTrace_Store().series("a") == []
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_store_restore():
+    vSto = pySMTrace.SMTrace_Store(4)
+    for i in range(6): vSto.add("a", i * SEC, i)
+    vSto.window()
+    vSto.add("a", 6 * SEC, 10)
+    vNew = pySMTrace.SMTrace_Store(4)
+    vNew.restore(vSto.state())
+    assert vNew.series("a") == vSto.series("a")
+    assert vNew.window()[2] == vSto.window()[2]
+    vOthr = pySMTrace.SMTrace_Store(8)
+    vOthr.restore(vSto.state())
+    assert vOthr.series("a") == [] # samples of another retention are dropped
+
+
+########################################################################################################################
+
+
+def test_emailtxt_aggregate(server):
+    vHdl = handler(server.port, aggregate=["1-0:16.7.0*255"])
+    vObis = {"power": POWER, "energy": ENERGY, "serial": b"\x01\x00\x60\x01\x00\xff"}
+    try:
+        for i, v in enumerate([100, 300, 200]):
+            vHdl.log(i * SEC, {"power": dict(valu=v, unit="W"), "energy": dict(valu=1000 + i, unit="Wh"), "serial": dict(valu="SMTRACE", unit=None)}, vObis)
+        vHdl.log(3 * SEC, {"power": dict(valu=250, unit="W")}) # objects unknown, not selected
+        vHdl()
+        assert len(server.messages) == 1
+        vText = server.messages[0][2].get_content()
+        assert "power | W  | min 100 | max 300 | mean 200 | delta 100 | n 3" in vText.splitlines()
+        assert ("energy" not in vText) and ("serial" not in vText)
+        vHdl()
+        assert len(server.messages) == 1 # nothing within the window
+        vHdl.log(4 * SEC, {"power": dict(valu=150, unit="W")}, vObis)
+        vHdl()
+        assert "power | W  | min 150 | max 150 | mean 150 | delta -50 | n 1" in server.messages[1][2].get_content().splitlines()
+    finally:
+        vHdl.close()
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+def test_emailtxt_aggregate_all_numeric(server):
+    vHdl = handler(server.port)
+    try:
+        vHdl.log(0, {"power": dict(valu=5, unit="W"), "flag": dict(valu=True, unit=None), "serial": dict(valu="SMTRACE", unit=None)})
+        vHdl.log(SEC, {"power": dict(valu=7.5, unit="W")})
+        assert set(vHdl.store.window(pReset=False)[2]) == {"power"}
+        vHdl()
+        assert "power | W  | min 5 | max 7.5 | mean 6.25 | delta 2.5 | n 2" in server.messages[0][2].get_content().splitlines()
+    finally:
+        vHdl.close()